@@ -4,21 +4,369 @@ Serves HTML reports and provides API for comparison
 Includes Chat Widget with WebSocket proxy to TryllServer
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse
 from pathlib import Path
 import re
+import html
 import json
+import bisect
+import base64
 from bs4 import BeautifulSoup
 from typing import Optional
 import os
 import asyncio
 import socket
-from datetime import datetime
+import sqlite3
+import mmap
+import time
+import contextvars
+import hashlib
+import hmac
+import sys
+import tempfile
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pydantic import BaseModel
 
-app = FastAPI(title="Tryll RAG Test Dashboard")
+from rag_analytics import FoundMatrix, diff_found_matrices, diff_test_results, first_found_k, threshold_key
+
+# ============================================================
+# REQUEST TIMING & METRICS
+# ============================================================
+
+# Per-request phase timings (seconds), set by the timing middleware
+_request_phases = contextvars.ContextVar("request_phases", default=None)
+
+# Prometheus default latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@contextmanager
+def timed_phase(name: str):
+    """Add the time spent in this block to the current request's `name` phase."""
+    phases = _request_phases.get()
+    if phases is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def read_json_file(filepath: Path):
+    """Read and decode a JSON file, timing file I/O and decoding separately."""
+    with timed_phase("io"):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            text = f.read()
+    with timed_phase("json"):
+        return json.loads(text)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same resource: the first caller for a
+    key runs the load, every caller arriving while it is in flight gets the
+    same result (or exception) instead of loading again.
+    do() works across threads (e.g. warm-up vs. requests); run() is the
+    async form - the load runs in a worker thread and concurrent requests
+    await one shared future without holding a thread each.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> _Flight
+        self._futures = {}  # key -> asyncio future (event loop side)
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            metrics.coalesced_load(key)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def run(self, key, fn):
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.ensure_future(asyncio.to_thread(self.do, key, fn))
+            self._futures[key] = future
+            future.add_done_callback(lambda _: self._futures.pop(key, None))
+        else:
+            metrics.coalesced_load(key)
+        # A disconnecting client must not cancel the load others are waiting for
+        return await asyncio.shield(future)
+
+
+single_flight = SingleFlight()
+
+# Parsed JSON data files, re-read only when the file's mtime/size changes. Bounded
+# (least recently used dropped first): RAG result archives are read file by file.
+JSON_FILE_CACHE_SIZE = 64
+_json_file_cache = {}  # path -> (stamp, data), least recently used first
+_json_file_cache_lock = threading.Lock()
+
+
+def _fresh_json_file(filepath: Path, cache: str):
+    """(hit, data): the cached data if the file is unchanged since it was read."""
+    stat = filepath.stat()
+    with _json_file_cache_lock:
+        cached = _json_file_cache.pop(filepath, None)
+        if cached is not None:
+            _json_file_cache[filepath] = cached
+    hit = cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size)
+    metrics.cache_lookup(cache, hit)
+    return hit, cached[1] if hit else None
+
+
+def _load_json_file_into_cache(filepath: Path):
+    stat = filepath.stat()
+    data = read_json_file(filepath)
+    with _json_file_cache_lock:
+        _json_file_cache.pop(filepath, None)
+        _json_file_cache[filepath] = ((stat.st_mtime_ns, stat.st_size), data)
+        while len(_json_file_cache) > JSON_FILE_CACHE_SIZE:
+            _json_file_cache.pop(next(iter(_json_file_cache)))
+    return data
+
+
+def read_json_file_cached(filepath: Path, cache: str = None):
+    """read_json_file for large data files that are read on many requests (result must not be mutated)."""
+    hit, data = _fresh_json_file(filepath, cache or filepath.name)
+    if hit:
+        return data
+    return single_flight.do(("file", str(filepath)), lambda: _load_json_file_into_cache(filepath))
+
+
+async def read_json_file_cached_async(filepath: Path, cache: str = None):
+    """read_json_file_cached that parses off the event loop and coalesces concurrent misses."""
+    hit, data = _fresh_json_file(filepath, cache or filepath.name)
+    if hit:
+        return data
+    return await single_flight.run(("file", str(filepath)), lambda: _load_json_file_into_cache(filepath))
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records its rendering as the `serialize` phase."""
+
+    def render(self, content) -> bytes:
+        with timed_phase("serialize"):
+            return super().render(content)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.total += seconds
+        self.count += 1
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(LATENCY_BUCKETS):
+            self.bucket_counts[index] += 1
+
+
+def _prometheus_labels(**labels) -> str:
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Metrics:
+    """
+    In-process request, cache and WebSocket metrics. Each worker keeps its
+    own and publishes them through the worker board, so /metrics can report
+    every worker whichever one serves the scrape.
+    """
+
+    def __init__(self):
+        self.requests = {}  # (route, method, status) -> count
+        self.latency = {}  # (route, method) -> LatencyHistogram
+        self.phase_seconds = {}  # (route, phase) -> seconds
+        self.cache_lookups = {}  # (cache, "hit"/"miss") -> count
+        self.coalesced_loads = {}  # resource -> loads that joined an in-flight one
+        self.active_websockets = 0
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float, phases: dict):
+        key = (route, method, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.latency.setdefault((route, method), LatencyHistogram()).observe(seconds)
+        for phase, phase_seconds in phases.items():
+            self.phase_seconds[(route, phase)] = self.phase_seconds.get((route, phase), 0.0) + phase_seconds
+
+    def cache_lookup(self, cache: str, hit: bool):
+        key = (cache, "hit" if hit else "miss")
+        self.cache_lookups[key] = self.cache_lookups.get(key, 0) + 1
+
+    def coalesced_load(self, key):
+        resource = key[0] if isinstance(key, tuple) else key
+        self.coalesced_loads[resource] = self.coalesced_loads.get(resource, 0) + 1
+
+    def state(self) -> dict:
+        """JSON-serializable copy of the counters, as published for other workers."""
+        return {
+            "requests": [[*key, count] for key, count in dict(self.requests).items()],
+            "latency": [[route, method, list(histogram.bucket_counts), histogram.total, histogram.count]
+                        for (route, method), histogram in dict(self.latency).items()],
+            "phase_seconds": [[*key, seconds] for key, seconds in dict(self.phase_seconds).items()],
+            "cache_lookups": [[*key, count] for key, count in dict(self.cache_lookups).items()],
+            "coalesced_loads": [[resource, count] for resource, count in dict(self.coalesced_loads).items()],
+            "active_websockets": self.active_websockets
+        }
+
+    @staticmethod
+    def render(states: dict) -> str:
+        """Prometheus text exposition format for {worker: state()}, one series per worker."""
+        workers = sorted(states.items())
+        lines = [
+            "# HELP app_requests_total HTTP requests by route, method and status.",
+            "# TYPE app_requests_total counter",
+        ]
+        for worker, state in workers:
+            for route, method, status, count in sorted(state["requests"]):
+                labels = _prometheus_labels(worker=worker, route=route, method=method, status=status)
+                lines.append(f"app_requests_total{labels} {count}")
+
+        lines += [
+            "# HELP app_request_duration_seconds HTTP request latency by route.",
+            "# TYPE app_request_duration_seconds histogram",
+        ]
+        for worker, state in workers:
+            for route, method, bucket_counts, total, count in sorted(state["latency"]):
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, bucket_counts):
+                    cumulative += bucket_count
+                    labels = _prometheus_labels(worker=worker, route=route, method=method, le=bound)
+                    lines.append(f"app_request_duration_seconds_bucket{labels} {cumulative}")
+                labels = _prometheus_labels(worker=worker, route=route, method=method, le="+Inf")
+                lines.append(f"app_request_duration_seconds_bucket{labels} {count}")
+                labels = _prometheus_labels(worker=worker, route=route, method=method)
+                lines.append(f"app_request_duration_seconds_sum{labels} {total:.6f}")
+                lines.append(f"app_request_duration_seconds_count{labels} {count}")
+
+        lines += [
+            "# HELP app_request_phase_seconds_total Time spent per route in io, json, html and serialize phases.",
+            "# TYPE app_request_phase_seconds_total counter",
+        ]
+        for worker, state in workers:
+            for route, phase, seconds in sorted(state["phase_seconds"]):
+                labels = _prometheus_labels(worker=worker, route=route, phase=phase)
+                lines.append(f"app_request_phase_seconds_total{labels} {seconds:.6f}")
+
+        lines += [
+            "# HELP app_cache_lookups_total Cache lookups by cache and result.",
+            "# TYPE app_cache_lookups_total counter",
+        ]
+        for worker, state in workers:
+            for cache, result, count in sorted(state["cache_lookups"]):
+                labels = _prometheus_labels(worker=worker, cache=cache, result=result)
+                lines.append(f"app_cache_lookups_total{labels} {count}")
+
+        lines += [
+            "# HELP app_coalesced_loads_total Loads that waited for an identical in-flight load instead of repeating it.",
+            "# TYPE app_coalesced_loads_total counter",
+        ]
+        for worker, state in workers:
+            for resource, count in sorted(state["coalesced_loads"]):
+                lines.append(f"app_coalesced_loads_total{_prometheus_labels(worker=worker, resource=resource)} {count}")
+
+        lines += [
+            "# HELP app_active_websockets Open chat WebSocket connections.",
+            "# TYPE app_active_websockets gauge",
+        ]
+        for worker, state in workers:
+            lines.append(f"app_active_websockets{_prometheus_labels(worker=worker)} {state['active_websockets']}")
+        return "\n".join(lines) + "\n"
+
+
+def worker_id() -> str:
+    """This worker process, as labelled in /metrics and profiles."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+metrics = Metrics()
+
+app = FastAPI(title="Tryll RAG Test Dashboard", default_response_class=TimedJSONResponse)
+
+_route_paths = {}
+
+
+def _route_label(scope: dict) -> str:
+    """Route template for metrics labels ('/api/report/{report_id}', not the raw path)."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in _route_paths:
+        for route in app.routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                _route_paths[endpoint] = route.path
+                break
+        else:
+            _route_paths[endpoint] = scope.get("path", "unmatched")
+    return _route_paths[endpoint]
+
+
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    """Time each request, split into phases, and expose them as Server-Timing."""
+    phases = {}
+    token = _request_phases.set(phases)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        # Unhandled errors become a 500 further out; count them as one
+        metrics.observe_request(_route_label(request.scope), request.method, 500,
+                                time.perf_counter() - started, phases)
+        raise
+    finally:
+        _request_phases.reset(token)
+    total = time.perf_counter() - started
+
+    metrics.observe_request(_route_label(request.scope), request.method, response.status_code, total, phases)
+
+    timings = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in phases.items()]
+    timings.append(f"total;dur={total * 1000:.2f}")
+    response.headers["Server-Timing"] = ", ".join(timings)
+    return response
 
 # Get the directory where this script is located
 BASE_DIR = Path(__file__).parent
@@ -31,139 +379,12 @@ REPORTS_DIR.mkdir(exist_ok=True)
 def parse_html_report(filepath: Path) -> dict:
     """Parse an HTML report file and extract metadata."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        soup = BeautifulSoup(content, 'html.parser')
-
-        # Extract data from filename
-        filename = filepath.name
-        # Format: evaluation_report or ragas_report_DD_MM_HH-MMAM/PM_Model_Name.html
-        # Example: evaluation_report_06_01_03-06AM_Llama_3.1_8B_Instruct_Q4_K_M.html
-
-        report_data = {
-            'id': filepath.stem,
-            'filename': filename,
-            'model': 'Unknown',
-            'game': 'Minecraft',  # Default to Minecraft for old reports
-            'date': '',
-            'time': '',
-            'score_percent': 0,
-            'questions_count': 0,
-            'server_config': {},
-            'test_config': {},
-            'questions': []
-        }
-
-        # Try to extract from subtitle
-        subtitle = soup.select_one('.header .subtitle')
-        if subtitle:
-            text = subtitle.get_text()
-            # Generated: 2026-01-06 03:06 | Questions: 15 | Model: Llama 3.1 8B Instruct (Q4_K_M)
-            match = re.search(r'Generated:\s*(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})', text)
-            if match:
-                report_data['date'] = match.group(1)
-                report_data['time'] = match.group(2)
-
-            match = re.search(r'Questions:\s*(\d+)', text)
-            if match:
-                report_data['questions_count'] = int(match.group(1))
-
-            match = re.search(r'Model:\s*(.+?)(?:\||$)', text)
-            if match:
-                report_data['model'] = match.group(1).strip()
-
-            # Extract game name (new format: ... | Game: Stardew Valley)
-            match = re.search(r'Game:\s*(.+?)(?:\||$)', text)
-            if match:
-                report_data['game'] = match.group(1).strip()
-
-        # Try to get model from filename if not found in subtitle
-        if report_data['model'] == 'Unknown':
-            # Try to extract model name from filename
-            parts = filename.replace('.html', '').split('_')
-            if len(parts) > 4:
-                # Skip date/time parts and join the rest
-                model_parts = parts[5:] if len(parts) > 5 else parts[4:]
-                report_data['model'] = ' '.join(model_parts).replace('_', ' ')
-
-        # Extract score from metrics
-        score_card = soup.select_one('.metric-card.highlight .value')
-        if score_card:
-            text = score_card.get_text()
-            # Format: "548/750" or just percentage
-            match = re.search(r'(\d+(?:\.\d+)?)', text)
-            if match:
-                # Try to find the percentage in subtext
-                subtext = soup.select_one('.metric-card.highlight .subtext')
-                if subtext:
-                    pct_match = re.search(r'(\d+(?:\.\d+)?)%', subtext.get_text())
-                    if pct_match:
-                        report_data['score_percent'] = float(pct_match.group(1))
-
-        # If score not found in highlight card, try to find it elsewhere
-        if report_data['score_percent'] == 0:
-            for card in soup.select('.metric-card'):
-                label = card.select_one('.label')
-                if label and 'score' in label.get_text().lower():
-                    value = card.select_one('.value')
-                    if value:
-                        match = re.search(r'(\d+(?:\.\d+)?)', value.get_text())
-                        if match:
-                            report_data['score_percent'] = float(match.group(1))
-                            break
-
-        # Extract server config from modal
-        server_config_modal = soup.select_one('#serverConfigModal .prompt-text')
-        if server_config_modal:
-            config_text = server_config_modal.get_text()
-            # Clean up HTML entities and parse JSON
-            config_text = config_text.replace('\n', '').replace('<br>', '')
-            try:
-                # Try to extract JSON-like structure
-                config_text = re.sub(r'<[^>]+>', '', str(server_config_modal))
-                config_text = config_text.replace('&quot;', '"').replace('&amp;', '&')
-                config_text = config_text.replace('\n', '').strip()
-                # Find JSON object
-                json_match = re.search(r'\{[^{}]*\}', config_text, re.DOTALL)
-                if json_match:
-                    report_data['server_config'] = json.loads(json_match.group())
-            except (json.JSONDecodeError, AttributeError):
-                pass
+        with timed_phase("io"):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
 
-        # Extract test config (temperature, etc.)
-        test_config_modal = soup.select_one('#promptModal .model-info')
-        if test_config_modal:
-            model_text = test_config_modal.get_text()
-            report_data['test_config']['model'] = model_text.replace('Model:', '').strip()
-
-        # Extract questions and answers from table
-        table_rows = soup.select('.results-table tbody tr:not(.details-row)')
-        for row in table_rows:
-            cells = row.select('td')
-            if len(cells) >= 4:
-                question_cell = cells[1]
-                answer_cell = cells[2]
-                score_cell = cells[3]
-
-                question_text = question_cell.select_one('.question-text')
-                if question_text:
-                    q_data = {
-                        'question': question_text.get_text().strip(),
-                        'answer': answer_cell.get_text().strip(),
-                        'score': 0
-                    }
-
-                    # Extract score
-                    score_badge = score_cell.select_one('.score-badge')
-                    if score_badge:
-                        match = re.search(r'(\d+)', score_badge.get_text())
-                        if match:
-                            q_data['score'] = int(match.group(1))
-
-                    report_data['questions'].append(q_data)
-
-        return report_data
+        with timed_phase("html"):
+            return _extract_report_data(filepath, content)
 
     except Exception as e:
         print(f"Error parsing {filepath}: {e}")
@@ -183,6 +404,154 @@ def parse_html_report(filepath: Path) -> dict:
         }
 
 
+_REPORT_FILENAME_RE = re.compile(r'(?:evaluation_report|ragas_report)_\d{2}_\d{2}_\d{2}-\d{2}(?:AM|PM)_(.+)$')
+
+
+def _model_from_filename(stem: str) -> str:
+    """
+    Model name from a report filename stem, e.g.
+    evaluation_report_06_01_03-06AM_Llama_3.1_8B_Instruct_Q4_K_M -> "Llama 3.1 8B Instruct Q4 K M".
+    """
+    match = _REPORT_FILENAME_RE.match(stem)
+    if match:
+        return match.group(1).replace('_', ' ').strip()
+    # Unknown naming scheme: skip the leading report type/date parts
+    parts = stem.split('_')
+    if len(parts) > 4:
+        model_parts = parts[5:] if len(parts) > 5 else parts[4:]
+        return ' '.join(model_parts)
+    return ''
+
+
+def _extract_report_data(filepath: Path, content: str) -> dict:
+    """Extract report metadata, scores and questions from report HTML."""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Extract data from filename
+    filename = filepath.name
+    # Format: evaluation_report or ragas_report_DD_MM_HH-MMAM/PM_Model_Name.html
+    # Example: evaluation_report_06_01_03-06AM_Llama_3.1_8B_Instruct_Q4_K_M.html
+
+    report_data = {
+        'id': filepath.stem,
+        'filename': filename,
+        'model': 'Unknown',
+        'game': 'Minecraft',  # Default to Minecraft for old reports
+        'date': '',
+        'time': '',
+        'score_percent': 0,
+        'questions_count': 0,
+        'server_config': {},
+        'test_config': {},
+        'questions': []
+    }
+
+    # Try to extract from subtitle
+    subtitle = soup.select_one('.header .subtitle')
+    if subtitle:
+        text = subtitle.get_text()
+        # Generated: 2026-01-06 03:06 | Questions: 15 | Model: Llama 3.1 8B Instruct (Q4_K_M)
+        match = re.search(r'Generated:\s*(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})', text)
+        if match:
+            report_data['date'] = match.group(1)
+            report_data['time'] = match.group(2)
+
+        match = re.search(r'Questions:\s*(\d+)', text)
+        if match:
+            report_data['questions_count'] = int(match.group(1))
+
+        match = re.search(r'Model:\s*(.+?)(?:\||$)', text)
+        if match:
+            report_data['model'] = match.group(1).strip()
+
+        # Extract game name (new format: ... | Game: Stardew Valley)
+        match = re.search(r'Game:\s*(.+?)(?:\||$)', text)
+        if match:
+            report_data['game'] = match.group(1).strip()
+
+    # Try to get model from filename if not found in subtitle
+    if report_data['model'] == 'Unknown':
+        report_data['model'] = _model_from_filename(filepath.stem) or 'Unknown'
+
+    # Extract score from metrics
+    score_card = soup.select_one('.metric-card.highlight .value')
+    if score_card:
+        text = score_card.get_text()
+        # Format: "548/750" or just percentage
+        match = re.search(r'(\d+(?:\.\d+)?)', text)
+        if match:
+            # Try to find the percentage in subtext
+            subtext = soup.select_one('.metric-card.highlight .subtext')
+            if subtext:
+                pct_match = re.search(r'(\d+(?:\.\d+)?)%', subtext.get_text())
+                if pct_match:
+                    report_data['score_percent'] = float(pct_match.group(1))
+
+    # If score not found in highlight card, try to find it elsewhere
+    if report_data['score_percent'] == 0:
+        for card in soup.select('.metric-card'):
+            label = card.select_one('.label')
+            if label and 'score' in label.get_text().lower():
+                value = card.select_one('.value')
+                if value:
+                    match = re.search(r'(\d+(?:\.\d+)?)', value.get_text())
+                    if match:
+                        report_data['score_percent'] = float(match.group(1))
+                        break
+
+    # Extract server config from modal
+    server_config_modal = soup.select_one('#serverConfigModal .prompt-text')
+    if server_config_modal:
+        config_text = server_config_modal.get_text()
+        # Clean up HTML entities and parse JSON
+        config_text = config_text.replace('\n', '').replace('<br>', '')
+        try:
+            # Try to extract JSON-like structure
+            config_text = re.sub(r'<[^>]+>', '', str(server_config_modal))
+            config_text = config_text.replace('&quot;', '"').replace('&amp;', '&')
+            config_text = config_text.replace('\n', '').strip()
+            # Find JSON object
+            json_match = re.search(r'\{[^{}]*\}', config_text, re.DOTALL)
+            if json_match:
+                report_data['server_config'] = json.loads(json_match.group())
+        except (json.JSONDecodeError, AttributeError):
+            pass
+
+    # Extract test config (temperature, etc.)
+    test_config_modal = soup.select_one('#promptModal .model-info')
+    if test_config_modal:
+        model_text = test_config_modal.get_text()
+        report_data['test_config']['model'] = model_text.replace('Model:', '').strip()
+
+    # Extract questions and answers from table
+    table_rows = soup.select('.results-table tbody tr:not(.details-row)')
+    for row in table_rows:
+        cells = row.select('td')
+        if len(cells) >= 4:
+            question_cell = cells[1]
+            answer_cell = cells[2]
+            score_cell = cells[3]
+
+            question_text = question_cell.select_one('.question-text')
+            if question_text:
+                q_data = {
+                    'question': question_text.get_text().strip(),
+                    'answer': answer_cell.get_text().strip(),
+                    'score': 0
+                }
+
+                # Extract score
+                score_badge = score_cell.select_one('.score-badge')
+                if score_badge:
+                    match = re.search(r'(\d+)', score_badge.get_text())
+                    if match:
+                        q_data['score'] = int(match.group(1))
+
+                report_data['questions'].append(q_data)
+
+    return report_data
+
+
 @app.get("/")
 async def root():
     """Serve the main dashboard page."""
@@ -223,20 +592,406 @@ def parse_report_date_from_filename(filepath: Path) -> tuple:
 
 
 # ============================================================
-# FILTERS CACHE - built once at startup or first request
+# REPORT SIDECARS - each HTML report parsed once into JSON
+# ============================================================
+
+# reports_json/<report id>.json holds the structured report extracted from
+# reports_html/<report id>.html. APIs read these instead of parsing HTML;
+# a sidecar is rebuilt when the HTML file's size/mtime or the schema changes.
+REPORTS_DATA_DIR = BASE_DIR / "reports_json"
+REPORT_SIDECAR_VERSION = 1
+
+
+def report_sidecar_path(filepath: Path) -> Path:
+    return REPORTS_DATA_DIR / f"{filepath.stem}.json"
+
+
+def _report_source(filepath: Path) -> dict:
+    stat = filepath.stat()
+    return {"filename": filepath.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_fresh_sidecar(filepath: Path, source: dict) -> Optional[dict]:
+    """The sidecar's report if it matches the HTML file and schema, else None."""
+    sidecar_path = report_sidecar_path(filepath)
+    if not sidecar_path.exists():
+        return None
+    try:
+        sidecar = read_json_file(sidecar_path)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if sidecar.get('schema_version') != REPORT_SIDECAR_VERSION or sidecar.get('source') != source:
+        return None
+    return sidecar.get('report')
+
+
+def ingest_report(filepath: Path, force: bool = False) -> dict:
+    """Parse an HTML report into its JSON sidecar (unless an up-to-date one exists)."""
+    source = _report_source(filepath)
+    if not force:
+        report = _read_fresh_sidecar(filepath, source)
+        if report is not None:
+            return report
+
+    report = parse_html_report(filepath)
+    if report.get('error'):
+        # No sidecar for a report that failed to parse (and none left over from an older version of it)
+        report_sidecar_path(filepath).unlink(missing_ok=True)
+        return report
+    _write_sidecar(filepath, source, report)
+    return report
+
+
+def _write_sidecar(filepath: Path, source: dict, report: dict):
+    sidecar = {
+        "schema_version": REPORT_SIDECAR_VERSION,
+        "source": source,
+        "ingested_at": datetime.now().isoformat(),
+        "report": report
+    }
+    REPORTS_DATA_DIR.mkdir(exist_ok=True)
+    sidecar_path = report_sidecar_path(filepath)
+    # Own temp file per writer: several workers may ingest the same report at once
+    f = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=REPORTS_DATA_DIR, prefix=f"{sidecar_path.stem}.",
+                                    suffix=".tmp", delete=False)
+    try:
+        with f:
+            json.dump(sidecar, f, ensure_ascii=False)
+        os.replace(f.name, sidecar_path)
+    except BaseException:
+        Path(f.name).unlink(missing_ok=True)
+        raise
+
+
+def load_report(filepath: Path) -> dict:
+    """Structured report for an HTML report file, read from its sidecar."""
+    return ingest_report(filepath)
+
+
+def ingest_all_reports(force: bool = False, progress=None) -> dict:
+    """
+    Bring every sidecar in line with reports_html/ and drop orphaned ones.
+    progress(done, total) is called after each report.
+    """
+    counts = {"reports": 0, "ingested": 0, "up_to_date": 0, "errors": 0, "removed": 0}
+    html_stems = set()
+    all_files = sorted(REPORTS_DIR.glob("*.html"))
+    for filepath in all_files:
+        if progress:
+            progress(counts["reports"], len(all_files))
+        html_stems.add(filepath.stem)
+        counts["reports"] += 1
+        if not force and _read_fresh_sidecar(filepath, _report_source(filepath)) is not None:
+            counts["up_to_date"] += 1
+            continue
+        report = ingest_report(filepath, force=True)
+        counts["errors" if report.get('error') else "ingested"] += 1
+
+    if progress:
+        progress(len(all_files), len(all_files))
+
+    if REPORTS_DATA_DIR.exists():
+        for sidecar_path in REPORTS_DATA_DIR.glob("*.json"):
+            if sidecar_path.stem not in html_stems:
+                sidecar_path.unlink(missing_ok=True)  # another worker may have removed it already
+                counts["removed"] += 1
+    return counts
+
+
+# ============================================================
+# LEADERBOARD - running aggregates per model / game / chunks
+# ============================================================
+
+class ScoreAggregate:
+    """Run count, sum, sorted scores and score-over-time points of one group."""
+
+    __slots__ = ("count", "total", "scores", "points")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.scores = []  # ascending, for median and best
+        self.points = []  # (date, time, report_id, score), chronological
+
+    def add(self, score: float, point: tuple):
+        self.count += 1
+        self.total += score
+        bisect.insort(self.scores, score)
+        bisect.insort(self.points, point)
+
+    def remove(self, score: float, point: tuple):
+        self.count -= 1
+        self.total -= score
+        del self.scores[bisect.bisect_left(self.scores, score)]
+        index = bisect.bisect_left(self.points, point)
+        if index < len(self.points) and self.points[index] == point:
+            del self.points[index]
+
+    def merge(self, other: "ScoreAggregate"):
+        self.count += other.count
+        self.total += other.total
+        self.scores = sorted(self.scores + other.scores)
+        self.points = sorted(self.points + other.points)
+
+    def summary(self, include_series: bool) -> dict:
+        n = len(self.scores)
+        median = self.scores[n // 2] if n % 2 else (self.scores[n // 2 - 1] + self.scores[n // 2]) / 2
+        result = {
+            "runs": self.count,
+            "mean_score": round(self.total / self.count, 2),
+            "median_score": round(median, 2),
+            "best_score": self.scores[-1],
+            "worst_score": self.scores[0],
+            "latest_date": self.points[-1][0] or None
+        }
+        if include_series:
+            result["series"] = [
+                {"date": date, "time": time_, "report_id": report_id, "score_percent": score}
+                for date, time_, report_id, score in self.points
+            ]
+        return result
+
+
+class Leaderboard:
+    """
+    Aggregates over parsed reports, kept per (model, game, rag_chunks_number)
+    and rolled up per model. Adding or removing a report touches two groups.
+    """
+
+    def __init__(self):
+        self.configs = {}  # (model, game, chunks) -> ScoreAggregate
+        self.models = {}  # model -> ScoreAggregate
+
+    @staticmethod
+    def _entry(report: dict):
+        if report.get('error') or not report.get('model'):
+            return None
+        score = float(report.get('score_percent') or 0)
+        point = (report.get('date') or '', report.get('time') or '', report['id'], score)
+        key = (report['model'], report.get('game') or 'Unknown',
+               report.get('server_config', {}).get('rag_chunks_number'))
+        return key, score, point
+
+    def add(self, report: dict):
+        entry = self._entry(report)
+        if entry is None:
+            return
+        key, score, point = entry
+        self.configs.setdefault(key, ScoreAggregate()).add(score, point)
+        self.models.setdefault(key[0], ScoreAggregate()).add(score, point)
+
+    def remove(self, report: dict):
+        entry = self._entry(report)
+        if entry is None:
+            return
+        key, score, point = entry
+        for groups, group_key in ((self.configs, key), (self.models, key[0])):
+            aggregate = groups.get(group_key)
+            if aggregate is None:
+                continue
+            aggregate.remove(score, point)
+            if not aggregate.count:
+                del groups[group_key]
+
+    def rows(self, group_by: str, game: Optional[str], chunks: Optional[int], include_series: bool) -> list:
+        """Leaderboard rows, best mean score first. group_by is "model" or "config"."""
+        if group_by == "model" and game is None and chunks is None:
+            groups = {(model,): aggregate for model, aggregate in self.models.items()}
+        else:
+            groups = {}
+            for key, aggregate in self.configs.items():
+                if game is not None and key[1] != game:
+                    continue
+                if chunks is not None and key[2] != chunks:
+                    continue
+                if group_by == "model":
+                    groups.setdefault((key[0],), ScoreAggregate()).merge(aggregate)
+                else:
+                    groups[key] = aggregate
+
+        rows = []
+        for key, aggregate in groups.items():
+            row = {"model": key[0]}
+            if len(key) == 3:
+                row["game"] = key[1]
+                row["rag_chunks_number"] = key[2]
+            row.update(aggregate.summary(include_series))
+            rows.append(row)
+        rows.sort(key=lambda row: (-row["mean_score"], -row["runs"], row["model"]))
+        return rows
+
+
+# ============================================================
+# SHARED CACHE - one build shared by all uvicorn workers
+# ============================================================
+
+# Built caches are stored in a local SQLite file, stamped with the version of
+# the data they were built from. Workers load a matching entry instead of
+# rebuilding; when it is missing or stale, one worker takes the build lock
+# and the others wait for its result. This saves the build work, not
+# memory: every worker still decodes the payload into its own objects. (The
+# knowledge base is the exception - its blob is memory-mapped, so the page
+# cache holds one copy.) The admin profiler and /metrics coordinate through
+# the same file (see WorkerBoard).
+#
+# Waiting for a build lock blocks the calling thread, so the lock refuses to
+# be taken on the event loop; handlers reach it through single_flight.run or
+# asyncio.to_thread.
+SHARED_CACHE_PATH = Path(os.environ.get("SHARED_CACHE_PATH", BASE_DIR / "cache_data" / "shared_cache.db"))
+SHARED_CACHE_BUILD_TIMEOUT = 300.0  # seconds before a build lock is considered abandoned
+SHARED_CACHE_POLL_INTERVAL = 0.05  # first wait for a held build lock, doubled per retry
+SHARED_CACHE_POLL_MAX_INTERVAL = 1.0
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class SharedCache:
+    """Versioned cache entries in a SQLite file, with a per-entry build lock."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._ready = False
+        self.owner = worker_id()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    name TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    built_at TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_builds (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    started_at REAL NOT NULL
+                );
+            """)
+            self._ready = True
+        return conn
+
+    def get(self, name: str, version: str):
+        """The cached payload for `name` if it was built from `version`, else None."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT payload FROM cache_entries WHERE name = ? AND version = ?",
+                               (name, version)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        with timed_phase("json"):
+            return json.loads(row[0])
+
+    def put(self, name: str, version: str, payload):
+        text = json.dumps(payload, ensure_ascii=False)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO cache_entries (name, version, built_at, payload) VALUES (?, ?, ?, ?)",
+                             (name, version, datetime.now().isoformat(), text))
+        finally:
+            conn.close()
+
+    def _try_acquire(self, name: str) -> bool:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM cache_builds WHERE name = ? AND started_at < ?",
+                             (name, time.time() - SHARED_CACHE_BUILD_TIMEOUT))
+                cursor = conn.execute("INSERT OR IGNORE INTO cache_builds (name, owner, started_at) VALUES (?, ?, ?)",
+                                      (name, self.owner, time.time()))
+                return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def _release(self, name: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM cache_builds WHERE name = ? AND owner = ?", (name, self.owner))
+        finally:
+            conn.close()
+
+    @contextmanager
+    def build_lock(self, name: str):
+        """Hold the cross-worker build lock for `name`, waiting (off the event loop) for the current holder."""
+        if _on_event_loop():
+            raise RuntimeError(f"build_lock({name!r}) would block the event loop; call it from a worker thread")
+        delay = SHARED_CACHE_POLL_INTERVAL
+        while not self._try_acquire(name):
+            time.sleep(delay)
+            delay = min(delay * 2, SHARED_CACHE_POLL_MAX_INTERVAL)
+        try:
+            yield
+        finally:
+            self._release(name)
+
+    def get_or_build(self, name: str, version: str, build):
+        """
+        Payload for (name, version): from the shared file if present, otherwise
+        built by this worker - or by the worker already building it, whose
+        result is picked up once it releases the lock.
+        """
+        payload = self.get(name, version)
+        if payload is not None:
+            return payload
+
+        with self.build_lock(name):
+            payload = self.get(name, version)
+            if payload is None:
+                payload = build()
+                self.put(name, version, payload)
+            return payload
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM cache_entries")
+        finally:
+            conn.close()
+
+
+shared_cache = SharedCache(SHARED_CACHE_PATH)
+
+
+# ============================================================
+# FILTERS CACHE - built once, shared by workers, re-checked every few seconds
 # ============================================================
+REPORTS_CACHE_CHECK_INTERVAL = 2.0  # seconds between reports_html/ change checks
+
 _filters_cache = None
 _reports_metadata_cache = None
+_leaderboard_cache = None
+_reports_cache_version = None
+_reports_checked_at = 0.0
 
 
-def _build_caches():
-    """Build filters and metadata caches from all reports."""
-    global _filters_cache, _reports_metadata_cache
+def _reports_source_version() -> str:
+    """Stamp of reports_html/ (names, sizes, mtimes) and the sidecar schema."""
+    digest = hashlib.sha1(f"sidecar-v{REPORT_SIDECAR_VERSION}".encode('utf-8'))
+    if REPORTS_DIR.exists():
+        for filepath in sorted(REPORTS_DIR.glob("*.html")):
+            stat = filepath.stat()
+            digest.update(f"{filepath.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
 
+
+def _compute_report_caches() -> dict:
+    """Reports metadata (newest first, without questions) and filter values."""
     if not REPORTS_DIR.exists():
-        _filters_cache = {"models": [], "chunks": [], "games": []}
-        _reports_metadata_cache = []
-        return
+        return {"reports": [], "filters": {"models": [], "chunks": [], "games": []}}
 
     models = set()
     chunks = set()
@@ -246,7 +1001,7 @@ def _build_caches():
     all_files = sorted(REPORTS_DIR.glob("*.html"), key=parse_report_date_from_filename, reverse=True)
 
     for filepath in all_files:
-        report_data = parse_html_report(filepath)
+        report_data = load_report(filepath)
         # Remove questions - not needed for list view
         report_data.pop('questions', None)
         reports_metadata.append(report_data)
@@ -259,41 +1014,139 @@ def _build_caches():
         if report_data.get('game'):
             games.add(report_data['game'])
 
-    _filters_cache = {
-        "models": sorted(list(models)),
-        "chunks": sorted(list(chunks)),
-        "games": sorted(list(games))
+    return {
+        "reports": reports_metadata,
+        "filters": {
+            "models": sorted(list(models)),
+            "chunks": sorted(list(chunks)),
+            "games": sorted(list(games))
+        }
     }
-    _reports_metadata_cache = reports_metadata
 
 
-def _get_filters_cache():
-    """Get filters cache, building it if necessary."""
-    global _filters_cache
-    if _filters_cache is None:
-        _build_caches()
-    return _filters_cache
+def _build_caches():
+    """Load filters, metadata and leaderboard caches (built by whichever worker gets there first)."""
+    global _filters_cache, _reports_metadata_cache, _leaderboard_cache, _reports_cache_version, _reports_checked_at
+
+    version = _reports_source_version()
+    payload = shared_cache.get_or_build("reports", version, _compute_report_caches)
+
+    leaderboard = Leaderboard()
+    for report_data in payload["reports"]:
+        leaderboard.add(report_data)
+
+    _filters_cache = payload["filters"]
+    _reports_metadata_cache = payload["reports"]
+    _leaderboard_cache = leaderboard
+    _reports_cache_version = version
+    _reports_checked_at = time.monotonic()
+
+
+def _report_caches_fresh(cache: str) -> bool:
+    """True if the report caches are built and reports_html/ hasn't changed since."""
+    global _reports_checked_at
+    if _reports_metadata_cache is not None:
+        if time.monotonic() - _reports_checked_at < REPORTS_CACHE_CHECK_INTERVAL:
+            metrics.cache_lookup(cache, True)
+            return True
+        _reports_checked_at = time.monotonic()
+        if _reports_source_version() == _reports_cache_version:
+            metrics.cache_lookup(cache, True)
+            return True
+    metrics.cache_lookup(cache, False)
+    return False
+
+
+async def _ensure_report_caches_async(cache: str):
+    """
+    Build the report caches if missing, reload them if reports_html/ changed.
+    Builds run off the event loop, one per burst.
+    """
+    if not _report_caches_fresh(cache):
+        await single_flight.run("reports_index", _build_caches)
+
+
+def _report_sort_key(report: dict) -> tuple:
+    """Ascending key matching the newest-first order of the reports cache."""
+    return tuple(-part for part in parse_report_date_from_filename(Path(report.get('filename', ''))))
 
 
-def _get_reports_cache():
-    """Get reports metadata cache, building it if necessary."""
-    global _reports_metadata_cache
+def add_report_to_caches(report: dict):
+    """
+    Add (or replace) one report in the built caches without a rebuild, and
+    publish the result so other workers load it instead of rebuilding.
+    Caches that have not been built yet pick the report up when they are.
+    """
+    global _reports_cache_version
     if _reports_metadata_cache is None:
-        _build_caches()
+        return
+    report = {k: v for k, v in report.items() if k != 'questions'}
+
+    for i, existing in enumerate(_reports_metadata_cache):
+        if existing['id'] == report['id']:
+            del _reports_metadata_cache[i]
+            _leaderboard_cache.remove(existing)
+            break
+    bisect.insort(_reports_metadata_cache, report, key=_report_sort_key)
+    _leaderboard_cache.add(report)
+
+    chunks = report.get('server_config', {}).get('rag_chunks_number')
+    for name, value in (("models", report.get('model')), ("chunks", chunks), ("games", report.get('game'))):
+        if value and value not in _filters_cache[name]:
+            bisect.insort(_filters_cache[name], value)
+
+    _reports_cache_version = _reports_source_version()
+    shared_cache.put("reports", _reports_cache_version, {"reports": _reports_metadata_cache, "filters": _filters_cache})
+
+
+async def _load_filters_cache():
+    await _ensure_report_caches_async("filters")
+    return _filters_cache
+
+
+async def _load_reports_cache():
+    await _ensure_report_caches_async("reports_metadata")
     return _reports_metadata_cache
 
 
+async def _load_leaderboard_cache():
+    await _ensure_report_caches_async("leaderboard")
+    return _leaderboard_cache
+
+
 def invalidate_cache():
-    """Invalidate caches - call when reports are added/removed."""
-    global _filters_cache, _reports_metadata_cache
+    """Drop this worker's report caches; they are reloaded (or rebuilt if stale) on next use."""
+    global _filters_cache, _reports_metadata_cache, _leaderboard_cache, _reports_cache_version
     _filters_cache = None
     _reports_metadata_cache = None
+    _leaderboard_cache = None
+    _reports_cache_version = None
 
 
 @app.get("/api/filters")
 async def get_filters():
     """Get all unique filter values (models, chunks) from all reports."""
-    return _get_filters_cache()
+    return await _load_filters_cache()
+
+
+@app.get("/api/leaderboard")
+async def get_leaderboard(
+    group_by: str = "model",
+    game: Optional[str] = None,
+    chunks: Optional[int] = None,
+    series: bool = False,
+    min_runs: int = 1
+):
+    """
+    Model leaderboard from the running report aggregates.
+    group_by=model: one row per model; group_by=config: per model, game and rag_chunks_number.
+    series=true adds each group's score over time.
+    """
+    if group_by not in ("model", "config"):
+        raise HTTPException(status_code=400, detail="group_by must be 'model' or 'config'")
+    rows = (await _load_leaderboard_cache()).rows(group_by, game, chunks, series)
+    rows = [row for row in rows if row["runs"] >= min_runs]
+    return {"group_by": group_by, "leaderboard": rows, "total": len(rows)}
 
 
 @app.get("/api/reports")
@@ -306,7 +1159,7 @@ async def get_reports(
     game: Optional[str] = None
 ):
     """Get list of reports with pagination and server-side filtering."""
-    all_reports = _get_reports_cache()
+    all_reports = await _load_reports_cache()
 
     # Apply filters
     filtered = all_reports
@@ -354,7 +1207,7 @@ async def compare_reports(ids: str):
                     break
 
         if filepath.exists():
-            report_data = parse_html_report(filepath)
+            report_data = load_report(filepath)
             reports_with_questions.append(report_data)
             # Keep a copy without questions for response
             report_copy = {k: v for k, v in report_data.items() if k != 'questions'}
@@ -411,7 +1264,31 @@ async def get_report(report_id: str):
     if not filepath.exists():
         raise HTTPException(status_code=404, detail="Report not found")
 
-    return parse_html_report(filepath)
+    return load_report(filepath)
+
+
+@app.post("/api/reports/upload")
+async def upload_report(request: Request, file: UploadFile = File(...)):
+    """Add an HTML report (admin only): stores it, ingests its sidecar and refreshes the caches."""
+    _require_admin(request)
+    filename = Path(file.filename or "").name
+    if not filename.endswith(".html"):
+        raise HTTPException(status_code=400, detail="Expected an .html report")
+
+    filepath = REPORTS_DIR / filename
+    content = await file.read()
+    # Parse before saving, so a broken upload never lands in (or replaces a report in) reports_html/
+    try:
+        report = await asyncio.to_thread(_extract_report_data, filepath, content.decode('utf-8'))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse report: {e}")
+    with open(filepath, 'wb') as f:
+        f.write(content)
+
+    await asyncio.to_thread(_write_sidecar, filepath, _report_source(filepath), report)
+    add_report_to_caches(report)
+    await asyncio.to_thread(index_report_for_search, filepath, report)
+    return {k: v for k, v in report.items() if k != 'questions'}
 
 
 # Serve static HTML reports
@@ -424,6 +1301,23 @@ async def serve_report(filename: str):
     return FileResponse(filepath, media_type="text/html")
 
 
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    """
+    Prometheus metrics (admin only): latency histograms, phase times, cache hits, WebSockets.
+    Every series carries a `worker` label; the other workers are read from the worker board.
+    """
+    _require_admin(request)
+    state = metrics.state()
+    try:
+        states = await asyncio.to_thread(worker_board.metrics_states, state)
+    except sqlite3.Error as e:
+        print(f"Worker board unavailable, reporting this worker only: {e}")
+        states = {}
+    states.setdefault(worker_id(), state)
+    return PlainTextResponse(Metrics.render(states), media_type="text/plain; version=0.0.4")
+
+
 # Health check for Render (supports both GET and HEAD for UptimeRobot)
 @app.head("/health")
 @app.get("/health")
@@ -432,122 +1326,1236 @@ async def health_check():
 
 
 # ============================================================
-# COVERAGE MAP API
+# FULL-TEXT SEARCH - report Q&A and coverage model answers
 # ============================================================
 
-COVERAGE_DATA_DIR = BASE_DIR / "coverage_data"
+# SQLite FTS5 index. Each source (one report, or coverage_results.json) is
+# stamped with the version it was indexed from, so a sync only reindexes
+# sources that changed.
+SEARCH_DB_PATH = BASE_DIR / "search_data" / "search.db"
+SEARCH_SYNC_INTERVAL = 5.0  # seconds between checks for changed sources
+SEARCH_SCHEMA_VERSION = 2  # bump to rebuild the index (it is derived data)
+# Counting stops at this many matches, so a very common term stays cheap; above it total is capped.
+# Ranking always covers every match (FTS5 keeps only the top offset+limit).
+SEARCH_MAX_CANDIDATES = 1000
+SEARCH_RANK = "bm25(2.0, 1.0)"  # questions weigh more than answers
+# Snippet highlight markers: control characters that never occur in report text,
+# swapped for <mark> tags after the snippet is HTML-escaped
+SNIPPET_OPEN, SNIPPET_CLOSE = "\x02", "\x03"
+COVERAGE_SEARCH_SOURCE = "coverage"
+
+_search_db_ready = False
+_search_synced_at = 0.0
+_search_sync_lock = threading.Lock()
+
+
+def _search_db() -> sqlite3.Connection:
+    global _search_db_ready
+    SEARCH_DB_PATH.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(SEARCH_DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if not _search_db_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SEARCH_SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS search_entries; DROP TABLE IF EXISTS search_sources;")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_sources (
+                source TEXT PRIMARY KEY,
+                version TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_entries USING fts5(
+                question, answer,
+                source UNINDEXED, kind UNINDEXED, ref UNINDEXED, model UNINDEXED,
+                game UNINDEXED, date UNINDEXED, score UNINDEXED, question_index UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+        """)
+        conn.execute(f"PRAGMA user_version = {SEARCH_SCHEMA_VERSION}")
+        # ORDER BY rank then uses the weighted bm25 and FTS5's top-k sort
+        conn.execute("INSERT INTO search_entries (search_entries, rank) VALUES ('rank', ?)", (SEARCH_RANK,))
+        conn.commit()
+        _search_db_ready = True
+    return conn
+
+
+def _report_search_version(filepath: Path) -> str:
+    stat = filepath.stat()
+    return f"{REPORT_SIDECAR_VERSION}_{stat.st_mtime_ns}_{stat.st_size}"
+
+
+def _index_report(conn: sqlite3.Connection, report: dict, version: str):
+    source = f"report:{report['id']}"
+    conn.execute("DELETE FROM search_entries WHERE source = ?", (source,))
+    conn.executemany(
+        "INSERT INTO search_entries (question, answer, source, kind, ref, model, game, date, score, question_index) "
+        "VALUES (?, ?, ?, 'report', ?, ?, ?, ?, ?, ?)",
+        [
+            (q.get('question', ''), q.get('answer', ''), source, report['id'], report.get('model'),
+             report.get('game'), report.get('date'), q.get('score'), i + 1)
+            for i, q in enumerate(report.get('questions', []))
+        ]
+    )
+    conn.execute("INSERT OR REPLACE INTO search_sources (source, version) VALUES (?, ?)", (source, version))
+
+
+def _index_coverage(conn: sqlite3.Connection, coverage: dict, version: str):
+    conn.execute("DELETE FROM search_entries WHERE source = ?", (COVERAGE_SEARCH_SOURCE,))
+    conn.executemany(
+        "INSERT INTO search_entries (question, answer, source, kind, ref, model, game, date, score, question_index) "
+        "VALUES (?, ?, ?, 'coverage', ?, ?, NULL, ?, ?, NULL)",
+        [
+            (result.get('question', ''), result.get('model_answer', ''), COVERAGE_SEARCH_SOURCE, chunk_id,
+             result.get('model_tested'), result.get('test_date'), result.get('llm_score'))
+            for chunk_id, result in coverage.get('results', {}).items()
+        ]
+    )
+    conn.execute("INSERT OR REPLACE INTO search_sources (source, version) VALUES (?, ?)",
+                 (COVERAGE_SEARCH_SOURCE, version))
+
+
+def index_report_for_search(filepath: Path, report: dict):
+    """Index (or reindex) one report right away, e.g. after an upload."""
+    conn = _search_db()
+    try:
+        with conn:
+            _index_report(conn, report, _report_search_version(filepath))
+    finally:
+        conn.close()
 
 
-def load_coverage_data(filename: str) -> dict:
-    """Load a coverage data file."""
-    filepath = COVERAGE_DATA_DIR / filename
-    if filepath.exists():
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+def sync_search_index(force: bool = False) -> dict:
+    """Reindex new or changed reports and coverage results, drop removed reports."""
+    global _search_synced_at
+    with _search_sync_lock:
+        if not force and time.monotonic() - _search_synced_at < SEARCH_SYNC_INTERVAL:
+            return {}
+        counts = {"reports_indexed": 0, "reports_removed": 0, "coverage_indexed": False}
+        conn = _search_db()
+        try:
+            indexed = {row["source"]: row["version"] for row in conn.execute("SELECT source, version FROM search_sources")}
+
+            current = set()
+            for filepath in REPORTS_DIR.glob("*.html"):
+                source = f"report:{filepath.stem}"
+                current.add(source)
+                version = _report_search_version(filepath)
+                if indexed.get(source) != version:
+                    with conn:
+                        _index_report(conn, load_report(filepath), version)
+                    counts["reports_indexed"] += 1
+
+            for source in indexed:
+                if source.startswith("report:") and source not in current:
+                    with conn:
+                        conn.execute("DELETE FROM search_entries WHERE source = ?", (source,))
+                        conn.execute("DELETE FROM search_sources WHERE source = ?", (source,))
+                    counts["reports_removed"] += 1
+
+            if coverage_store.exists():
+                snapshot = load_coverage_results()
+                version = f"generation:{snapshot.generation}"
+                if indexed.get(COVERAGE_SEARCH_SOURCE) != version:
+                    with conn:
+                        _index_coverage(conn, snapshot.document(), version)
+                    counts["coverage_indexed"] = True
+        finally:
+            conn.close()
+        _search_synced_at = time.monotonic()
+        return counts
+
+
+def _fts_query(text: str) -> str:
+    """
+    User text -> FTS5 query: every word must match, the last one as a prefix
+    (from 2 characters, which the prefix index covers - a 1-letter prefix
+    would expand to a large part of the vocabulary).
+    """
+    words = re.findall(r"\w+", text, re.UNICODE)
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words[:-1]]
+    terms.append(f'"{words[-1]}"*' if len(words[-1]) >= 2 else f'"{words[-1]}"')
+    return " AND ".join(terms)
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet, then turn its highlight markers into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_OPEN, "<mark>").replace(SNIPPET_CLOSE, "</mark>")
+
+
+def _run_search(query: str, kind: Optional[str], model: Optional[str], game: Optional[str],
+                offset: int, limit: int) -> tuple:
+    """(total, total_capped, rows) for one page of matches in rank order, with their snippets."""
+    where = ["search_entries MATCH ?"]
+    params = [query]
+    for column, value in (("kind", kind), ("model", model), ("game", game)):
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    where_sql = " AND ".join(where)
+
+    conn = _search_db()
+    try:
+        matches = conn.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM search_entries WHERE {where_sql} LIMIT ?)",
+                               params + [SEARCH_MAX_CANDIDATES + 1]).fetchone()[0]
+        rows = conn.execute(
+            f"""SELECT kind, ref, model, game, date, score, question_index, question, answer,
+                       snippet(search_entries, 1, ?, ?, '…', 24) AS snippet, rank
+                FROM search_entries WHERE {where_sql} ORDER BY rank LIMIT ? OFFSET ?""",
+            [SNIPPET_OPEN, SNIPPET_CLOSE] + params + [limit, offset]
+        ).fetchall()
+    finally:
+        conn.close()
+    return min(matches, SEARCH_MAX_CANDIDATES), matches > SEARCH_MAX_CANDIDATES, rows
 
 
-@app.get("/coverage")
-async def coverage_page():
-    """Serve the coverage map page."""
-    coverage_path = BASE_DIR / "coverage.html"
-    if coverage_path.exists():
-        return FileResponse(coverage_path)
-    # Fallback to inline HTML if file doesn't exist
-    return HTMLResponse(content="""
-    <html>
-    <head><title>Coverage Map - Coming Soon</title></head>
-    <body style="background:#1a1a2e;color:white;font-family:sans-serif;text-align:center;padding:50px;">
-        <h1>Coverage Map</h1>
-        <p>Coverage visualization coming soon...</p>
-        <p><a href="/" style="color:#00ff00;">Back to Dashboard</a></p>
-    </body>
-    </html>
-    """)
+@app.get("/api/search")
+async def search(
+    q: str,
+    offset: int = 0,
+    limit: int = 20,
+    kind: Optional[str] = None,
+    model: Optional[str] = None,
+    game: Optional[str] = None,
+    full: bool = False
+):
+    """
+    Ranked full-text search over report questions/answers and coverage model answers.
+    kind: "report" or "coverage". Questions weigh more than answers in the ranking.
+    full=true returns whole answers instead of highlighted snippets.
+    Over SEARCH_MAX_CANDIDATES matches, total stops counting and
+    total_capped is set; ranking still covers every match.
+    """
+    query = _fts_query(q)
+    if not query:
+        raise HTTPException(status_code=400, detail="Empty search query")
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    await single_flight.run("search_sync", sync_search_index)
+    total, capped, rows = await asyncio.to_thread(_run_search, query, kind, model, game, offset, limit)
 
+    results = []
+    for row in rows:
+        result = {
+            "kind": row["kind"],
+            "report_id" if row["kind"] == "report" else "chunk_id": row["ref"],
+            "model": row["model"],
+            "game": row["game"],
+            "date": row["date"],
+            "score": row["score"],
+            "question_index": row["question_index"],
+            "question": row["question"],
+            "rank": round(-row["rank"], 4)
+        }
+        if full:
+            result["answer"] = row["answer"]
+        else:
+            result["snippet"] = _highlight(row["snippet"])
+        results.append(result)
 
-@app.get("/api/coverage")
-async def get_coverage():
-    """Get coverage results."""
-    return load_coverage_data("coverage_results.json")
+    return {"query": q, "results": results, "total": total, "total_capped": capped, "has_more": offset + limit < total}
 
 
-@app.get("/api/coverage/stats")
-async def get_coverage_stats():
-    """Get coverage statistics summary."""
-    coverage = load_coverage_data("coverage_results.json")
-    index = load_coverage_data("chunks_index.json")
+# ============================================================
+# ADMIN: SAMPLING PROFILER
+# ============================================================
 
-    if not coverage and not index:
-        return {
-            "overall": {
-                "total_chunks": 0,
-                "tested_chunks": 0,
-                "coverage_percent": 0,
-                "rag_accuracy": 0,
-                "llm_avg_score": 0
-            },
-            "by_category": {},
-            "last_updated": None
-        }
+# Admin endpoints are disabled unless ADMIN_TOKEN is set; clients send it as X-Admin-Token
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
 
-    # Build category stats
-    category_stats = {}
-    results = coverage.get("results", {})
-    chunks = index.get("chunks", {})
+PROFILER_MAX_SECONDS = 120  # hard cap on a profiling window
+PROFILER_MIN_INTERVAL_MS = 1
 
-    for chunk_id, chunk_info in chunks.items():
-        category = chunk_info.get("category", "Other")
-        if category not in category_stats:
-            category_stats[category] = {
-                "total": 0,
-                "tested": 0,
-                "rag_found": 0
-            }
 
-        category_stats[category]["total"] += 1
+def _require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    token = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
-        if chunk_id in results:
-            result = results[chunk_id]
-            category_stats[category]["tested"] += 1
-            if result.get("rag_found_chunk", False):
-                category_stats[category]["rag_found"] += 1
 
-    # Calculate percentages
-    for cat, stats in category_stats.items():
-        stats["coverage_percent"] = round(
-            (stats["tested"] / stats["total"]) * 100, 2
-        ) if stats["total"] > 0 else 0
-        stats["rag_accuracy"] = round(
-            (stats["rag_found"] / stats["tested"]) * 100, 2
-        ) if stats["tested"] > 0 else 0
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
 
-    return {
-        "overall": {
-            "total_chunks": coverage.get("total_chunks", index.get("total_chunks", 0)),
-            "tested_chunks": coverage.get("tested_chunks", 0),
-            "coverage_percent": coverage.get("coverage_percent", 0),
-            "rag_accuracy": coverage.get("rag_accuracy", 0),
-            "llm_avg_score": coverage.get("llm_avg_score", 0)
-        },
-        "by_category": category_stats,
-        "last_updated": coverage.get("last_updated")
-    }
 
+class SamplingProfiler:
+    """
+    Pure-Python stack sampler: a background thread snapshots every thread's
+    stack (sys._current_frames) at a fixed interval for a bounded window and
+    aggregates them into flame-graph collapsed stacks ("a;b;c count").
+    The window always ends on its own, even if nobody calls stop().
+    """
 
-@app.get("/api/coverage/chunks")
-async def get_chunks_index():
-    """Get chunks index."""
-    return load_coverage_data("chunks_index.json")
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.stacks = {}
+        self.samples = 0
+        self.started_at = None
+        self.finished_at = None
+        self.seconds = 0.0
+        self.interval = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, seconds: float, interval: float) -> bool:
+        """Start a profiling window; False if one is already running."""
+        with self.lock:
+            if self.running:
+                return False
+            self.stacks = {}
+            self.samples = 0
+            self.seconds = seconds
+            self.interval = interval
+            self.started_at = datetime.now().isoformat()
+            self.finished_at = None
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self.thread.start()
+            return True
+
+    def stop(self):
+        self.stop_event.set()
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + self.seconds
+        try:
+            while time.monotonic() < deadline and not self.stop_event.wait(self.interval):
+                for thread in threading.enumerate():
+                    names[thread.ident] = thread.name
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                    key = ";".join(reversed(stack))
+                    self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+        finally:
+            self.finished_at = datetime.now().isoformat()
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one "frame;frame;frame count" line per unique stack."""
+        stacks = dict(self.stacks)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": self.seconds,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "unique_stacks": len(self.stacks)
+        }
 
 
-@app.get("/api/coverage/tree")
-async def get_coverage_tree():
-    """Get coverage data as a tree structure for visualization."""
-    coverage = load_coverage_data("coverage_results.json")
-    index = load_coverage_data("chunks_index.json")
+profiler = SamplingProfiler()
+
+
+# Workers coordinate through the shared cache database: a profiling window
+# opened through any worker is picked up by every worker within
+# WORKER_SYNC_INTERVAL, each stores its own stacks when the window ends, and
+# /metrics renders every worker that published recently.
+WORKER_SYNC_INTERVAL = 1.0  # seconds between checks for profiling windows
+WORKER_METRICS_INTERVAL = 5.0  # seconds between metrics publications
+WORKER_STALE_AFTER = 60.0  # workers silent for longer are dropped from /metrics
+
+
+class WorkerBoard:
+    """Profiling windows, per-worker profiles and per-worker metrics in SQLite."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._ready = False
+        self.seen_window = None  # last window this worker picked up
+        self.profiling_window = None  # window the local profiler is sampling for
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS worker_metrics (
+                    worker TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL,
+                    state TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS profiler_windows (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_at REAL NOT NULL,
+                    seconds REAL NOT NULL,
+                    interval REAL NOT NULL,
+                    stopped INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS profiler_results (
+                    window_id INTEGER NOT NULL,
+                    worker TEXT NOT NULL,
+                    samples INTEGER NOT NULL,
+                    finished_at TEXT,
+                    stacks TEXT NOT NULL,
+                    PRIMARY KEY (window_id, worker)
+                );
+            """)
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def _latest_window(conn):
+        return conn.execute("SELECT * FROM profiler_windows ORDER BY id DESC LIMIT 1").fetchone()
+
+    @staticmethod
+    def _window_open(window) -> bool:
+        return (window is not None and not window["stopped"]
+                and time.time() < window["started_at"] + window["seconds"])
+
+    def _live_states(self, conn) -> dict:
+        rows = conn.execute("SELECT worker, state FROM worker_metrics WHERE updated_at >= ? ORDER BY worker",
+                            (time.time() - WORKER_STALE_AFTER,)).fetchall()
+        return {row["worker"]: json.loads(row["state"]) for row in rows}
+
+    def sync(self, state: Optional[dict] = None):
+        """
+        Follow the latest profiling window with the local profiler, store this
+        worker's stacks once its part of the window is over, and publish
+        `state` (Metrics.state()) when given.
+        """
+        conn = self._connect()
+        try:
+            window = self._latest_window(conn)
+            if window is not None and window["id"] != self.seen_window:
+                self.seen_window = window["id"]
+                if self._window_open(window):
+                    remaining = window["started_at"] + window["seconds"] - time.time()
+                    if profiler.start(remaining, window["interval"]):
+                        self.profiling_window = window["id"]
+            if window is not None and window["stopped"] and profiler.running:
+                profiler.stop()
+            if self.profiling_window is not None and not profiler.running:
+                conn.execute("INSERT OR REPLACE INTO profiler_results (window_id, worker, samples, finished_at, stacks) "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             (self.profiling_window, worker_id(), profiler.samples, profiler.finished_at,
+                              json.dumps(profiler.stacks)))
+                self.profiling_window = None
+            if state is not None:
+                conn.execute("INSERT OR REPLACE INTO worker_metrics (worker, updated_at, state) VALUES (?, ?, ?)",
+                             (worker_id(), time.time(), json.dumps(state)))
+        finally:
+            conn.close()
+
+    def metrics_states(self, state: dict) -> dict:
+        """Publish this worker's `state`, then {worker: state} for every live worker."""
+        self.sync(state)
+        conn = self._connect()
+        try:
+            return self._live_states(conn)
+        finally:
+            conn.close()
 
-    results = coverage.get("results", {})
+    def retire(self):
+        """Drop this worker's metrics (on shutdown)."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM worker_metrics WHERE worker = ?", (worker_id(),))
+        finally:
+            conn.close()
+
+    def start_window(self, seconds: float, interval: float) -> bool:
+        """Open a profiling window for every worker; False if one is already open."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._window_open(self._latest_window(conn)):
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute("INSERT INTO profiler_windows (started_at, seconds, interval) VALUES (?, ?, ?)",
+                             (time.time(), seconds, interval))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        self.sync()
+        return True
+
+    def stop_window(self):
+        """End the latest window early; the other workers stop at their next sync."""
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE profiler_windows SET stopped = 1 WHERE id = (SELECT MAX(id) FROM profiler_windows)")
+        finally:
+            conn.close()
+        self.sync()
+
+    def _window_results(self, conn, window) -> list:
+        if window is None:
+            return []
+        return conn.execute("SELECT * FROM profiler_results WHERE window_id = ? ORDER BY worker",
+                            (window["id"],)).fetchall()
+
+    def status(self) -> dict:
+        conn = self._connect()
+        try:
+            window = self._latest_window(conn)
+            results = self._window_results(conn, window)
+            workers = len(self._live_states(conn))
+        finally:
+            conn.close()
+        stacks = set()
+        for row in results:
+            stacks.update(f"{row['worker']};{stack}" for stack in json.loads(row["stacks"]))
+        return {
+            "running": self._window_open(window),
+            "started_at": datetime.fromtimestamp(window["started_at"]).isoformat() if window else None,
+            "finished_at": max((row["finished_at"] or "" for row in results), default=None) or None,
+            "seconds": window["seconds"] if window else 0.0,
+            "interval_ms": round(window["interval"] * 1000, 3) if window else 0.0,
+            "workers": workers,
+            "workers_reported": len(results),
+            "samples": sum(row["samples"] for row in results),
+            "unique_stacks": len(stacks)
+        }
+
+    def collapsed(self) -> str:
+        """Collapsed stacks of the latest window from every worker, rooted at the worker id."""
+        conn = self._connect()
+        try:
+            results = self._window_results(conn, self._latest_window(conn))
+        finally:
+            conn.close()
+        stacks = {}
+        for row in results:
+            for stack, count in json.loads(row["stacks"]).items():
+                key = f"{row['worker']};{stack}"
+                stacks[key] = stacks.get(key, 0) + count
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+worker_board = WorkerBoard(SHARED_CACHE_PATH)
+
+
+async def _run_worker_sync():
+    published = 0.0
+    while True:
+        state = None
+        if time.monotonic() - published >= WORKER_METRICS_INTERVAL:
+            state = metrics.state()
+            published = time.monotonic()
+        try:
+            await asyncio.to_thread(worker_board.sync, state)
+        except Exception as e:
+            print(f"Worker sync failed: {e}")
+        await asyncio.sleep(WORKER_SYNC_INTERVAL)
+
+
+_worker_sync_task = None  # held so the sync loop is not garbage-collected
+
+
+@app.on_event("startup")
+async def start_worker_sync():
+    """Join the worker board: follow profiling windows and publish metrics."""
+    global _worker_sync_task
+    _worker_sync_task = asyncio.create_task(_run_worker_sync())
+
+
+@app.on_event("shutdown")
+async def stop_worker_sync():
+    if _worker_sync_task is not None:
+        _worker_sync_task.cancel()
+    await asyncio.to_thread(profiler.stop)
+    await asyncio.to_thread(worker_board.retire)
+
+
+@app.post("/api/admin/profiler/start")
+async def start_profiler(request: Request, seconds: float = 30, interval_ms: float = 10):
+    """
+    Start sampling all threads of every worker for `seconds` (capped at PROFILER_MAX_SECONDS).
+    Fetch the result from /api/admin/profiler/collapsed once the window ends.
+    """
+    _require_admin(request)
+    seconds = max(0.1, min(seconds, PROFILER_MAX_SECONDS))
+    interval_ms = max(interval_ms, PROFILER_MIN_INTERVAL_MS)
+    if not await asyncio.to_thread(worker_board.start_window, seconds, interval_ms / 1000):
+        raise HTTPException(status_code=409, detail="Profiler is already running")
+    return await asyncio.to_thread(worker_board.status)
+
+
+@app.post("/api/admin/profiler/stop")
+async def stop_profiler(request: Request):
+    """End the current profiling window early."""
+    _require_admin(request)
+    await asyncio.to_thread(worker_board.stop_window)
+    return await asyncio.to_thread(worker_board.status)
+
+
+@app.get("/api/admin/profiler")
+async def get_profiler_status(request: Request):
+    _require_admin(request)
+    return await asyncio.to_thread(worker_board.status)
+
+
+@app.get("/api/admin/profiler/collapsed")
+async def get_profiler_collapsed(request: Request):
+    """
+    Collapsed stacks of the last window (flamegraph.pl / speedscope input), one
+    root frame per worker. Workers store their stacks within WORKER_SYNC_INTERVAL
+    of the window ending.
+    """
+    _require_admin(request)
+    status = await asyncio.to_thread(worker_board.status)
+    if status["running"]:
+        raise HTTPException(status_code=409, detail="Profiler is still running")
+    if not status["samples"]:
+        raise HTTPException(status_code=404, detail="No profile recorded")
+    filename = f"profile_{(status['started_at'] or '').replace(':', '-')}.collapsed"
+    return PlainTextResponse(await asyncio.to_thread(worker_board.collapsed), headers={
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    })
+
+
+# ============================================================
+# PROGRESS HISTORY - delta-encoded per-chunk status changes
+# ============================================================
+
+# Server settings worth tracking across checkpoints (the rest of server_config is noise here)
+HISTORY_CONFIG_KEYS = ("embedding_model_name", "rag_chunks_number", "rag_score_threshold", "rag_double_tower",
+                       "text_splitter_chunk_size", "text_splitter_chunk_overlap")
+
+
+class StatusHistory:
+    """
+    History kept next to a store's data, in the same transactions: one
+    checkpoint per generation (time, import/ingest/reimport, server config)
+    and one row per chunk whose (category, status, value) changed at it - or
+    whose result was dropped by an import. Any past state is rebuilt by
+    replaying the deltas, so no full copies of the data are kept.
+    """
+
+    def __init__(self, prefix: str, summarize):
+        self.prefix = prefix
+        self.summarize = summarize  # (counters, total_chunks or None) -> metrics
+        self._timelines = {}  # (generation, categories version, category, by_category) -> timeline
+
+    def schema(self) -> str:
+        p = self.prefix
+        return f"""
+            CREATE TABLE IF NOT EXISTS {p}_checkpoints (
+                generation INTEGER PRIMARY KEY,
+                recorded_at TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                total_chunks INTEGER,
+                config TEXT
+            );
+            CREATE TABLE IF NOT EXISTS {p}_history (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                generation INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL,
+                category TEXT,
+                status TEXT,
+                value REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_{p}_history_chunk ON {p}_history(chunk_id, seq);
+        """
+
+    def _latest(self, conn: sqlite3.Connection, chunk_ids=None) -> dict:
+        """chunk id -> its last recorded (category, status, value); removed chunks are left out."""
+        p = self.prefix
+        if chunk_ids is None:
+            rows = conn.execute(
+                f"SELECT h.chunk_id, h.category, h.status, h.value FROM {p}_history h "
+                f"JOIN (SELECT chunk_id, MAX(seq) AS seq FROM {p}_history GROUP BY chunk_id) last ON last.seq = h.seq"
+            )
+        else:
+            rows = (conn.execute(f"SELECT chunk_id, category, status, value FROM {p}_history "
+                                 f"WHERE chunk_id = ? ORDER BY seq DESC LIMIT 1", (chunk_id,)).fetchone()
+                    for chunk_id in chunk_ids)
+        return {row[0]: (row[1], row[2], row[3]) for row in rows if row is not None and row[2] is not None}
+
+    def record(self, conn: sqlite3.Connection, generation: int, kind: str, recorded_at: str,
+               total_chunks: Optional[int], config: Optional[dict], states: dict, replace: bool = False) -> int:
+        """
+        Checkpoint `generation` with the new state of the chunks in `states`
+        (chunk id -> (category, status, value)); with replace=True every chunk
+        missing from `states` is recorded as removed. Returns the delta count.
+        """
+        previous = self._latest(conn, None if replace else list(states))
+        changes = [(chunk_id, state) for chunk_id, state in states.items() if previous.get(chunk_id) != tuple(state)]
+        if replace:
+            changes += [(chunk_id, (category, None, None))
+                        for chunk_id, (category, _, _) in previous.items() if chunk_id not in states]
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.prefix}_checkpoints (generation, recorded_at, kind, total_chunks, config) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            (generation, recorded_at, kind, total_chunks,
+             json.dumps({k: config[k] for k in HISTORY_CONFIG_KEYS if k in config}) if config else None)
+        )
+        conn.executemany(
+            f"INSERT INTO {self.prefix}_history (generation, chunk_id, category, status, value) VALUES (?, ?, ?, ?, ?)",
+            [(generation, chunk_id, *state) for chunk_id, state in changes]
+        )
+        return len(changes)
+
+    @staticmethod
+    def _counters() -> dict:
+        return {"tested": 0, "value_sum": 0.0, "statuses": {}}
+
+    @staticmethod
+    def _apply(counters: dict, status: str, value, sign: int):
+        counters["tested"] += sign
+        counters["value_sum"] += sign * (value or 0)
+        counters["statuses"][status] = counters["statuses"].get(status, 0) + sign
+
+    def timeline(self, conn: sqlite3.Connection, generation, category: Optional[str] = None,
+                 by_category: bool = False, category_of=None, categories_version=None) -> list:
+        """
+        Metrics after every checkpoint (overall, one category, or per category),
+        replayed from the deltas. category_of(chunk id, recorded category) maps
+        chunks to the categories they belong to now (None: left out of the
+        categories); categories_version identifies that mapping for the cache.
+        """
+        key = (generation, categories_version, category, by_category)
+        if key in self._timelines:
+            return self._timelines[key]
+
+        p = self.prefix
+        checkpoints = conn.execute(f"SELECT * FROM {p}_checkpoints ORDER BY generation").fetchall()
+        deltas = conn.execute(f"SELECT generation, chunk_id, category, status, value FROM {p}_history ORDER BY seq")
+        delta = next(deltas, None)
+
+        state = {}  # chunk id -> (category, status, value)
+        overall, per_category = self._counters(), {}
+        timeline = []
+        for checkpoint in checkpoints:
+            changed = 0
+            while delta is not None and delta[0] <= checkpoint["generation"]:
+                _, chunk_id, cat, status, value = delta
+                if category_of is not None:
+                    cat = category_of(chunk_id, cat)
+                old = state.pop(chunk_id, None)
+                if old is not None:
+                    self._apply(overall, old[1], old[2], -1)
+                    if old[0] is not None:
+                        self._apply(per_category[old[0]], old[1], old[2], -1)
+                if status is not None:
+                    state[chunk_id] = (cat, status, value)
+                    self._apply(overall, status, value, 1)
+                    if cat is not None:
+                        self._apply(per_category.setdefault(cat, self._counters()), status, value, 1)
+                if not category or category in (cat, old and old[0]):
+                    changed += 1
+                delta = next(deltas, None)
+
+            point = {
+                "generation": checkpoint["generation"],
+                "recorded_at": checkpoint["recorded_at"],
+                "kind": checkpoint["kind"],
+                "config": json.loads(checkpoint["config"]) if checkpoint["config"] else None,
+                "changed_chunks": changed
+            }
+            if category:
+                point.update(self.summarize(per_category.get(category, self._counters()), None))
+            else:
+                point.update(self.summarize(overall, checkpoint["total_chunks"]))
+            if by_category:
+                point["categories"] = {cat: self.summarize(counters, None)
+                                       for cat, counters in sorted(per_category.items()) if counters["tested"]}
+            timeline.append(point)
+
+        if len(self._timelines) > 32:
+            self._timelines.clear()
+        self._timelines[key] = timeline
+        return timeline
+
+
+def _summarize_coverage(counters: dict, total_chunks: Optional[int]) -> dict:
+    tested = counters["tested"]
+    metrics = {
+        "tested_chunks": tested,
+        "rag_accuracy": round(counters["statuses"].get("rag_found", 0) / tested * 100, 2) if tested else 0,
+        "llm_avg_score": round(counters["value_sum"] / tested, 2) if tested else 0
+    }
+    if total_chunks is not None:
+        metrics["total_chunks"] = total_chunks
+        metrics["coverage_percent"] = round(tested / total_chunks * 100, 2) if total_chunks else 0
+    return metrics
+
+
+def _summarize_stability(counters: dict, total_chunks: Optional[int]) -> dict:
+    tested = counters["tested"]
+    metrics = {
+        "tested_chunks": tested,
+        "avg_stability": round(counters["value_sum"] / tested, 1) if tested else 0,
+        **{status: counters["statuses"].get(status, 0) for status in STABILITY_STATUSES}
+    }
+    if total_chunks is not None:
+        metrics["total_chunks"] = total_chunks
+    return metrics
+
+
+# ============================================================
+# COVERAGE MAP API
+# ============================================================
+
+COVERAGE_DATA_DIR = BASE_DIR / "coverage_data"
+
+
+def load_coverage_data(filename: str) -> dict:
+    """Load a coverage data file."""
+    filepath = COVERAGE_DATA_DIR / filename
+    if filepath.exists():
+        return read_json_file_cached(filepath)
+    return {}
+
+
+async def load_coverage_data_async(filename: str) -> dict:
+    """load_coverage_data for request handlers (parses off the event loop, coalesced)."""
+    filepath = COVERAGE_DATA_DIR / filename
+    if filepath.exists():
+        return await read_json_file_cached_async(filepath)
+    return {}
+
+
+COVERAGE_CHECK_INTERVAL = 2.0  # seconds between checks for results ingested by other workers
+
+
+class CoverageSnapshot:
+    """
+    Coverage results with running sums (overall and per category), so summary
+    fields never need a pass over all results. Never mutated once published:
+    ingestion applies upserts to a copy and swaps it in, so a reader holding
+    a snapshot sees one consistent state.
+
+    Categories come from chunks_index.json as it is now, not as it was when a
+    result was ingested: when the index changes, by_category is re-bucketed.
+    """
+
+    def __init__(self, generation=None, metadata: Optional[dict] = None):
+        self.generation = generation
+        self.metadata = metadata or {}
+        self.results = {}  # chunk id -> result
+        self.index_version = None  # chunks_index.json version the categories were resolved against
+        self.index_chunks = {}
+        self.categories = {}  # chunk id -> category the result is counted under (None: not in the index)
+        self.totals = {"tested": 0, "rag_found": 0, "llm_score_sum": 0.0}
+        self.by_category = {}  # category -> same counters as totals
+
+    def copy(self) -> "CoverageSnapshot":
+        snapshot = CoverageSnapshot(self.generation, dict(self.metadata))
+        snapshot.results = dict(self.results)
+        snapshot.index_version = self.index_version
+        snapshot.index_chunks = self.index_chunks
+        snapshot.categories = dict(self.categories)
+        snapshot.totals = dict(self.totals)
+        snapshot.by_category = {category: dict(counts) for category, counts in self.by_category.items()}
+        return snapshot
+
+    @staticmethod
+    def category_of(chunk_id: str, own_category: Optional[str], index_chunks: dict) -> Optional[str]:
+        """The index category of a chunk (None if it is not in the index); without an index, the result's own."""
+        if index_chunks:
+            chunk_info = index_chunks.get(chunk_id)
+            return chunk_info.get("category", "Other") if chunk_info is not None else None
+        return own_category or "Other"
+
+    @staticmethod
+    def _apply(counts: dict, result: dict, sign: int):
+        counts["tested"] += sign
+        counts["rag_found"] += sign if result.get("rag_found_chunk") else 0
+        counts["llm_score_sum"] += sign * (result.get("llm_score") or 0)
+
+    def _count(self, chunk_id: str, result: dict):
+        category = self.category_of(chunk_id, result.get("category"), self.index_chunks)
+        self.categories[chunk_id] = category
+        if category is not None:
+            self._apply(self.by_category.setdefault(category, {"tested": 0, "rag_found": 0, "llm_score_sum": 0.0}),
+                        result, 1)
+
+    def upsert(self, chunk_id: str, result: dict):
+        """Replace one chunk's result: O(1) - subtract the old contribution, add the new one."""
+        old = self.results.get(chunk_id)
+        if old is not None:
+            self._apply(self.totals, old, -1)
+            category = self.categories[chunk_id]
+            if category is not None:
+                self._apply(self.by_category[category], old, -1)
+        self.results[chunk_id] = result
+        self._apply(self.totals, result, 1)
+        self._count(chunk_id, result)
+
+    def recategorize(self, index_version, index_chunks: dict):
+        """Re-bucket by_category against another chunks_index.json (one pass, only when the index changes)."""
+        self.index_version = index_version
+        self.index_chunks = index_chunks
+        self.categories = {}
+        self.by_category = {}
+        for chunk_id, result in self.results.items():
+            self._count(chunk_id, result)
+
+    @staticmethod
+    def rates(counts: dict, total: Optional[int] = None) -> dict:
+        tested = counts["tested"]
+        rates = {
+            "rag_accuracy": round(counts["rag_found"] / tested * 100, 2) if tested else 0,
+            "llm_avg_score": round(counts["llm_score_sum"] / tested, 2) if tested else 0
+        }
+        if total is not None:
+            rates["coverage_percent"] = round(tested / total * 100, 2) if total else 0
+        return rates
+
+    def summary(self) -> dict:
+        """The top-level fields of coverage_results.json."""
+        total_chunks = self.metadata.get("total_chunks", 0)
+        return {
+            "last_updated": self.metadata.get("last_updated"),
+            "total_chunks": total_chunks,
+            "tested_chunks": self.totals["tested"],
+            **self.rates(self.totals, total_chunks)
+        }
+
+    def document(self) -> dict:
+        """coverage_results.json as it would look on disk."""
+        return {**self.summary(), "results": self.results}
+
+
+class CoverageStore:
+    """
+    Per-chunk coverage results in SQLite (one row per chunk, upserted), with
+    an in-memory CoverageSnapshot. Each row carries the generation that wrote
+    it, so other workers apply only the rows changed since their snapshot.
+
+    coverage_results.json is a full snapshot, so an import replaces the store -
+    results ingested through the API included. It is imported automatically
+    only into an empty store; after that, only on request (import_legacy, i.e.
+    ingest_coverage.py --import-legacy).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+        self.snapshot = CoverageSnapshot()
+        self.history = StatusHistory("coverage", _summarize_coverage)
+        self._checked_at = 0.0
+        self._ignored_legacy_version = None
+
+    @property
+    def legacy_path(self) -> Path:
+        return self.path.parent / "coverage_results.json"
+
+    def exists(self) -> bool:
+        return self.path.exists() or self.legacy_path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS coverage_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS coverage_results (
+                    chunk_id TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL,
+                    category TEXT NOT NULL,  -- as given with the result ('' if none); counted per the current index
+                    result TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_coverage_results_generation ON coverage_results(generation);
+            """)
+            conn.executescript(self.history.schema())
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str, default=None):
+        row = conn.execute("SELECT value FROM coverage_meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, key: str, value):
+        conn.execute("INSERT OR REPLACE INTO coverage_meta (key, value) VALUES (?, ?)",
+                     (key, json.dumps(value, ensure_ascii=False)))
+
+    def _write(self, conn: sqlite3.Connection, results: dict, metadata: dict, replace: bool, kind: str = "ingest") -> int:
+        """Upsert results and bump the generation, in the caller's transaction."""
+        generation = self._meta(conn, "generation", 0) + 1
+        if replace:
+            conn.execute("DELETE FROM coverage_results")
+            self._set_meta(conn, "replaced_generation", generation)
+        conn.executemany(
+            "INSERT OR REPLACE INTO coverage_results (chunk_id, generation, category, result) VALUES (?, ?, ?, ?)",
+            [(chunk_id, generation, result.get("category") or "", json.dumps(result, ensure_ascii=False))
+             for chunk_id, result in results.items()]
+        )
+        self.history.record(
+            conn, generation, kind, metadata.get("last_updated") or datetime.now().isoformat(),
+            metadata.get("total_chunks"), metadata.get("server_config"),
+            {chunk_id: (result.get("category") or "", "rag_found" if result.get("rag_found_chunk") else "rag_missed",
+                        result.get("llm_score"))
+             for chunk_id, result in results.items()},
+            replace=replace
+        )
+        self._set_meta(conn, "metadata", metadata)
+        self._set_meta(conn, "generation", generation)
+        return generation
+
+    def _import_legacy(self, conn: sqlite3.Connection, version: str, kind: str = "import"):
+        """Replace the store with the contents of coverage_results.json (checkpointed as `kind`)."""
+        coverage = read_json_file(self.legacy_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            metadata = {"total_chunks": coverage.get("total_chunks", 0), "last_updated": coverage.get("last_updated")}
+            self._write(conn, coverage.get("results", {}), metadata, replace=True, kind=kind)
+            self._set_meta(conn, "legacy_version", version)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def ingest(self, results: dict, total_chunks: Optional[int] = None, server_config: Optional[dict] = None) -> dict:
+        """Upsert per-chunk results (chunk id -> result) and return the new summary."""
+        self.refresh(force=True)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                metadata = self._meta(conn, "metadata", {})
+                metadata["last_updated"] = datetime.now().isoformat()
+                if total_chunks is not None:
+                    metadata["total_chunks"] = total_chunks
+                if server_config is not None:
+                    metadata["server_config"] = server_config
+                generation = self._write(conn, results, metadata, replace=False)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+        self.refresh(force=True)
+        return {"upserted": len(results), "generation": generation, **self.snapshot.summary()}
+
+    def timeline(self, category: Optional[str] = None, by_category: bool = False) -> list:
+        """Coverage metrics after every import/ingest, with categories from the current chunk index."""
+        self.refresh()
+        snapshot = self.snapshot
+        conn = self._connect()
+        try:
+            return self.history.timeline(
+                conn, snapshot.generation, category, by_category,
+                category_of=lambda chunk_id, own: CoverageSnapshot.category_of(chunk_id, own, snapshot.index_chunks),
+                categories_version=snapshot.index_version
+            )
+        finally:
+            conn.close()
+
+    def import_legacy(self):
+        """Replace the store (API-ingested results included) with the contents of coverage_results.json."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                with shared_cache.build_lock("coverage_import"):
+                    self._import_legacy(conn, _file_version(self.legacy_path), kind="reimport")
+            finally:
+                conn.close()
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False):
+        """Import coverage_results.json into an empty store and apply rows written since the current snapshot."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < COVERAGE_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if not self.exists():
+            return
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                if self.legacy_path.exists():
+                    if not self._meta(conn, "generation", 0):
+                        with shared_cache.build_lock("coverage_import"):
+                            if not self._meta(conn, "generation", 0):
+                                self._import_legacy(conn, _file_version(self.legacy_path))
+                    else:
+                        version = _file_version(self.legacy_path)
+                        if version not in (self._meta(conn, "legacy_version"), self._ignored_legacy_version):
+                            self._ignored_legacy_version = version
+                            print(f"{self.legacy_path.name} differs from what the store imported and was not "
+                                  f"re-imported (ingest_coverage.py --import-legacy replaces the store with it)")
+
+                current = self.snapshot
+                generation = self._meta(conn, "generation", 0)
+                if generation == current.generation:
+                    snapshot = current
+                else:
+                    if current.generation is None or self._meta(conn, "replaced_generation", 0) > current.generation:
+                        snapshot, since = CoverageSnapshot(), 0
+                        snapshot.index_version, snapshot.index_chunks = current.index_version, current.index_chunks
+                    else:
+                        snapshot, since = current.copy(), current.generation
+                    rows = conn.execute("SELECT chunk_id, result FROM coverage_results WHERE generation > ?", (since,))
+                    for row in rows:
+                        snapshot.upsert(row["chunk_id"], json.loads(row["result"]))
+                    snapshot.metadata = self._meta(conn, "metadata", {})
+                    snapshot.generation = generation
+            finally:
+                conn.close()
+
+            index_path = COVERAGE_DATA_DIR / "chunks_index.json"
+            index_version = _file_version(index_path) if index_path.exists() else None
+            if index_version != snapshot.index_version:
+                if snapshot is current:
+                    snapshot = current.copy()
+                snapshot.recategorize(index_version, load_coverage_data("chunks_index.json").get("chunks", {}))
+            self.snapshot = snapshot
+
+
+coverage_store = CoverageStore(COVERAGE_DATA_DIR / "coverage.db")
+
+
+def load_coverage_results() -> CoverageSnapshot:
+    """Current coverage results snapshot (coverage_results.json is only read when it changes)."""
+    coverage_store.refresh()
+    return coverage_store.snapshot
+
+
+async def load_coverage_results_async() -> CoverageSnapshot:
+    """load_coverage_results for request handlers (refreshes off the event loop, coalesced)."""
+    await single_flight.run("coverage_refresh", coverage_store.refresh)
+    return coverage_store.snapshot
+
+
+class CoverageIngestRequest(BaseModel):
+    results: dict[str, dict]  # chunk id -> result, same fields as coverage_results.json
+    total_chunks: Optional[int] = None
+    server_config: Optional[dict] = None
+
+
+@app.get("/coverage")
+async def coverage_page():
+    """Serve the coverage map page."""
+    coverage_path = BASE_DIR / "coverage.html"
+    if coverage_path.exists():
+        return FileResponse(coverage_path)
+    # Fallback to inline HTML if file doesn't exist
+    return HTMLResponse(content="""
+    <html>
+    <head><title>Coverage Map - Coming Soon</title></head>
+    <body style="background:#1a1a2e;color:white;font-family:sans-serif;text-align:center;padding:50px;">
+        <h1>Coverage Map</h1>
+        <p>Coverage visualization coming soon...</p>
+        <p><a href="/" style="color:#00ff00;">Back to Dashboard</a></p>
+    </body>
+    </html>
+    """)
+
+
+@app.get("/api/coverage")
+async def get_coverage():
+    """Get coverage results."""
+    snapshot = await load_coverage_results_async()
+    return snapshot.document() if snapshot.generation is not None else {}
+
+
+@app.post("/api/coverage/results")
+async def ingest_coverage_results(request: Request, payload: CoverageIngestRequest):
+    """Upsert per-chunk coverage results (admin only); returns the updated summary."""
+    _require_admin(request)
+    if not payload.results:
+        raise HTTPException(status_code=400, detail="No results to ingest")
+    return await asyncio.to_thread(coverage_store.ingest, payload.results, payload.total_chunks,
+                                   payload.server_config)
+
+
+@app.get("/api/coverage/stats")
+async def get_coverage_stats():
+    """Get coverage statistics summary (from running sums, no pass over the results)."""
+    snapshot = await load_coverage_results_async()
+    index = await load_coverage_data_async("chunks_index.json")
+
+    if snapshot.generation is None and not index:
+        return {
+            "overall": {
+                "total_chunks": 0,
+                "tested_chunks": 0,
+                "coverage_percent": 0,
+                "rag_accuracy": 0,
+                "llm_avg_score": 0
+            },
+            "by_category": {},
+            "last_updated": None
+        }
+
+    # Category totals come from the chunk index, tested/found counts from the running sums
+    category_totals = {}
+    for chunk_info in index.get("chunks", {}).values():
+        category = chunk_info.get("category", "Other")
+        category_totals[category] = category_totals.get(category, 0) + 1
+
+    category_stats = {}
+    for category in {**category_totals, **snapshot.by_category}:
+        counts = snapshot.by_category.get(category, {"tested": 0, "rag_found": 0, "llm_score_sum": 0.0})
+        total = category_totals.get(category, counts["tested"])
+        category_stats[category] = {
+            "total": total,
+            "tested": counts["tested"],
+            "rag_found": counts["rag_found"],
+            **CoverageSnapshot.rates(counts, total)
+        }
+
+    summary = snapshot.summary()
+    return {
+        "overall": {
+            "total_chunks": summary["total_chunks"] or index.get("total_chunks", 0),
+            "tested_chunks": summary["tested_chunks"],
+            "coverage_percent": summary["coverage_percent"],
+            "rag_accuracy": summary["rag_accuracy"],
+            "llm_avg_score": summary["llm_avg_score"]
+        },
+        "by_category": category_stats,
+        "last_updated": summary["last_updated"]
+    }
+
+
+@app.get("/api/coverage/chunks")
+async def get_chunks_index():
+    """Get chunks index."""
+    return await load_coverage_data_async("chunks_index.json")
+
+
+@app.get("/api/coverage/tree")
+async def get_coverage_tree():
+    """Get coverage data as a tree structure for visualization."""
+    snapshot = await load_coverage_results_async()
+    index = await load_coverage_data_async("chunks_index.json")
+
+    results = snapshot.results
+    summary = snapshot.summary()
     chunks = index.get("chunks", {})
 
     # Build tree: Category -> Article -> Chunks
@@ -602,24 +2610,180 @@ async def get_coverage_tree():
         "categories": list(tree.values()),
         "stats": {
             "total": index.get("total_chunks", 0),
-            "tested": coverage.get("tested_chunks", 0),
-            "coverage_percent": coverage.get("coverage_percent", 0),
-            "rag_accuracy": coverage.get("rag_accuracy", 0)
+            "tested": summary["tested_chunks"],
+            "coverage_percent": summary["coverage_percent"],
+            "rag_accuracy": summary["rag_accuracy"]
+        }
+    }
+
+
+COVERAGE_TREE_PAGE_SIZE = 100
+COVERAGE_CHUNK_STATUSES = ("rag_found", "rag_missed", "untested")
+
+
+class CoverageTreeIndex:
+    """
+    Category -> article -> chunk index over chunks_index.json and a coverage
+    snapshot, with stats on every node and each article's chunks split by
+    status, so any level of the tree (filtered and paged) costs O(children).
+    Rebuilt when either source changes.
+    """
+
+    def __init__(self, index: dict, snapshot: CoverageSnapshot):
+        self.index = index
+        self.snapshot = snapshot
+        self.categories = {}  # name -> {"name", "stats", "articles": {name -> article node}}
+
+        results = snapshot.results
+        for chunk_id, chunk_info in index.get("chunks", {}).items():
+            category_name = chunk_info.get("category", "Other")
+            article_name = chunk_info.get("article", "Unknown")
+            category = self.categories.setdefault(
+                category_name, {"name": category_name, "stats": self._stats(), "articles": {}}
+            )
+            article = category["articles"].setdefault(
+                article_name,
+                {"name": article_name, "stats": self._stats(), "chunks": [],
+                 "by_status": {status: [] for status in COVERAGE_CHUNK_STATUSES}}
+            )
+
+            result = results.get(chunk_id)
+            if result:
+                status = "rag_found" if result.get("rag_found_chunk") else "rag_missed"
+            else:
+                status = "untested"
+            for stats in (category["stats"], article["stats"]):
+                stats["total"] += 1
+                stats["tested"] += 1 if result else 0
+                stats[status] += 1
+
+            chunk = {
+                "id": chunk_id,
+                "status": status,
+                "preview": chunk_info.get("text_preview", "")[:100] if chunk_info.get("text_preview") else ""
+            }
+            article["chunks"].append(chunk)
+            article["by_status"][status].append(chunk)
+
+    @staticmethod
+    def _stats() -> dict:
+        return {"total": 0, "tested": 0, "rag_found": 0, "rag_missed": 0, "untested": 0}
+
+    @staticmethod
+    def _page(items: list, offset: int, limit: int) -> dict:
+        return {"total": len(items), "offset": offset, "limit": limit, "items": items[offset:offset + limit]}
+
+    def category_list(self) -> list:
+        return [{"name": category["name"], "stats": category["stats"], "articles": len(category["articles"])}
+                for category in self.categories.values()]
+
+    def article_page(self, category: str, status: Optional[str], offset: int, limit: int) -> Optional[dict]:
+        node = self.categories.get(category)
+        if node is None:
+            return None
+        articles = [article for article in node["articles"].values() if not status or article["stats"][status]]
+        page = self._page(articles, offset, limit)
+        page["items"] = [{"name": article["name"], "stats": article["stats"], "chunks": article["stats"]["total"]}
+                         for article in page["items"]]
+        return page
+
+    def chunk_page(self, category: str, article: str, status: Optional[str], offset: int, limit: int) -> Optional[dict]:
+        node = self.categories.get(category, {}).get("articles", {}).get(article)
+        if node is None:
+            return None
+        return self._page(node["by_status"][status] if status else node["chunks"], offset, limit)
+
+
+_coverage_tree = None
+
+
+def _build_coverage_tree(index: dict, snapshot: CoverageSnapshot) -> CoverageTreeIndex:
+    global _coverage_tree
+    tree = _coverage_tree
+    if tree is None or tree.index is not index or tree.snapshot is not snapshot:
+        tree = CoverageTreeIndex(index, snapshot)
+        _coverage_tree = tree
+    return tree
+
+
+async def _load_coverage_tree() -> CoverageTreeIndex:
+    """The coverage tree index for the current chunk index and results, rebuilt (once) when they change."""
+    snapshot = await load_coverage_results_async()
+    index = await load_coverage_data_async("chunks_index.json")
+    tree = _coverage_tree
+    if tree is None or tree.index is not index or tree.snapshot is not snapshot:
+        tree = await single_flight.run("coverage_tree", lambda: _build_coverage_tree(index, snapshot))
+    return tree
+
+
+def _tree_paging(status: Optional[str], offset: int, limit: int) -> tuple:
+    if status is not None and status not in COVERAGE_CHUNK_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(COVERAGE_CHUNK_STATUSES)}")
+    return max(0, offset), max(1, min(limit, 1000))
+
+
+@app.get("/api/coverage/tree/categories")
+async def get_coverage_tree_categories():
+    """First level of the coverage tree: categories with their stats (no articles or chunks)."""
+    tree = await _load_coverage_tree()
+    summary = tree.snapshot.summary()
+    return {
+        "categories": tree.category_list(),
+        "stats": {
+            "total": tree.index.get("total_chunks", 0),
+            "tested": summary["tested_chunks"],
+            "coverage_percent": summary["coverage_percent"],
+            "rag_accuracy": summary["rag_accuracy"]
         }
     }
 
 
+@app.get("/api/coverage/tree/articles")
+async def get_coverage_tree_articles(
+    category: str,
+    status: Optional[str] = None,
+    offset: int = 0,
+    limit: int = COVERAGE_TREE_PAGE_SIZE
+):
+    """Articles of one category with their stats; status keeps articles that have chunks in that status."""
+    offset, limit = _tree_paging(status, offset, limit)
+    tree = await _load_coverage_tree()
+    page = tree.article_page(category, status, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return {"category": category, "status": status, "total": page["total"], "offset": offset, "limit": limit,
+            "articles": page["items"]}
+
+
+@app.get("/api/coverage/tree/chunks")
+async def get_coverage_tree_chunks(
+    category: str,
+    article: str,
+    status: Optional[str] = None,
+    offset: int = 0,
+    limit: int = COVERAGE_TREE_PAGE_SIZE
+):
+    """Chunks of one article (id, status, preview), optionally only those in one status."""
+    offset, limit = _tree_paging(status, offset, limit)
+    tree = await _load_coverage_tree()
+    page = tree.chunk_page(category, article, status, offset, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return {"category": category, "article": article, "status": status, "total": page["total"],
+            "offset": offset, "limit": limit, "chunks": page["items"]}
+
+
 @app.get("/api/coverage/chunk/{chunk_id}")
 async def get_chunk_details(chunk_id: str):
     """Get details for a specific chunk."""
-    coverage = load_coverage_data("coverage_results.json")
-    index = load_coverage_data("chunks_index.json")
+    snapshot = await load_coverage_results_async()
+    index = await load_coverage_data_async("chunks_index.json")
 
     chunk_info = index.get("chunks", {}).get(chunk_id)
     if not chunk_info:
         raise HTTPException(status_code=404, detail="Chunk not found")
 
-    result = coverage.get("results", {}).get(chunk_id)
+    result = snapshot.results.get(chunk_id)
 
     return {
         "chunk": chunk_info,
@@ -653,18 +2817,15 @@ async def get_rag_tests():
 
     for filepath in sorted(RAG_TESTS_DIR.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                results.append(data)
+            results.append(read_json_file(filepath))
         except (json.JSONDecodeError, Exception) as e:
             print(f"Error loading {filepath}: {e}")
 
     return results
 
 
-@app.get("/api/rag-tests/{test_id}")
-async def get_rag_test_detail(test_id: str):
-    """Get details of a specific RAG test."""
+def _find_rag_test_file(test_id: str) -> Optional[Path]:
+    """RAG test file by name, or by a timestamp contained in the name."""
     filepath = RAG_TESTS_DIR / f"{test_id}.json"
     if not filepath.exists():
         # Try to find by timestamp
@@ -673,11 +2834,17 @@ async def get_rag_test_detail(test_id: str):
                 filepath = f
                 break
 
-    if not filepath.exists():
+    return filepath if filepath.exists() else None
+
+
+@app.get("/api/rag-tests/{test_id}")
+async def get_rag_test_detail(test_id: str):
+    """Get details of a specific RAG test."""
+    filepath = _find_rag_test_file(test_id)
+    if filepath is None:
         raise HTTPException(status_code=404, detail="RAG test not found")
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return read_json_file(filepath)
 
 
 @app.get("/api/server-config")
@@ -687,8 +2854,7 @@ async def get_server_config():
     if not config_path.exists():
         raise HTTPException(status_code=404, detail="Server config not found")
 
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return read_json_file(config_path)
 
 
 # ============================================================
@@ -720,13 +2886,12 @@ async def get_rag_dynamic_sessions():
             summary_file = session_dir / "summary.json"
             if summary_file.exists():
                 try:
-                    with open(summary_file, 'r', encoding='utf-8') as f:
-                        summary = json.load(f)
-                        sessions.append({
-                            "timestamp": session_dir.name,
-                            "questions_count": summary.get("questions_count", 0),
-                            "total_runs": summary.get("total_runs", 0)
-                        })
+                    summary = read_json_file(summary_file)
+                    sessions.append({
+                        "timestamp": session_dir.name,
+                        "questions_count": summary.get("questions_count", 0),
+                        "total_runs": summary.get("total_runs", 0)
+                    })
                 except (json.JSONDecodeError, Exception) as e:
                     print(f"Error loading {summary_file}: {e}")
 
@@ -746,8 +2911,8 @@ async def get_rag_dynamic_session(timestamp: str):
     if not summary_file.exists():
         raise HTTPException(status_code=404, detail="Session summary not found")
 
-    with open(summary_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Copy: the cached summary is shared by all requests
+    data = dict(await read_json_file_cached_async(summary_file, "rag_dynamic_summary"))
 
     # Check if runs folder exists (new format with lazy loading)
     runs_dir = session_dir / "runs"
@@ -757,9 +2922,8 @@ async def get_rag_dynamic_session(timestamp: str):
     if not data["has_lazy_runs"]:
         results_file = session_dir / "results.json"
         if results_file.exists():
-            with open(results_file, 'r', encoding='utf-8') as f:
-                results = json.load(f)
-                data["runs"] = results.get("runs", [])
+            results = await read_json_file_cached_async(results_file, "rag_dynamic_results")
+            data["runs"] = results.get("runs", [])
 
     return data
 
@@ -774,11 +2938,10 @@ async def get_rag_dynamic_run(timestamp: str, k: int, threshold: float):
         # Fallback: try to load from results.json
         results_file = session_dir / "results.json"
         if results_file.exists():
-            with open(results_file, 'r', encoding='utf-8') as f:
-                results = json.load(f)
-                for run in results.get("runs", []):
-                    if run["rag_chunks_number"] == k and run["rag_score_threshold"] == threshold:
-                        return run
+            results = await read_json_file_cached_async(results_file, "rag_dynamic_results")
+            for run in results.get("runs", []):
+                if run["rag_chunks_number"] == k and run["rag_score_threshold"] == threshold:
+                    return run
         raise HTTPException(status_code=404, detail="Run not found")
 
     # New format: load from individual file
@@ -786,8 +2949,178 @@ async def get_rag_dynamic_run(timestamp: str, k: int, threshold: float):
     if not run_file.exists():
         raise HTTPException(status_code=404, detail="Run file not found")
 
-    with open(run_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return await read_json_file_cached_async(run_file, "rag_dynamic_run")
+
+
+def _rag_dynamic_run_files(session_dir: Path) -> list:
+    """The files holding a session's runs: runs/*.json, or results.json for older sessions."""
+    return sorted(session_dir.glob("runs/*.json")) or sorted(session_dir.glob("results.json"))
+
+
+def load_rag_dynamic_runs(session_dir: Path) -> list:
+    """All runs of a session, from either layout."""
+    runs_dir = session_dir / "runs"
+    if runs_dir.exists():
+        return [read_json_file(filepath) for filepath in sorted(runs_dir.glob("*.json"))]
+    results_file = session_dir / "results.json"
+    if results_file.exists():
+        return read_json_file(results_file).get('runs', [])
+    return []
+
+
+# Found-matrices per session, rebuilt when the session's run files change
+_found_matrix_cache = {}  # session -> (version, FoundMatrix)
+
+
+def _session_found_matrix(session_dir: Path) -> Optional[FoundMatrix]:
+    files = _rag_dynamic_run_files(session_dir)
+    if not files:
+        return None
+    version = _file_version(*files)
+    cached = _found_matrix_cache.get(session_dir.name)
+    metrics.cache_lookup("rag_found_matrix", cached is not None and cached[0] == version)
+    if cached is None or cached[0] != version:
+        matrix = FoundMatrix.from_runs(load_rag_dynamic_runs(session_dir))
+        cached = _found_matrix_cache[session_dir.name] = (version, matrix)
+    return cached[1]
+
+
+def _all_found_matrices() -> dict:
+    matrices = {}
+    if RAG_DYNAMIC_DIR.exists():
+        for session_dir in sorted(RAG_DYNAMIC_DIR.iterdir(), key=lambda x: x.name):
+            if session_dir.is_dir():
+                matrix = _session_found_matrix(session_dir)
+                if matrix is not None and len(matrix.questions):
+                    matrices[session_dir.name] = matrix
+    return matrices
+
+
+@app.get("/api/rag-dynamic-analytics/first-k")
+async def get_rag_dynamic_first_k():
+    """First k at which each question's chunk is retrieved, per session, hardest questions first."""
+    matrices = await single_flight.run("rag_found_matrices", _all_found_matrices)
+    questions = first_found_k(matrices)
+    return {"sessions": list(matrices), "questions": questions, "total": len(questions)}
+
+
+@app.get("/api/rag-dynamic-analytics/{timestamp}")
+async def get_rag_dynamic_analytics(timestamp: str, targets: str = "70,80,90,95,100"):
+    """
+    Tuning analytics for one session: accuracy per (k, threshold), the cheapest
+    configuration per accuracy target, marginal gain per extra chunk and the
+    accuracy-vs-k Pareto frontier.
+    """
+    session_dir = RAG_DYNAMIC_DIR / timestamp
+    if not session_dir.exists() or not session_dir.is_dir():
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        target_values = [float(t) for t in targets.split(',') if t.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="targets must be comma-separated numbers")
+
+    matrix = await single_flight.run(("rag_found_matrix", timestamp), lambda: _session_found_matrix(session_dir))
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="Session has no runs")
+
+    accuracy = matrix.accuracy()
+    return {
+        "timestamp": timestamp,
+        "questions_count": len(matrix.questions),
+        "k_values": matrix.k_values.tolist(),
+        "threshold_values": matrix.thresholds.tolist(),
+        "accuracy_matrix": {
+            str(int(k)): {threshold_key(t): round(float(accuracy[ki, ti]), 2) for ti, t in enumerate(matrix.thresholds)}
+            for ki, k in enumerate(matrix.k_values)
+        },
+        "best_configs": matrix.best_configs(target_values),
+        "marginal_gain": matrix.marginal_gain(),
+        "pareto_frontier": matrix.pareto_frontier()
+    }
+
+
+# ============================================================
+# RAG DIFF - two RAG-dynamic sessions or two RAG-only tests
+# ============================================================
+
+RAG_DIFF_CACHE_SIZE = 64
+_rag_diff_cache = {}  # (kind, a, b, cell, source versions) -> diff
+
+
+def _config_changes(config_a: dict, config_b: dict) -> dict:
+    """Settings that differ between two server configs: key -> [a, b]."""
+    keys = sorted(set(config_a) | set(config_b))
+    return {key: [config_a.get(key), config_b.get(key)] for key in keys if config_a.get(key) != config_b.get(key)}
+
+
+def _diff_rag_sessions(a: str, b: str, k: Optional[int], threshold: Optional[float], align: str) -> dict:
+    dirs = [RAG_DYNAMIC_DIR / a, RAG_DYNAMIC_DIR / b]
+    files = [_rag_dynamic_run_files(d) if d.is_dir() else [] for d in dirs]
+    if not files[0] or not files[1]:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    key = ("dynamic", a, b, k, threshold, align, _file_version(*files[0]), _file_version(*files[1]))
+    diff = _rag_diff_cache.get(key)
+    metrics.cache_lookup("rag_diff", diff is not None)
+    if diff is None:
+        summaries = [read_json_file_cached(d / "summary.json", "rag_dynamic_summary") if (d / "summary.json").exists()
+                     else {} for d in dirs]
+        diff = diff_found_matrices(_session_found_matrix(dirs[0]), _session_found_matrix(dirs[1]), k, threshold, align)
+        diff["embedding_model"] = [summaries[0].get("embedding_model"), summaries[1].get("embedding_model")]
+        _store_rag_diff(key, diff)
+    return diff
+
+
+def _diff_rag_tests(a: str, b: str, align: str) -> dict:
+    paths = [_find_rag_test_file(a), _find_rag_test_file(b)]
+    if paths[0] is None or paths[1] is None:
+        raise HTTPException(status_code=404, detail="RAG test not found")
+
+    key = ("test", paths[0].name, paths[1].name, align, _file_version(paths[0]), _file_version(paths[1]))
+    diff = _rag_diff_cache.get(key)
+    metrics.cache_lookup("rag_diff", diff is not None)
+    if diff is None:
+        test_a, test_b = (read_json_file_cached(path, "rag_test") for path in paths)
+        diff = diff_test_results(test_a.get("results", []), test_b.get("results", []), align)
+        diff["model_name"] = [test_a.get("model_name"), test_b.get("model_name")]
+        diff["config_changes"] = _config_changes(test_a.get("server_config", {}), test_b.get("server_config", {}))
+        _store_rag_diff(key, diff)
+    return diff
+
+
+def _store_rag_diff(key: tuple, diff: dict):
+    if len(_rag_diff_cache) >= RAG_DIFF_CACHE_SIZE:
+        # Another thread may evict the same entry first
+        _rag_diff_cache.pop(next(iter(_rag_diff_cache), None), None)
+    _rag_diff_cache[key] = diff
+
+
+@app.get("/api/rag-diff")
+async def get_rag_diff(
+    a: str,
+    b: str,
+    kind: str = "dynamic",
+    k: Optional[int] = None,
+    threshold: Optional[float] = None,
+    align: str = "chunk"
+):
+    """
+    Compare two RAG-dynamic sessions (kind=dynamic, a/b = session timestamps) or
+    two RAG-only tests (kind=test, a/b = test ids). align=chunk matches by chunk_id
+    (a chunk is found if any of its questions was); align=question needs the same question.
+    For sessions: accuracy delta and gained/lost counts per (k, threshold) cell, and the
+    newly found/lost questions for one cell (k/threshold, default: largest k, lowest threshold).
+    """
+    if align not in ("chunk", "question"):
+        raise HTTPException(status_code=400, detail="align must be 'chunk' or 'question'")
+    if kind == "dynamic":
+        diff = await single_flight.run(("rag_diff", a, b, k, threshold, align),
+                                       lambda: _diff_rag_sessions(a, b, k, threshold, align))
+    elif kind == "test":
+        diff = await single_flight.run(("rag_diff", a, b, align), lambda: _diff_rag_tests(a, b, align))
+    else:
+        raise HTTPException(status_code=400, detail="kind must be 'dynamic' or 'test'")
+    return {"kind": kind, "a": a, "b": b, "align": align, **diff}
 
 
 # ============================================================
@@ -795,90 +3128,701 @@ async def get_rag_dynamic_run(timestamp: str, k: int, threshold: float):
 # ============================================================
 
 STABILITY_DATA_DIR = BASE_DIR / "stability_data"
+STABILITY_CHECK_INTERVAL = 2.0  # seconds between checks for runs ingested by other workers
+STABILITY_RUNS_PAGE_SIZE = 50
+
+# Same 5 levels as the stability map (coverage.html getStabilityStatus)
+STABILITY_STATUS_LEVELS = ((100, "perfect"), (80, "stable"), (60, "good"), (40, "unstable"), (20, "poor"))
+STABILITY_STATUSES = ("perfect", "stable", "good", "unstable", "poor", "broken")
+
+
+def stability_status(stability: float) -> str:
+    for minimum, status in STABILITY_STATUS_LEVELS:
+        if stability >= minimum:
+            return status
+    return "broken"
+
+
+class QuestionTypeStats:
+    """
+    Retrieval counters per (question_type, category, article) of the target
+    chunk, and - for missed runs - how often each other chunk was returned in
+    its place. Built when the store loads and updated by ingestion, so a
+    breakdown only adds up counters.
+    """
+
+    def __init__(self):
+        self.hits = {}  # (question_type, category, article) -> [runs, found]
+        self.winners = {}  # (question_type, category, article, chunk id) -> misses it was returned in
+
+    def add(self, target: str, question_type: Optional[str], category: Optional[str], article: Optional[str],
+            found: bool, returned_chunks: list):
+        key = (question_type or "UNKNOWN", category or "other", article or target)
+        counts = self.hits.setdefault(key, [0, 0])
+        counts[0] += 1
+        if found:
+            counts[1] += 1
+            return
+        for chunk_id in returned_chunks:
+            if chunk_id != target:
+                winner = key + (chunk_id,)
+                self.winners[winner] = self.winners.get(winner, 0) + 1
+
+    def copy(self) -> "QuestionTypeStats":
+        stats = QuestionTypeStats()
+        stats.hits = {key: list(counts) for key, counts in self.hits.items()}
+        stats.winners = dict(self.winners)
+        return stats
+
+    @staticmethod
+    def _row(fields: dict, runs: int, found: int) -> dict:
+        return {**fields, "runs": runs, "found": found, "hit_rate": round(found / runs * 100, 1) if runs else None}
+
+    def breakdown(self, category: Optional[str] = None, article: Optional[str] = None,
+                  group_by: str = "category", min_runs: int = 1, top: int = 10) -> dict:
+        """Hit rates by question_type and by question_type x category/article (worst first), top winning chunks."""
+        by_type, by_group = {}, {}
+        for (question_type, cat, art), (runs, found) in self.hits.items():
+            if (category and cat != category) or (article and art != article):
+                continue
+            for counts in (by_type.setdefault(question_type, [0, 0]),
+                           by_group.setdefault((question_type, cat, art if group_by == "article" else None), [0, 0])):
+                counts[0] += runs
+                counts[1] += found
+
+        winners = {}
+        for (question_type, cat, art, chunk_id), wins in self.winners.items():
+            if (category and cat != category) or (article and art != article):
+                continue
+            entry = winners.setdefault(chunk_id, {"chunk_id": chunk_id, "wins": 0, "question_types": {}})
+            entry["wins"] += wins
+            entry["question_types"][question_type] = entry["question_types"].get(question_type, 0) + wins
+
+        def worst_first(row):
+            return (row["hit_rate"], -row["runs"])
+
+        groups = []
+        for (question_type, cat, art), (runs, found) in by_group.items():
+            if runs < min_runs:
+                continue
+            fields = {"question_type": question_type, "category": cat}
+            if group_by == "article":
+                fields["article"] = art
+            groups.append(self._row(fields, runs, found))
+        return {
+            "question_types": sorted((self._row({"question_type": question_type}, runs, found)
+                                      for question_type, (runs, found) in by_type.items()), key=worst_first),
+            "groups": sorted(groups, key=worst_first),
+            "winning_chunks": sorted(winners.values(), key=lambda entry: (-entry["wins"], entry["chunk_id"]))[:top]
+        }
+
+
+class StabilityStore:
+    """
+    Stability results in SQLite: an append-only table of runs plus one summary
+    row per chunk (total_runs, found_count, stability, status) that ingestion
+    updates incrementally. Summaries are mirrored in memory; runs_history is
+    only read page by page.
+
+    stability_db.json is a full snapshot, so an import replaces the store -
+    runs ingested through the API included. It is imported automatically only
+    into an empty store; after that, only on request (import_legacy, i.e.
+    ingest_stability.py --import-legacy).
+    """
+
+    SUMMARY_FIELDS = ("total_runs", "found_count", "stability", "status", "category", "article",
+                      "text_preview", "last_run_at")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._ready = False
+        self._lock = threading.Lock()
+        self.generation = None
+        self.metadata = {}
+        self.chunks = {}  # chunk id -> summary
+        self.question_types = QuestionTypeStats()
+        self.history = StatusHistory("stability", _summarize_stability)
+        self._checked_at = 0.0
+        self._ignored_legacy_version = None
+
+    @property
+    def legacy_path(self) -> Path:
+        return self.path.parent / "stability_db.json"
+
+    def exists(self) -> bool:
+        return self.path.exists() or self.legacy_path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS stability_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS stability_chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    category TEXT,
+                    article TEXT,
+                    text_preview TEXT,
+                    total_runs INTEGER NOT NULL DEFAULT 0,
+                    found_count INTEGER NOT NULL DEFAULT 0,
+                    stability REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'broken',
+                    last_run_at TEXT
+                );
+                CREATE TABLE IF NOT EXISTS stability_runs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chunk_id TEXT NOT NULL,
+                    run_id TEXT,
+                    timestamp TEXT,
+                    question TEXT,
+                    question_type TEXT,
+                    found INTEGER NOT NULL,
+                    returned_chunks TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_stability_runs_chunk ON stability_runs(chunk_id, seq);
+            """)
+            conn.executescript(self.history.schema())
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str, default=None):
+        row = conn.execute("SELECT value FROM stability_meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, key: str, value):
+        conn.execute("INSERT OR REPLACE INTO stability_meta (key, value) VALUES (?, ?)",
+                     (key, json.dumps(value, ensure_ascii=False)))
+
+    @staticmethod
+    def _summary(row) -> dict:
+        return {field: row[field] for field in StabilityStore.SUMMARY_FIELDS}
+
+    @staticmethod
+    def _run_row(chunk_id: str, run: dict) -> tuple:
+        return (chunk_id, run.get("run_id"), run.get("timestamp"),
+                run.get("question"), run.get("question_type"), 1 if run.get("found") else 0,
+                json.dumps(run.get("returned_chunks") or [], ensure_ascii=False))
+
+    # -- import / ingest ------------------------------------------------
+
+    def _import_legacy(self, conn: sqlite3.Connection, version: str, kind: str = "import"):
+        """Replace the store with the contents of stability_db.json (checkpointed as `kind`)."""
+        db = read_json_file(self.legacy_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM stability_runs")
+            conn.execute("DELETE FROM stability_chunks")
+            states = {}
+            for chunk_id, chunk in db.get("chunks", {}).items():
+                history = chunk.get("runs_history", [])
+                conn.executemany(
+                    "INSERT INTO stability_runs (chunk_id, run_id, timestamp, question, question_type, found, "
+                    "returned_chunks) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._run_row(chunk_id, run) for run in history]
+                )
+                total_runs = chunk.get("total_runs", len(history))
+                stability = chunk.get("stability", 0)
+                status = chunk.get("status") or (stability_status(stability) if total_runs else "untested")
+                conn.execute(
+                    "INSERT INTO stability_chunks (chunk_id, category, article, text_preview, total_runs, "
+                    "found_count, stability, status, last_run_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (chunk_id, chunk.get("category"), chunk.get("article"), chunk.get("text_preview"),
+                     total_runs, chunk.get("found_count", 0), stability, status,
+                     max((run.get("timestamp") or "" for run in history), default=None) or None)
+                )
+                if total_runs:
+                    states[chunk_id] = (chunk.get("category"), status, stability)
+            metadata = {k: v for k, v in db.get("metadata", {}).items() if k != "tested_chunks"}
+            generation = self._meta(conn, "generation", 0) + 1
+            self.history.record(conn, generation, kind, metadata.get("last_updated") or datetime.now().isoformat(),
+                                metadata.get("total_chunks"), metadata.get("server_config"), states, replace=True)
+            self._set_meta(conn, "metadata", metadata)
+            self._set_meta(conn, "legacy_version", version)
+            self._set_meta(conn, "generation", generation)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def ingest(self, runs: list, server_config: Optional[dict] = None) -> dict:
+        """
+        Append run records ({chunk_id, run_id, timestamp, question, question_type,
+        found, returned_chunks}, optionally category/article/text_preview for new
+        chunks) and update the affected chunks' counters in one transaction.
+        """
+        self.refresh(force=True)
+        now = datetime.now().isoformat()
+        runs = [{**run, "timestamp": run.get("timestamp") or now} for run in runs]
+        by_chunk = {}
+        for run in runs:
+            by_chunk.setdefault(run["chunk_id"], []).append(run)
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO stability_runs (chunk_id, run_id, timestamp, question, question_type, found, "
+                    "returned_chunks) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._run_row(run["chunk_id"], run) for run in runs]
+                )
+                updated = {}
+                for chunk_id, chunk_runs in by_chunk.items():
+                    row = conn.execute("SELECT * FROM stability_chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+                    summary = self._summary(row) if row else {field: None for field in self.SUMMARY_FIELDS}
+                    for field in ("category", "article", "text_preview"):
+                        summary[field] = next((run[field] for run in chunk_runs if run.get(field)), summary[field])
+                    summary["total_runs"] = (summary["total_runs"] or 0) + len(chunk_runs)
+                    summary["found_count"] = (summary["found_count"] or 0) + sum(1 for run in chunk_runs if run.get("found"))
+                    summary["stability"] = round(summary["found_count"] / summary["total_runs"] * 100, 1)
+                    summary["status"] = stability_status(summary["stability"])
+                    summary["last_run_at"] = max([summary["last_run_at"] or ""] +
+                                                 [run.get("timestamp") or "" for run in chunk_runs]) or None
+                    conn.execute(
+                        "INSERT OR REPLACE INTO stability_chunks (chunk_id, category, article, text_preview, "
+                        "total_runs, found_count, stability, status, last_run_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (chunk_id, *(summary[field] for field in ("category", "article", "text_preview", "total_runs",
+                                                                   "found_count", "stability", "status", "last_run_at")))
+                    )
+                    updated[chunk_id] = summary
+
+                metadata = self._meta(conn, "metadata", {})
+                metadata["last_updated"] = datetime.now().isoformat()
+                if server_config is not None:
+                    metadata["server_config"] = server_config
+                self._set_meta(conn, "metadata", metadata)
+                generation = self._meta(conn, "generation", 0) + 1
+                self.history.record(
+                    conn, generation, "ingest", metadata["last_updated"], metadata.get("total_chunks"),
+                    metadata.get("server_config"),
+                    {chunk_id: (chunk["category"], chunk["status"], chunk["stability"]) for chunk_id, chunk in updated.items()}
+                )
+                self._set_meta(conn, "generation", generation)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+        with self._lock:
+            if self.generation == generation - 1:
+                question_types = self.question_types.copy()
+                for run in runs:
+                    chunk = updated[run["chunk_id"]]
+                    question_types.add(run["chunk_id"], run.get("question_type"), chunk["category"], chunk["article"],
+                                       run.get("found"), run.get("returned_chunks") or [])
+                chunks = dict(self.chunks)
+                chunks.update(updated)
+                self.chunks = chunks
+                self.question_types = question_types
+                self.metadata = metadata
+                self.generation = generation
+            else:
+                self._checked_at = 0.0  # another worker ingested in between: reload on next refresh
+        return {"runs": len(runs), "chunks": len(updated), "generation": generation}
+
+    # -- read ----------------------------------------------------------
+
+    def import_legacy(self):
+        """Replace the store (API-ingested runs included) with the contents of stability_db.json."""
+        conn = self._connect()
+        try:
+            with shared_cache.build_lock("stability_import"):
+                self._import_legacy(conn, _file_version(self.legacy_path), kind="reimport")
+        finally:
+            conn.close()
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False):
+        """Import stability_db.json into an empty store and pick up runs ingested by other workers."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < STABILITY_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if not self.exists():
+            return
+
+        conn = self._connect()
+        try:
+            if self.legacy_path.exists():
+                if not self._meta(conn, "generation", 0):
+                    with shared_cache.build_lock("stability_import"):
+                        if not self._meta(conn, "generation", 0):
+                            self._import_legacy(conn, _file_version(self.legacy_path))
+                else:
+                    version = _file_version(self.legacy_path)
+                    if version not in (self._meta(conn, "legacy_version"), self._ignored_legacy_version):
+                        self._ignored_legacy_version = version
+                        print(f"{self.legacy_path.name} differs from what the store imported and was not re-imported "
+                              f"(ingest_stability.py --import-legacy replaces the store with it)")
+
+            generation = self._meta(conn, "generation", 0)
+            if generation == self.generation:
+                return
+            chunks = {row["chunk_id"]: self._summary(row)
+                      for row in conn.execute("SELECT * FROM stability_chunks ORDER BY chunk_id")}
+            question_types = QuestionTypeStats()
+            for row in conn.execute("SELECT chunk_id, question_type, found, returned_chunks FROM stability_runs"):
+                chunk = chunks.get(row["chunk_id"], {})
+                question_types.add(row["chunk_id"], row["question_type"], chunk.get("category"), chunk.get("article"),
+                                   row["found"], json.loads(row["returned_chunks"]) if not row["found"] else [])
+            metadata = self._meta(conn, "metadata", {})
+        finally:
+            conn.close()
+        with self._lock:
+            self.chunks = chunks
+            self.question_types = question_types
+            self.metadata = metadata
+            self.generation = generation
+
+    def snapshot(self) -> dict:
+        """Compact stability DB: metadata and per-chunk summaries, without runs_history."""
+        chunks = self.chunks
+        return {
+            "metadata": {**self.metadata, "tested_chunks": sum(1 for c in chunks.values() if c["total_runs"] > 0)},
+            "chunks": chunks
+        }
+
+    def timeline(self, category: Optional[str] = None, by_category: bool = False) -> list:
+        """Stability metrics after every import/ingest."""
+        self.refresh()
+        conn = self._connect()
+        try:
+            return self.history.timeline(conn, self.generation, category, by_category)
+        finally:
+            conn.close()
+
+    def runs(self, chunk_id: str, offset: int = 0, limit: int = STABILITY_RUNS_PAGE_SIZE) -> list:
+        """A page of one chunk's runs_history, newest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT run_id, timestamp, question, question_type, found, returned_chunks FROM stability_runs "
+                "WHERE chunk_id = ? ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (chunk_id, limit, offset)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{**dict(row), "found": bool(row["found"]), "returned_chunks": json.loads(row["returned_chunks"])}
+                for row in rows]
+
+
+stability_store = StabilityStore(STABILITY_DATA_DIR / "stability.db")
+
+
+STABILITY_LIST_PAGE_SIZE = 50
+STABILITY_SORT_KEYS = {
+    "stability": lambda chunk: chunk["stability"] or 0,
+    "total_runs": lambda chunk: chunk["total_runs"] or 0,
+    "last_run": lambda chunk: chunk["last_run_at"] or ""
+}
+
+
+class StabilityListing:
+    """
+    Sorted indexes over the stability summaries of one store generation:
+    for every sort key, (key, chunk id) lists overall, per category and per
+    article. A listing picks the narrowest list, bisects to the cursor (and
+    to the stability range when sorting by stability) and scans only until
+    the page is full.
+    """
+
+    def __init__(self, chunks: dict, generation):
+        self.chunks = chunks
+        self.generation = generation
+        self.lists = {}  # (sort, scope) -> sorted [(key, chunk id)]; scope None, ("category", c) or ("article", a)
+        for sort, key in STABILITY_SORT_KEYS.items():
+            entries = sorted((key(chunk), chunk_id) for chunk_id, chunk in chunks.items())
+            self.lists[(sort, None)] = entries
+            for entry in entries:
+                chunk = chunks[entry[1]]
+                self.lists.setdefault((sort, ("category", chunk["category"] or "other")), []).append(entry)
+                self.lists.setdefault((sort, ("article", chunk["article"])), []).append(entry)
+
+    @staticmethod
+    def encode_cursor(sort: str, order: str, entry: tuple) -> str:
+        raw = json.dumps([sort, order, entry[0], entry[1]], ensure_ascii=False)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str, order: str) -> tuple:
+        try:
+            cursor_sort, cursor_order, key, chunk_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise HTTPException(status_code=400, detail="Cursor belongs to a different sort order")
+        return key, chunk_id
+
+    def page(self, statuses=None, category=None, article=None, min_stability=None, max_stability=None,
+             min_runs=0, sort="stability", order="asc", limit=STABILITY_LIST_PAGE_SIZE, cursor=None) -> dict:
+        if article is not None:
+            scope = ("article", article)
+        elif category is not None:
+            scope = ("category", category)
+        else:
+            scope = None
+        entries = self.lists.get((sort, scope), [])
+
+        # Index range still to visit, narrowed by the stability range and the cursor
+        low, high = 0, len(entries)
+        if sort == "stability":
+            if min_stability is not None:
+                low = bisect.bisect_left(entries, (min_stability,))
+            if max_stability is not None:
+                high = bisect.bisect_right(entries, (max_stability, "\uffff"))
+        if cursor is not None:
+            after = self.decode_cursor(cursor, sort, order)
+            if order == "asc":
+                low = max(low, bisect.bisect_right(entries, after))
+            else:
+                high = min(high, bisect.bisect_left(entries, after))
+
+        positions = range(low, high) if order == "asc" else range(high - 1, low - 1, -1)
+        items, last = [], None
+        for position in positions:
+            chunk_id = entries[position][1]
+            chunk = self.chunks[chunk_id]
+            if statuses and chunk["status"] not in statuses:
+                continue
+            if category is not None and article is not None and (chunk["category"] or "other") != category:
+                continue
+            if min_runs and chunk["total_runs"] < min_runs:
+                continue
+            if min_stability is not None and chunk["stability"] < min_stability:
+                continue
+            if max_stability is not None and chunk["stability"] > max_stability:
+                continue
+            if len(items) == limit:
+                break
+            items.append({"chunk_id": chunk_id, **chunk})
+            last = entries[position]
+        else:
+            last = None  # ran out of entries: no further page
+        return {
+            "chunks": items,
+            "next_cursor": self.encode_cursor(sort, order, last) if last is not None else None
+        }
+
+
+_stability_listing = None
+
+
+def _build_stability_listing(chunks: dict, generation) -> StabilityListing:
+    global _stability_listing
+    listing = _stability_listing
+    if listing is None or listing.chunks is not chunks or listing.generation != generation:
+        listing = StabilityListing(chunks, generation)
+        _stability_listing = listing
+    return listing
+
+
+async def _load_stability_store() -> StabilityStore:
+    """The stability store, refreshed off the event loop (coalesced across requests)."""
+    await single_flight.run("stability_refresh", stability_store.refresh)
+    return stability_store
+
+
+async def _load_stability_listing() -> StabilityListing:
+    """Listing indexes for the store's current generation, rebuilt (once, off the event loop) per change."""
+    store = await _load_stability_store()
+    chunks, generation = store.chunks, store.generation
+    listing = _stability_listing
+    if listing is None or listing.chunks is not chunks or listing.generation != generation:
+        listing = await single_flight.run(("stability_listing", generation),
+                                          lambda: _build_stability_listing(chunks, generation))
+    return listing
 
 
 def load_stability_db() -> dict:
-    """Load stability database."""
-    db_path = STABILITY_DATA_DIR / "stability_db.json"
-    if db_path.exists():
-        with open(db_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"metadata": {}, "chunks": {}}
+    """Load stability database (per-chunk summaries, without runs_history)."""
+    stability_store.refresh()
+    return stability_store.snapshot()
+
+
+async def load_stability_db_async() -> dict:
+    """load_stability_db for request handlers (refreshes off the event loop, coalesced)."""
+    return (await _load_stability_store()).snapshot()
+
+
+class StabilityRun(BaseModel):
+    chunk_id: str
+    found: bool
+    run_id: Optional[str] = None
+    timestamp: Optional[str] = None
+    question: Optional[str] = None
+    question_type: Optional[str] = None
+    returned_chunks: list[str] = []
+    category: Optional[str] = None
+    article: Optional[str] = None
+    text_preview: Optional[str] = None
+
+
+class StabilityIngestRequest(BaseModel):
+    runs: list[StabilityRun]
+    server_config: Optional[dict] = None
 
 
 @app.get("/api/stability")
 async def get_stability_data():
-    """Get full stability database."""
-    return load_stability_db()
+    """Get stability database: metadata and per-chunk summaries (runs via /api/stability/chunk/{id})."""
+    return await load_stability_db_async()
+
+
+@app.post("/api/stability/runs")
+async def ingest_stability_runs(request: Request, payload: StabilityIngestRequest):
+    """Append stability test runs (admin only) and update the affected chunks' summaries."""
+    _require_admin(request)
+    if not payload.runs:
+        raise HTTPException(status_code=400, detail="No runs to ingest")
+    runs = [run.model_dump() for run in payload.runs]
+    return await asyncio.to_thread(stability_store.ingest, runs, payload.server_config)
 
 
 @app.get("/api/stability/stats")
 async def get_stability_stats():
     """Get stability statistics summary."""
-    db = load_stability_db()
+    db = await load_stability_db_async()
     chunks = db.get("chunks", {})
     meta = db.get("metadata", {})
 
-    stable = sum(1 for c in chunks.values() if c.get("status") == "stable")
-    unstable = sum(1 for c in chunks.values() if c.get("status") == "unstable")
-    broken = sum(1 for c in chunks.values() if c.get("status") == "broken")
-    tested = sum(1 for c in chunks.values() if c.get("total_runs", 0) > 0)
+    tested_chunks = [c for c in chunks.values() if c.get("total_runs", 0) > 0]
+    tested = len(tested_chunks)
+    counts = {status: sum(1 for c in tested_chunks if c.get("status") == status) for status in STABILITY_STATUSES}
 
-    total_stability = sum(c.get("stability", 0) for c in chunks.values() if c.get("total_runs", 0) > 0)
+    total_stability = sum(c.get("stability", 0) for c in tested_chunks)
     avg_stability = round(total_stability / tested, 1) if tested > 0 else 0
 
     return {
         "total_chunks": meta.get("total_chunks", 0),
         "tested_chunks": tested,
-        "stable": stable,
-        "unstable": unstable,
-        "broken": broken,
+        **counts,
         "avg_stability": avg_stability,
         "last_updated": meta.get("last_updated")
     }
 
 
+@app.get("/api/stability/chunks")
+async def list_stability_chunks(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    article: Optional[str] = None,
+    min_stability: Optional[float] = None,
+    max_stability: Optional[float] = None,
+    min_runs: int = 0,
+    sort: str = "stability",
+    order: str = "asc",
+    limit: int = STABILITY_LIST_PAGE_SIZE,
+    cursor: Optional[str] = None
+):
+    """
+    Filtered, sorted page of chunk summaries (no runs_history), e.g. every
+    broken chunk of one category. status takes a comma-separated list; sort
+    is stability, total_runs or last_run. Pass next_cursor back as cursor
+    for the next page.
+    """
+    if sort not in STABILITY_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(STABILITY_SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    statuses = {value.strip() for value in status.split(',') if value.strip()} if status else None
+
+    listing = await _load_stability_listing()
+    page = listing.page(statuses, category, article, min_stability, max_stability, max(0, min_runs),
+                        sort, order, max(1, min(limit, 500)), cursor)
+    return {"sort": sort, "order": order, **page}
+
+
+@app.get("/api/stability/question-types")
+async def get_stability_question_types(
+    category: Optional[str] = None,
+    article: Optional[str] = None,
+    group_by: str = "category",
+    min_runs: int = 1,
+    top: int = 10
+):
+    """
+    Retrieval hit rate by question_type (WHAT_HOW, WHERE_WHEN, ...) and by
+    question_type x category (or article), worst first, plus the chunks most
+    often returned in place of a missed target. Served from counters kept
+    up to date at load/ingest time.
+    """
+    if group_by not in ("category", "article"):
+        raise HTTPException(status_code=400, detail="group_by must be 'category' or 'article'")
+    store = await _load_stability_store()
+    return {
+        "category": category,
+        "article": article,
+        "group_by": group_by,
+        **store.question_types.breakdown(category, article, group_by, max(1, min_runs), max(0, min(top, 100)))
+    }
+
+
 @app.get("/api/stability/chunk/{chunk_id}")
-async def get_stability_chunk(chunk_id: str):
-    """Get stability data for a specific chunk."""
-    db = load_stability_db()
-    chunk = db.get("chunks", {}).get(chunk_id)
+async def get_stability_chunk(chunk_id: str, offset: int = 0, limit: int = STABILITY_RUNS_PAGE_SIZE):
+    """Get stability data for a specific chunk, with one page of its runs_history (newest first)."""
+    store = await _load_stability_store()
+    chunk = store.chunks.get(chunk_id)
 
     if not chunk:
         raise HTTPException(status_code=404, detail="Chunk not found")
 
-    return chunk
+    offset = max(0, offset)
+    limit = max(1, min(limit, 500))
+    runs = await asyncio.to_thread(store.runs, chunk_id, offset, limit)
+    return {**chunk, "runs_history": runs, "runs_offset": offset, "runs_limit": limit,
+            "runs_total": chunk["total_runs"]}
 
 
 @app.get("/api/stability/categories")
 async def get_stability_categories():
     """Get stability data grouped by category."""
-    db = load_stability_db()
+    db = await load_stability_db_async()
     chunks = db.get("chunks", {})
 
     categories = {}
     for chunk_id, chunk in chunks.items():
-        cat = chunk.get("category", "other")
+        cat = chunk.get("category") or "other"
         if cat not in categories:
-            categories[cat] = {
-                "name": cat,
-                "total": 0,
-                "tested": 0,
-                "stable": 0,
-                "unstable": 0,
-                "broken": 0
-            }
+            categories[cat] = {"name": cat, "total": 0, "tested": 0, **{status: 0 for status in STABILITY_STATUSES}}
 
         categories[cat]["total"] += 1
         if chunk.get("total_runs", 0) > 0:
             categories[cat]["tested"] += 1
             status = chunk.get("status", "untested")
-            if status in ["stable", "unstable", "broken"]:
+            if status in STABILITY_STATUSES:
                 categories[cat][status] += 1
 
     return list(categories.values())
 
 
+@app.get("/api/history/timeline")
+async def get_progress_timeline(source: str = "coverage", category: Optional[str] = None, by_category: bool = False):
+    """
+    How coverage (tested chunks, coverage_percent, rag_accuracy, llm_avg_score)
+    or stability (avg_stability, chunks per status) evolved: one point per
+    import/ingest, with the server config in effect. Rebuilt from the stored
+    per-chunk deltas; category narrows it to one category, by_category adds all.
+    """
+    stores = {"coverage": coverage_store, "stability": stability_store}
+    if source not in stores:
+        raise HTTPException(status_code=400, detail="source must be 'coverage' or 'stability'")
+    store = stores[source]
+    if not store.exists():
+        return {"source": source, "category": category, "checkpoints": []}
+    checkpoints = await single_flight.run(("progress_timeline", source, category, by_category),
+                                          lambda: store.timeline(category, by_category))
+    return {"source": source, "category": category, "checkpoints": checkpoints}
+
+
 # ============================================================
 # CHAT WIDGET API - WebSocket Proxy to TryllServer
 # ============================================================
@@ -901,8 +3845,14 @@ KNOWLEDGE_BASE_PATH = Path(os.environ.get(
     "C:/Users/utente/Downloads/autotest/MinecraftRAG/minecraft_knowledge_base.json"
 ))
 
-# Cache for knowledge base
+# Compiled knowledge base (offset index + mmap'able blob), rebuilt when the source changes
+KNOWLEDGE_BASE_CACHE_DIR = Path(os.environ.get("KNOWLEDGE_BASE_CACHE_DIR", BASE_DIR / "kb_cache"))
+KNOWLEDGE_BASE_INDEX_FILE = KNOWLEDGE_BASE_CACHE_DIR / "knowledge_base_index.json"
+KNOWLEDGE_BASE_RELOAD_INTERVAL = 2.0  # seconds between source mtime checks
+
+# Cache for knowledge base (current KnowledgeBaseSnapshot)
 _knowledge_base_cache = None
+_knowledge_base_checked_at = 0.0
 
 
 class FeedbackRequest(BaseModel):
@@ -917,36 +3867,342 @@ class FeedbackRequest(BaseModel):
     server_config: Optional[dict] = None
 
 
+class KnowledgeBaseSnapshot(Mapping):
+    """
+    Read-only view of a compiled knowledge base: chunk id -> chunk dict.
+    Only the offset index lives in memory; each chunk is decoded from the
+    memory-mapped blob when it is requested, so the text stays in the
+    OS page cache (shared by all workers) instead of the Python heap.
+    """
+
+    def __init__(self, source_tag: str, chunks: dict, blob_path: Path):
+        self.source_tag = source_tag
+        self._chunks = chunks  # id -> [offset, length]
+        self._blob = b""
+        if blob_path.stat().st_size > 0:
+            with open(blob_path, 'rb') as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getitem__(self, chunk_id: str) -> dict:
+        offset, length = self._chunks[chunk_id]
+        with timed_phase("json"):
+            return json.loads(self._blob[offset:offset + length])
+
+    def __contains__(self, chunk_id) -> bool:
+        return chunk_id in self._chunks
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+
+def _knowledge_base_source_tag(stat: os.stat_result) -> str:
+    return f"{stat.st_mtime_ns}_{stat.st_size}"
+
+
+def _compile_knowledge_base(source_tag: str) -> dict:
+    """
+    Convert the knowledge base JSON into a blob of per-chunk JSON documents
+    plus an offset index. Files are written under new names and swapped in
+    with os.replace, so readers (and other workers) never see partial files.
+    """
+    data = read_json_file(KNOWLEDGE_BASE_PATH)
+
+    KNOWLEDGE_BASE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    blob_name = f"knowledge_base_{source_tag}.blob"
+    tmp_suffix = f".{os.getpid()}.tmp"
+
+    chunks = {}
+    offset = 0
+    blob_tmp = KNOWLEDGE_BASE_CACHE_DIR / (blob_name + tmp_suffix)
+    with open(blob_tmp, 'wb') as f:
+        for chunk in data:
+            encoded = json.dumps(chunk, ensure_ascii=False).encode('utf-8')
+            f.write(encoded)
+            chunks[chunk['id']] = [offset, len(encoded)]
+            offset += len(encoded)
+    os.replace(blob_tmp, KNOWLEDGE_BASE_CACHE_DIR / blob_name)
+
+    index = {"source_tag": source_tag, "blob": blob_name, "chunks": chunks}
+    index_tmp = KNOWLEDGE_BASE_INDEX_FILE.with_name(KNOWLEDGE_BASE_INDEX_FILE.name + tmp_suffix)
+    with open(index_tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(index_tmp, KNOWLEDGE_BASE_INDEX_FILE)
+
+    # Old blobs may still be mapped by other workers; remove what we can
+    for old_blob in KNOWLEDGE_BASE_CACHE_DIR.glob("knowledge_base_*.blob"):
+        if old_blob.name != blob_name:
+            try:
+                old_blob.unlink()
+            except OSError:
+                pass
+
+    print(f"Compiled knowledge base: {len(chunks)} chunks, {offset} bytes")
+    return index
+
+
+def _read_knowledge_base_index(source_tag: str) -> Optional[dict]:
+    """The compiled index if it matches the source and its blob exists, else None."""
+    if not KNOWLEDGE_BASE_INDEX_FILE.exists():
+        return None
+    try:
+        index = read_json_file(KNOWLEDGE_BASE_INDEX_FILE)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if index.get("source_tag") != source_tag or not (KNOWLEDGE_BASE_CACHE_DIR / index["blob"]).exists():
+        return None
+    return index
+
+
+def _open_knowledge_base(source_tag: str) -> KnowledgeBaseSnapshot:
+    """Open the compiled knowledge base, compiling it first if it is stale (one worker compiles)."""
+    index = _read_knowledge_base_index(source_tag)
+    if index is None:
+        with shared_cache.build_lock("knowledge_base"):
+            index = _read_knowledge_base_index(source_tag) or _compile_knowledge_base(source_tag)
+
+    return KnowledgeBaseSnapshot(source_tag, index["chunks"], KNOWLEDGE_BASE_CACHE_DIR / index["blob"])
+
+
 def load_knowledge_base():
-    """Load knowledge base JSON for chunk lookups."""
-    global _knowledge_base_cache
-    if _knowledge_base_cache is None and KNOWLEDGE_BASE_PATH.exists():
+    """
+    Get the knowledge base for chunk lookups (chunk id -> chunk dict).
+    Re-checks the source file's mtime every few seconds and swaps in a new
+    snapshot when it changed.
+    """
+    global _knowledge_base_cache, _knowledge_base_checked_at
+
+    now = time.monotonic()
+    if _knowledge_base_cache is not None and now - _knowledge_base_checked_at < KNOWLEDGE_BASE_RELOAD_INTERVAL:
+        metrics.cache_lookup("knowledge_base", True)
+        return _knowledge_base_cache
+    _knowledge_base_checked_at = now
+
+    if not KNOWLEDGE_BASE_PATH.exists():
+        metrics.cache_lookup("knowledge_base", _knowledge_base_cache is not None)
+        return _knowledge_base_cache or {}
+
+    source_tag = _knowledge_base_source_tag(KNOWLEDGE_BASE_PATH.stat())
+    fresh = _knowledge_base_cache is not None and _knowledge_base_cache.source_tag == source_tag
+    metrics.cache_lookup("knowledge_base", fresh)
+    if not fresh:
         try:
-            with open(KNOWLEDGE_BASE_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Index by ID for fast lookup
-                _knowledge_base_cache = {chunk['id']: chunk for chunk in data}
+            _knowledge_base_cache = single_flight.do(("knowledge_base", source_tag),
+                                                     lambda: _open_knowledge_base(source_tag))
         except Exception as e:
             print(f"Error loading knowledge base: {e}")
-            _knowledge_base_cache = {}
+
     return _knowledge_base_cache or {}
 
 
-def load_feedback():
-    """Load feedback from JSON file."""
-    if FEEDBACK_FILE.exists():
-        try:
-            with open(FEEDBACK_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+async def load_knowledge_base_async():
+    """load_knowledge_base for request handlers: (re)loads run off the event loop, coalesced."""
+    if (_knowledge_base_cache is not None
+            and time.monotonic() - _knowledge_base_checked_at < KNOWLEDGE_BASE_RELOAD_INTERVAL):
+        metrics.cache_lookup("knowledge_base", True)
+        return _knowledge_base_cache
+    return await single_flight.run("knowledge_base_check", load_knowledge_base)
+
+
+_CHUNK_SUFFIX_RE = re.compile(r'^(.*?)_(\d+)$')
+
+
+def _split_chunk_id(chunk_id: str) -> tuple:
+    """'mangrove_2' -> ('mangrove', 2), 'mangrove' -> ('mangrove', -1)"""
+    match = _CHUNK_SUFFIX_RE.match(chunk_id)
+    if match:
+        return match.group(1), int(match.group(2))
+    return chunk_id, -1
+
+
+class ChunkResolver:
+    """
+    Resolves RAG chunk ids against knowledge base keys.
+    Ids returned by TryllServer don't always match the knowledge base
+    exactly (base id vs `_N` split variants), so misses fall back to:
+      1. other variants of the same base id (lowest suffix first)
+      2. the longest knowledge base key that is a prefix of the id
+      3. the smallest key that starts with the id
+      4. a one-off substring scan
+    Every answer, including "not found", is cached.
+    """
+
+    MAX_CACHE_SIZE = 10000
+
+    def __init__(self, keys):
+        self.keys = set(keys)
+        self.sorted_keys = sorted(self.keys)
+        self.variants = {}
+        for key in self.sorted_keys:
+            base, _ = _split_chunk_id(key)
+            self.variants.setdefault(base, []).append(key)
+        for base, keys_for_base in self.variants.items():
+            keys_for_base.sort(key=lambda k: _split_chunk_id(k)[1])
+        self._cache = {}
 
+    def resolve(self, chunk_id: str) -> Optional[str]:
+        if chunk_id in self.keys:
+            return chunk_id
+        if chunk_id in self._cache:
+            return self._cache[chunk_id]
 
-def save_feedback(feedback_list):
-    """Save feedback to JSON file."""
-    with open(FEEDBACK_FILE, 'w', encoding='utf-8') as f:
-        json.dump(feedback_list, f, ensure_ascii=False, indent=2)
+        key = self._resolve_miss(chunk_id)
+        if len(self._cache) >= self.MAX_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[chunk_id] = key
+        return key
+
+    def resolve_many(self, chunk_ids: list) -> list:
+        return [self.resolve(chunk_id) for chunk_id in chunk_ids]
+
+    def _resolve_miss(self, chunk_id: str) -> Optional[str]:
+        if not chunk_id:
+            return None
+
+        base, _ = _split_chunk_id(chunk_id)
+        if base in self.variants:
+            return self.variants[base][0]
+
+        for end in range(len(chunk_id) - 1, 0, -1):
+            if chunk_id[:end] in self.keys:
+                return chunk_id[:end]
+
+        pos = bisect.bisect_left(self.sorted_keys, chunk_id)
+        if pos < len(self.sorted_keys) and self.sorted_keys[pos].startswith(chunk_id):
+            return self.sorted_keys[pos]
+
+        for key in self.sorted_keys:
+            if chunk_id in key or key in chunk_id:
+                return key
+        return None
+
+
+_chunk_resolver = None
+_chunk_resolver_source = None
+
+
+def get_chunk_resolver(kb: dict) -> ChunkResolver:
+    """Get the resolver for the loaded knowledge base, building it once per load."""
+    global _chunk_resolver, _chunk_resolver_source
+    if _chunk_resolver is None or _chunk_resolver_source is not kb:
+        _chunk_resolver = ChunkResolver(kb.keys())
+        _chunk_resolver_source = kb
+    return _chunk_resolver
+
+
+FEEDBACK_DB_PATH = FEEDBACK_DIR / "feedback.db"
+
+_feedback_db_ready = False
+
+
+def _feedback_db() -> sqlite3.Connection:
+    """
+    Open the feedback store (SQLite in WAL mode).
+    Every insert is its own transaction, so concurrent submissions
+    (and several workers) never overwrite each other.
+    """
+    global _feedback_db_ready
+    conn = sqlite3.connect(FEEDBACK_DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if not _feedback_db_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                session_id TEXT,
+                question TEXT,
+                answer TEXT,
+                rag_chunk_ids TEXT,
+                is_positive INTEGER,
+                feedback_type TEXT,
+                feedback_text TEXT,
+                suggested_answer TEXT,
+                server_config TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_feedback_filters ON feedback(is_positive, feedback_type, timestamp);
+            CREATE TABLE IF NOT EXISTS feedback_chunks (
+                chunk_id TEXT NOT NULL,
+                feedback_id INTEGER NOT NULL REFERENCES feedback(id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_feedback_chunks ON feedback_chunks(chunk_id, feedback_id);
+        """)
+        _migrate_feedback_json(conn)
+        _feedback_db_ready = True
+    return conn
+
+
+def _insert_feedback(conn: sqlite3.Connection, entry: dict) -> int:
+    """Insert one feedback entry and its chunk index rows, return its id."""
+    cursor = conn.execute(
+        """INSERT INTO feedback (timestamp, session_id, question, answer, rag_chunk_ids,
+                                 is_positive, feedback_type, feedback_text, suggested_answer, server_config)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            entry.get("timestamp") or datetime.now().isoformat(),
+            entry.get("session_id"),
+            entry.get("question"),
+            entry.get("answer"),
+            json.dumps(entry.get("rag_chunk_ids") or [], ensure_ascii=False),
+            1 if entry.get("is_positive") else 0,
+            entry.get("feedback_type"),
+            entry.get("feedback_text"),
+            entry.get("suggested_answer"),
+            json.dumps(entry["server_config"], ensure_ascii=False) if entry.get("server_config") is not None else None
+        )
+    )
+    feedback_id = cursor.lastrowid
+    conn.executemany(
+        "INSERT INTO feedback_chunks (chunk_id, feedback_id) VALUES (?, ?)",
+        [(chunk_id, feedback_id) for chunk_id in set(entry.get("rag_chunk_ids") or [])]
+    )
+    return feedback_id
+
+
+def _migrate_feedback_json(conn: sqlite3.Connection):
+    """Import the legacy feedback.json once, keeping its order as ids."""
+    if not FEEDBACK_FILE.exists():
+        return
+    if conn.execute("SELECT 1 FROM feedback LIMIT 1").fetchone():
+        return
+    try:
+        legacy = read_json_file(FEEDBACK_FILE)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Error reading legacy feedback: {e}")
+        return
+    with conn:
+        for entry in legacy:
+            _insert_feedback(conn, entry)
+    print(f"Migrated {len(legacy)} feedback entries from {FEEDBACK_FILE.name}")
+
+
+def _feedback_row_to_dict(row: sqlite3.Row) -> dict:
+    return {
+        "id": row["id"],
+        "timestamp": row["timestamp"],
+        "session_id": row["session_id"],
+        "question": row["question"],
+        "answer": row["answer"],
+        "rag_chunk_ids": json.loads(row["rag_chunk_ids"] or "[]"),
+        "is_positive": bool(row["is_positive"]),
+        "feedback_type": row["feedback_type"],
+        "feedback_text": row["feedback_text"],
+        "suggested_answer": row["suggested_answer"],
+        "server_config": json.loads(row["server_config"]) if row["server_config"] else None
+    }
+
+
+def load_feedback():
+    """Load all feedback entries, oldest first."""
+    conn = _feedback_db()
+    try:
+        rows = conn.execute("SELECT * FROM feedback ORDER BY id").fetchall()
+        return [_feedback_row_to_dict(row) for row in rows]
+    finally:
+        conn.close()
 
 
 @app.get("/api/chat/config")
@@ -966,9 +4222,8 @@ async def get_chat_config():
     config_path = Path("C:/Users/utente/AppData/Local/Tryll/server/config.json")
     if config_path.exists():
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                local_config = json.load(f)
-                config.update(local_config)
+            local_config = read_json_file(config_path)
+            config.update(local_config)
         except:
             pass
 
@@ -981,26 +4236,20 @@ async def get_chat_config():
 @app.get("/api/chat/chunks")
 async def get_chunk_details(ids: str):
     """Get full details for RAG chunks by their IDs."""
-    chunk_ids = ids.split(',')
-    kb = load_knowledge_base()
+    chunk_ids = [chunk_id.strip() for chunk_id in ids.split(',')]
+    kb = await load_knowledge_base_async()
+    resolver = get_chunk_resolver(kb)
 
     results = []
-    for chunk_id in chunk_ids:
-        chunk_id = chunk_id.strip()
-        if chunk_id in kb:
-            results.append(kb[chunk_id])
+    for chunk_id, key in zip(chunk_ids, resolver.resolve_many(chunk_ids)):
+        if key is not None:
+            results.append(kb[key])
         else:
-            # Try partial match
-            for key in kb:
-                if chunk_id in key or key in chunk_id:
-                    results.append(kb[key])
-                    break
-            else:
-                results.append({
-                    "id": chunk_id,
-                    "text": "Chunk not found in knowledge base",
-                    "metadata": {}
-                })
+            results.append({
+                "id": chunk_id,
+                "text": "Chunk not found in knowledge base",
+                "metadata": {}
+            })
 
     return results
 
@@ -1008,8 +4257,6 @@ async def get_chunk_details(ids: str):
 @app.post("/api/chat/feedback")
 async def submit_feedback(feedback: FeedbackRequest):
     """Submit user feedback on chat response."""
-    feedback_list = load_feedback()
-
     entry = {
         "timestamp": datetime.now().isoformat(),
         "session_id": feedback.session_id,
@@ -1023,16 +4270,78 @@ async def submit_feedback(feedback: FeedbackRequest):
         "server_config": feedback.server_config
     }
 
-    feedback_list.append(entry)
-    save_feedback(feedback_list)
+    conn = _feedback_db()
+    try:
+        with conn:
+            feedback_id = _insert_feedback(conn, entry)
+    finally:
+        conn.close()
 
-    return {"status": "ok", "id": len(feedback_list)}
+    return {"status": "ok", "id": feedback_id}
 
 
 @app.get("/api/chat/feedback")
-async def get_all_feedback():
-    """Get all feedback entries (for admin review)."""
-    return load_feedback()
+async def get_all_feedback(
+    offset: int = 0,
+    limit: int = 50,
+    is_positive: Optional[bool] = None,
+    feedback_type: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    chunk_id: Optional[str] = None
+):
+    """
+    Get feedback entries (for admin review), newest first, one page at a time.
+    since/until are ISO dates or timestamps, compared against the entry timestamp.
+
+    Returns {feedback, total, has_more}. This endpoint used to return a bare
+    list of every entry: clients written for that read `feedback` and page
+    with offset until has_more is false.
+    """
+    where = []
+    params = []
+
+    if is_positive is not None:
+        where.append("f.is_positive = ?")
+        params.append(1 if is_positive else 0)
+    if feedback_type:
+        where.append("f.feedback_type = ?")
+        params.append(feedback_type)
+    if since:
+        where.append("f.timestamp >= ?")
+        params.append(since)
+    if until and len(until) == 10:
+        # A bare date includes the whole day: everything before the next one
+        try:
+            next_day = datetime.strptime(until, "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="until must be an ISO date or timestamp")
+        where.append("f.timestamp < ?")
+        params.append(next_day.strftime("%Y-%m-%d"))
+    elif until:
+        where.append("f.timestamp <= ?")
+        params.append(until)
+    if chunk_id:
+        where.append("f.id IN (SELECT feedback_id FROM feedback_chunks WHERE chunk_id = ?)")
+        params.append(chunk_id)
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    conn = _feedback_db()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM feedback f {where_sql}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT f.* FROM feedback f {where_sql} ORDER BY f.id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return {
+        "feedback": [_feedback_row_to_dict(row) for row in rows],
+        "total": total,
+        "has_more": offset + limit < total
+    }
 
 
 @app.websocket("/api/chat/ws")
@@ -1042,6 +4351,7 @@ async def websocket_proxy(websocket: WebSocket):
     Connects client browser to local TryllServer via socket.
     """
     await websocket.accept()
+    metrics.active_websockets += 1
 
     reader = None
     writer = None
@@ -1095,6 +4405,7 @@ async def websocket_proxy(websocket: WebSocket):
         except:
             pass
     finally:
+        metrics.active_websockets -= 1
         if writer:
             writer.close()
             try:
@@ -1103,6 +4414,351 @@ async def websocket_proxy(websocket: WebSocket):
                 pass
 
 
+# ============================================================
+# CHUNK OVERVIEW - one precomputed view per chunk
+# ============================================================
+
+CHUNK_OVERVIEW_REFRESH_INTERVAL = 5.0  # seconds between checks for changed sources
+CHUNK_OVERVIEW_RECENT_RUNS = 10
+
+
+def _file_version(*paths: Path) -> str:
+    """Version stamp of a group of files (changes when any of them changes)."""
+    parts = []
+    for path in paths:
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts)
+
+
+def _rag_hit(result: dict, **context) -> dict:
+    """One RAG lookup of a chunk: was it returned, and at which rank."""
+    returned = result.get('returned_chunks') or []
+    chunk_id = result.get('chunk_id')
+    return {
+        **context,
+        "question": result.get('question'),
+        "found": bool(result.get('found')),
+        "rank": returned.index(chunk_id) + 1 if chunk_id in returned else None,
+        "returned_chunks": returned
+    }
+
+
+class ChunkOverviewIndex:
+    """
+    Per-chunk join of coverage results, stability status and RAG test/sweep
+    hits. Every source file (or sweep session) is tracked with a version
+    stamp; refresh() re-reads only the sources that changed and replaces
+    just their contributions.
+    """
+
+    def __init__(self):
+        self.versions = {}  # source -> version stamp
+        self.contributions = {}  # source -> chunk ids it contributed to
+        self.chunks = {}  # chunk id -> {"coverage", "stability", "rag_tests", "rag_sweeps"}
+        self.checked_at = 0.0
+        self._lock = threading.Lock()  # sources are loaded outside it, applied and read under it
+
+    def _entry(self, chunk_id: str) -> dict:
+        if chunk_id not in self.chunks:
+            self.chunks[chunk_id] = {"coverage": None, "stability": None, "rag_tests": {}, "rag_sweeps": {}}
+        return self.chunks[chunk_id]
+
+    def _drop_source(self, source: str):
+        section = source.split(":", 1)[0]
+        for chunk_id in self.contributions.pop(source, ()):
+            entry = self.chunks.get(chunk_id)
+            if entry is None:
+                continue
+            if section in ("coverage", "stability"):
+                entry[section] = None
+            else:
+                entry[section].pop(source, None)
+            if not entry["coverage"] and not entry["stability"] and not entry["rag_tests"] and not entry["rag_sweeps"]:
+                del self.chunks[chunk_id]
+        self.versions.pop(source, None)
+
+    def _set_source(self, source: str, version: str, per_chunk: dict):
+        """Replace a source's contributions with {chunk id: value}."""
+        self._drop_source(source)
+        section = source.split(":", 1)[0]
+        for chunk_id, value in per_chunk.items():
+            entry = self._entry(chunk_id)
+            if section in ("coverage", "stability"):
+                entry[section] = value
+            else:
+                entry[section][source] = value
+        self.contributions[source] = set(per_chunk)
+        self.versions[source] = version
+
+    def _current_sources(self) -> dict:
+        """source -> (version, loader) for every data source on disk."""
+        sources = {}
+        if coverage_store.exists():
+            sources["coverage"] = (f"generation:{load_coverage_results().generation}", self._load_coverage)
+        if stability_store.exists():
+            stability_store.refresh()
+            sources["stability"] = (f"generation:{stability_store.generation}", self._load_stability)
+        if RAG_TESTS_DIR.exists():
+            for filepath in RAG_TESTS_DIR.glob("*.json"):
+                sources[f"rag_tests:{filepath.stem}"] = (
+                    _file_version(filepath), lambda filepath=filepath: self._load_rag_test(filepath)
+                )
+        if RAG_DYNAMIC_DIR.exists():
+            for session_dir in RAG_DYNAMIC_DIR.iterdir():
+                if not session_dir.is_dir():
+                    continue
+                files = sorted(session_dir.glob("runs/*.json")) or sorted(session_dir.glob("results.json"))
+                if files:
+                    sources[f"rag_sweeps:{session_dir.name}"] = (
+                        _file_version(*files), lambda session_dir=session_dir: self._load_rag_sweep(session_dir)
+                    )
+        return sources
+
+    def refresh(self, force: bool = False) -> int:
+        """Reload changed sources; returns how many were (re)loaded or dropped."""
+        if not force and time.monotonic() - self.checked_at < CHUNK_OVERVIEW_REFRESH_INTERVAL:
+            return 0
+        self.checked_at = time.monotonic()
+
+        changed = 0
+        current = self._current_sources()
+        for source in list(self.versions):
+            if source not in current:
+                with self._lock:
+                    self._drop_source(source)
+                changed += 1
+        for source, (version, loader) in current.items():
+            if self.versions.get(source) != version:
+                try:
+                    per_chunk = loader()
+                except (OSError, KeyError, TypeError, json.JSONDecodeError) as e:
+                    print(f"Chunk overview: error loading {source}: {e}")
+                    continue
+                with self._lock:
+                    self._set_source(source, version, per_chunk)
+                changed += 1
+        return changed
+
+    # -- loaders: source file -> {chunk id: contribution} -------------
+
+    @staticmethod
+    def _load_coverage() -> dict:
+        return dict(load_coverage_results().results)
+
+    @staticmethod
+    def _load_stability() -> dict:
+        # Recent runs are read from the store when a chunk is viewed
+        return {chunk_id: {**chunk, 'history_length': chunk['total_runs']}
+                for chunk_id, chunk in load_stability_db().get('chunks', {}).items()}
+
+    @staticmethod
+    def _load_rag_test(filepath: Path) -> dict:
+        data = read_json_file(filepath)
+        context = {
+            "test_id": filepath.stem,
+            "timestamp": data.get('timestamp'),
+            "model_name": data.get('model_name'),
+            "rag_chunks_number": data.get('rag_chunks_number'),
+            "rag_score_threshold": data.get('server_config', {}).get('rag_score_threshold')
+        }
+        per_chunk = {}
+        for result in data.get('results', []):
+            per_chunk.setdefault(result.get('chunk_id'), []).append(_rag_hit(result, **context))
+        return per_chunk
+
+    @staticmethod
+    def _load_rag_sweep(session_dir: Path) -> dict:
+        per_chunk = {}
+        for run in load_rag_dynamic_runs(session_dir):
+            context = {
+                "session": session_dir.name,
+                "rag_chunks_number": run.get('rag_chunks_number'),
+                "rag_score_threshold": run.get('rag_score_threshold')
+            }
+            for result in run.get('results', []):
+                per_chunk.setdefault(result.get('chunk_id'), []).append(_rag_hit(result, **context))
+        return per_chunk
+
+    # -- view ----------------------------------------------------------
+
+    @staticmethod
+    def _hit_summary(groups: dict, sort_key: str) -> dict:
+        history = sorted((hit for hits in groups.values() for hit in hits),
+                         key=lambda hit: (hit.get(sort_key) or '', hit.get('rag_chunks_number') or 0,
+                                          hit.get('rag_score_threshold') or 0))
+        found = sum(1 for hit in history if hit['found'])
+        return {
+            "lookups": len(history),
+            "found": found,
+            "hit_rate": round(found / len(history) * 100, 1) if history else None,
+            "history": history
+        }
+
+    @classmethod
+    def empty_overview(cls) -> dict:
+        return {"coverage": None, "stability": None, "rag_tests": cls._hit_summary({}, "timestamp"),
+                "rag_sweeps": cls._hit_summary({}, "session")}
+
+    def overview(self, chunk_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.chunks.get(chunk_id)
+            if entry is None:
+                return None
+            entry = {"coverage": entry["coverage"], "stability": entry["stability"],
+                     "rag_tests": dict(entry["rag_tests"]), "rag_sweeps": dict(entry["rag_sweeps"])}
+        stability = entry["stability"]
+        if stability is not None:
+            recent_runs = stability_store.runs(chunk_id, 0, CHUNK_OVERVIEW_RECENT_RUNS)
+            stability = {**stability, "recent_runs": recent_runs[::-1]}
+        return {
+            "coverage": entry["coverage"],
+            "stability": stability,
+            "rag_tests": self._hit_summary(entry["rag_tests"], "timestamp"),
+            "rag_sweeps": self._hit_summary(entry["rag_sweeps"], "session")
+        }
+
+
+chunk_overview_index = ChunkOverviewIndex()
+
+
+def _chunk_feedback(chunk_id: str) -> dict:
+    """Chat feedback entries whose RAG chunks include this chunk, newest first."""
+    conn = _feedback_db()
+    try:
+        rows = conn.execute(
+            "SELECT f.* FROM feedback f JOIN feedback_chunks c ON c.feedback_id = f.id "
+            "WHERE c.chunk_id = ? ORDER BY f.id DESC",
+            (chunk_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+    entries = [_feedback_row_to_dict(row) for row in rows]
+    positive = sum(1 for entry in entries if entry["is_positive"])
+    return {"total": len(entries), "positive": positive, "negative": len(entries) - positive, "entries": entries}
+
+
+@app.get("/api/chunk/{chunk_id}/overview")
+async def get_chunk_overview(chunk_id: str):
+    """Everything known about one chunk: coverage, stability, RAG test and sweep hits, chat feedback."""
+    await single_flight.run("chunk_overview", chunk_overview_index.refresh)
+    overview = await asyncio.to_thread(chunk_overview_index.overview, chunk_id)
+    feedback = await asyncio.to_thread(_chunk_feedback, chunk_id)
+    if overview is None and not feedback["total"]:
+        raise HTTPException(status_code=404, detail="Chunk not found")
+
+    return {
+        "chunk_id": chunk_id,
+        **(overview or ChunkOverviewIndex.empty_overview()),
+        "feedback": feedback
+    }
+
+
+# ============================================================
+# STARTUP WARM-UP & READINESS
+# ============================================================
+
+class WarmupTracker:
+    """State and progress of each subsystem's background warm-up."""
+
+    def __init__(self, names: list):
+        self.subsystems = {name: {"state": "pending"} for name in names}
+
+    def start(self, name: str):
+        self.subsystems[name] = {"state": "running", "started_at": datetime.now().isoformat(),
+                                 "_started": time.perf_counter()}
+
+    def progress(self, name: str, done: int, total: int):
+        self.subsystems[name]["progress"] = {"done": done, "total": total}
+
+    def finish(self, name: str, state: str, detail=None, error: str = None):
+        entry = self.subsystems[name]
+        entry["state"] = state
+        entry["seconds"] = round(time.perf_counter() - entry.pop("_started", time.perf_counter()), 3)
+        if detail is not None:
+            entry["detail"] = detail
+        if error:
+            entry["error"] = error
+
+    @property
+    def ready(self) -> bool:
+        return all(entry["state"] in ("ready", "skipped", "failed") for entry in self.subsystems.values())
+
+    def status(self) -> dict:
+        return {name: {k: v for k, v in entry.items() if not k.startswith("_")}
+                for name, entry in self.subsystems.items()}
+
+
+def _warm_reports():
+    counts = ingest_all_reports(progress=lambda done, total: warmup.progress("reports", done, total))
+    _build_caches()
+    return {**counts, "cached": len(_reports_metadata_cache)}
+
+
+def _warm_coverage():
+    if not coverage_store.exists():
+        return None
+    coverage_store.refresh(force=True)
+    return {"tested_chunks": coverage_store.snapshot.totals["tested"]}
+
+
+def _warm_stability():
+    if not stability_store.exists():
+        return None
+    stability_store.refresh(force=True)
+    return {"chunks": len(stability_store.chunks)}
+
+
+def _warm_knowledge_base():
+    if not KNOWLEDGE_BASE_PATH.exists():
+        return None
+    return {"chunks": len(load_knowledge_base())}
+
+
+WARMUP_STEPS = [
+    ("reports", _warm_reports),
+    ("coverage", _warm_coverage),
+    ("stability", _warm_stability),
+    ("knowledge_base", _warm_knowledge_base),
+]
+warmup = WarmupTracker([name for name, _ in WARMUP_STEPS])
+
+
+async def _run_warmup():
+    for name, step in WARMUP_STEPS:
+        warmup.start(name)
+        try:
+            detail = await asyncio.to_thread(step)
+        except Exception as e:
+            print(f"Warm-up of {name} failed: {e}")
+            warmup.finish(name, "failed", error=str(e))
+            continue
+        # A step returns None when its data source is not present on this instance
+        warmup.finish(name, "skipped" if detail is None else "ready", detail)
+
+
+_warmup_task = None  # held so the running warm-up is not garbage-collected
+
+
+@app.on_event("startup")
+async def start_warmup():
+    """Build caches in the background so the first visitors don't pay for it."""
+    global _warmup_task
+    _warmup_task = asyncio.create_task(_run_warmup())
+
+
+# Readiness for load balancers and monitors (/health stays a pure liveness check)
+@app.head("/ready")
+@app.get("/ready")
+async def readiness_check():
+    """
+    200 once every subsystem has finished warming up, 503 (with progress) until then.
+    A failed subsystem does not hold readiness back; it is reported with its error.
+    """
+    content = {"ready": warmup.ready, "subsystems": warmup.status()}
+    return JSONResponse(content, status_code=200 if warmup.ready else 503)
+
+
 # Serve static files (chat widget)
 STATIC_DIR = BASE_DIR / "static"
 if STATIC_DIR.exists():
@@ -0,0 +1,4 @@
+"""
+Local benchmarking tools for the dashboard and the chat proxies.
+Nothing here is imported by app.py or local_proxy.py.
+"""
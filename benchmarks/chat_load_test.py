@@ -0,0 +1,312 @@
+"""
+Load generator for the chat WebSocket proxies (local_proxy.py /ws and app.py /api/chat/ws).
+
+Opens N concurrent WebSocket clients, each asking a number of questions the
+same way chat-widget.js does, and reports:
+- throughput (answers/sec, tokens/sec)
+- p50/p95/p99 time to first frame, per-token latency (gap between streamed
+  tokens) and full answer time
+- proxy memory (RSS), when the proxy process is known
+
+Usage (everything local, no TryllServer or GPU needed):
+    python -m benchmarks.chat_load_test --proxy local_proxy --simulator --clients 50
+    python -m benchmarks.chat_load_test --proxy app --simulator --clients 20 --questions 5
+    python -m benchmarks.chat_load_test --url ws://localhost:8765/ws --proxy-pid 12345
+
+Note: local_proxy.py always connects to TryllServer on port 1234, so the
+simulator must run there (the default) when testing it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import websockets
+
+from benchmarks.tryll_simulator import (
+    STATE_STREAMING_END, STATE_TOKEN, SimulatorConfig, TryllSimulator
+)
+from local_proxy import percentile
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROXIES = {
+    # name: (uvicorn app, websocket path, simulator framing)
+    "local_proxy": ("local_proxy:app", "/ws", "prefixed"),
+    "app": ("app:app", "/api/chat/ws", "raw"),
+}
+
+QUESTIONS = [
+    "How do you get coal in Minecraft?",
+    "What animal gives you wool for a bed?",
+    "How do I make a 1-bit ALU do multiplication?",
+    "Where can I find ferns naturally spawning in Minecraft?",
+    "What tool do you need to mine polished deepslate stairs?",
+]
+
+
+def summarize(values: list) -> dict:
+    """Percentile summary in milliseconds."""
+    ms = [v * 1000 for v in values]
+    return {
+        "count": len(ms),
+        "p50": _round(percentile(ms, 50)),
+        "p95": _round(percentile(ms, 95)),
+        "p99": _round(percentile(ms, 99)),
+        "max": _round(max(ms)) if ms else None
+    }
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+def parse_frames(text: str) -> list:
+    """
+    Parse one WebSocket message into JSON objects.
+    app.py forwards raw socket reads, so a message may hold several
+    concatenated frames (or a trailing comma).
+    """
+    decoder = json.JSONDecoder()
+    frames = []
+    pos = 0
+    while pos < len(text):
+        while pos < len(text) and text[pos] in ', \r\n\t':
+            pos += 1
+        if pos >= len(text):
+            break
+        try:
+            frame, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        frames.append(frame)
+    return frames
+
+
+def read_rss_kb(pid: int):
+    """Resident set size of a process in KB (Linux /proc only)."""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class LoadTestResults:
+    def __init__(self):
+        self.answers = 0
+        self.errors = []
+        self.tokens = 0
+        self.bytes_received = 0
+        self.first_frame = []
+        self.token_gaps = []
+        self.answer_times = []
+        self.memory_kb = []
+
+
+async def ask(ws, question: str, end_state: int, timeout: float, results: LoadTestResults):
+    """Send one question and time the streamed answer."""
+    sent_at = time.perf_counter()
+    await ws.send(json.dumps({"agent_message": {"id": 1, "message": question}}))
+
+    first_frame_at = None
+    last_token_at = None
+    while True:
+        raw = await asyncio.wait_for(ws.recv(), timeout)
+        now = time.perf_counter()
+        text = raw if isinstance(raw, str) else raw.decode('utf-8', errors='replace')
+        results.bytes_received += len(text)
+        for frame in parse_frames(text):
+            if frame.get("error"):
+                raise RuntimeError(frame.get("message") or frame["error"])
+            agent = frame.get("agent")
+            if not isinstance(agent, dict):
+                continue
+            if first_frame_at is None:
+                first_frame_at = now
+                results.first_frame.append(now - sent_at)
+            if agent.get("state") == STATE_TOKEN:
+                results.tokens += 1
+                if last_token_at is not None:
+                    results.token_gaps.append(now - last_token_at)
+                last_token_at = now
+            if agent.get("state") == end_state:
+                results.answers += 1
+                results.answer_times.append(now - sent_at)
+                return
+
+
+async def run_client(client_id: int, url: str, args, results: LoadTestResults):
+    remaining = args.questions
+    while remaining > 0:
+        try:
+            async with websockets.connect(url, max_size=None, open_timeout=args.timeout) as ws:
+                await ws.send(json.dumps({"new_agent": {
+                    "id": 1, "name": f"LoadTest{client_id}", "model": "Simulated-Model",
+                    "chat_format": "chatml", "temperature": 0.7
+                }}))
+                while remaining > 0:
+                    question = QUESTIONS[(client_id + remaining) % len(QUESTIONS)]
+                    remaining -= 1
+                    await ask(ws, question, args.end_state, args.timeout, results)
+        except Exception as e:
+            results.errors.append(f"client {client_id}: {type(e).__name__}: {e}")
+
+
+async def sample_memory(pid: int, results: LoadTestResults, stop: asyncio.Event):
+    while not stop.is_set():
+        rss = read_rss_kb(pid)
+        if rss is not None:
+            results.memory_kb.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def spawn_proxy(name: str, port: int, simulator_port: int) -> subprocess.Popen:
+    module, _, _ = PROXIES[name]
+    env = dict(os.environ, TRYLL_SERVER_PORT=str(simulator_port))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+
+
+async def stop_proxy(process: subprocess.Popen):
+    """Stop a spawned proxy; kill it if graceful shutdown hangs on open connections."""
+    process.terminate()
+    try:
+        await asyncio.to_thread(process.wait, 10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        await asyncio.to_thread(process.wait)
+
+
+async def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+
+async def run(args) -> dict:
+    simulator = None
+    proxy_process = None
+    url = args.url
+
+    if args.simulator:
+        framing = PROXIES[args.proxy][2] if args.proxy else "prefixed"
+        simulator = TryllSimulator(SimulatorConfig(
+            port=args.simulator_port, framing=framing, token_rate=args.token_rate,
+            tokens=args.tokens, fail_rate=args.fail_rate, stall_rate=args.stall_rate, seed=args.seed
+        ))
+        await simulator.start()
+
+    if args.proxy:
+        proxy_process = spawn_proxy(args.proxy, args.proxy_port, args.simulator_port)
+        url = url or f"ws://127.0.0.1:{args.proxy_port}{PROXIES[args.proxy][1]}"
+        await wait_for_port(args.proxy_port)
+
+    if not url:
+        raise SystemExit("Either --url or --proxy is required")
+
+    pid = proxy_process.pid if proxy_process else args.proxy_pid
+    results = LoadTestResults()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_memory(pid, results, stop)) if pid else None
+
+    started = time.perf_counter()
+    try:
+        clients = []
+        for client_id in range(args.clients):
+            clients.append(asyncio.create_task(run_client(client_id, url, args, results)))
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.clients)
+        await asyncio.gather(*clients)
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        if sampler:
+            await sampler
+        if proxy_process:
+            await stop_proxy(proxy_process)
+        if simulator:
+            await simulator.stop()
+
+    return {
+        "url": url,
+        "clients": args.clients,
+        "questions_per_client": args.questions,
+        "elapsed_seconds": round(elapsed, 3),
+        "answers": results.answers,
+        "errors": len(results.errors),
+        "error_samples": results.errors[:10],
+        "throughput": {
+            "answers_per_second": round(results.answers / elapsed, 2) if elapsed else None,
+            "tokens_per_second": round(results.tokens / elapsed, 2) if elapsed else None,
+            "bytes_per_second": round(results.bytes_received / elapsed, 2) if elapsed else None
+        },
+        "latency_ms": {
+            "first_frame": summarize(results.first_frame),
+            "per_token": summarize(results.token_gaps),
+            "answer": summarize(results.answer_times)
+        },
+        "proxy_memory_kb": {
+            "samples": len(results.memory_kb),
+            "start": results.memory_kb[0] if results.memory_kb else None,
+            "peak": max(results.memory_kb) if results.memory_kb else None,
+            "end": results.memory_kb[-1] if results.memory_kb else None
+        },
+        "simulator": simulator.stats if simulator else None
+    }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load test for the chat WebSocket proxies")
+    parser.add_argument("--url", help="WebSocket URL of an already running proxy")
+    parser.add_argument("--proxy", choices=sorted(PROXIES), help="spawn this proxy with uvicorn")
+    parser.add_argument("--proxy-port", type=int, default=8765)
+    parser.add_argument("--proxy-pid", type=int, help="sample memory of this process")
+    parser.add_argument("--simulator", action="store_true", help="run the TryllServer simulator in-process")
+    parser.add_argument("--simulator-port", type=int, default=1234)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=3, help="questions per client")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds to spread client starts over")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each frame")
+    parser.add_argument("--end-state", type=int, default=STATE_STREAMING_END,
+                        help="agent.state that marks the end of an answer")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="simulator tokens per second")
+    parser.add_argument("--tokens", type=int, default=100, help="simulator tokens per answer")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    return parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Benchmark suite for the dashboard API (app.py) over synthetic report archives.
+
+For each archive size it generates a synthetic archive (see
+benchmarks/synthetic_archive.py), points app.py at it and times:
+- cold start: building the report caches (_build_caches) from fresh sidecars
+- worker start: loading those caches from the shared cache file
+- ingestion: parsing every HTML report into its JSON sidecar
+- /api/reports pagination (first, middle and last page, and a filtered page)
+- /api/compare over a handful of reports
+- /api/coverage/stats (after importing coverage_results.json), /api/coverage/tree and the lazy tree levels
+- /api/search (index sync and a ranked query)
+- /api/stability (import from stability_db.json, compact summaries), /api/stability/stats
+  and a filtered /api/stability/chunks page
+Each measurement records min/median/max wall time, the JSON payload size
+and the time to serialize it.
+
+Results are written as JSON (benchmarks/results/dashboard_<timestamp>.json
+by default) so runs can be compared over time.
+
+Usage:
+    python -m benchmarks.dashboard_bench                      # 100, 1k and 10k reports
+    python -m benchmarks.dashboard_bench --sizes 100,1000 --repeat 3
+    python -m benchmarks.dashboard_bench --workdir /tmp/bench --keep
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.synthetic_archive import (
+    generate_coverage, generate_rag_dynamic, generate_reports, generate_stability
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+sys.path.insert(0, str(BASE_DIR))
+import app  # noqa: E402
+
+
+def point_app_at(root: Path):
+    """Redirect app.py's data directories to a synthetic archive."""
+    app.REPORTS_DIR = root / "reports_html"
+    app.REPORTS_DATA_DIR = root / "reports_json"
+    app.COVERAGE_DATA_DIR = root / "coverage_data"
+    app.STABILITY_DATA_DIR = root / "stability_data"
+    app.RAG_DYNAMIC_DIR = root / "rag_results_dinamic"
+    app.RAG_TESTS_DIR = root / "rag_results"
+    app.SEARCH_DB_PATH = root / "search_data" / "search.db"
+    app._search_db_ready = False
+    app.shared_cache = app.SharedCache(root / "cache_data" / "shared_cache.db")
+    app.stability_store = app.StabilityStore(app.STABILITY_DATA_DIR / "stability.db")
+    app.coverage_store = app.CoverageStore(app.COVERAGE_DATA_DIR / "coverage.db")
+    app.invalidate_cache()
+
+
+def measure(loop, fn, repeat: int, setup=None) -> dict:
+    """Time fn (sync or async) `repeat` times; setup runs untimed before each call."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            result = loop.run_until_complete(result)
+        times.append(time.perf_counter() - started)
+
+    entry = {
+        "runs": repeat,
+        "min_ms": round(min(times) * 1000, 3),
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "max_ms": round(max(times) * 1000, 3)
+    }
+    if result is not None:
+        started = time.perf_counter()
+        payload = json.dumps(result, ensure_ascii=False)
+        entry["serialize_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        entry["payload_bytes"] = len(payload.encode('utf-8'))
+    return entry
+
+
+def reset_caches():
+    """Forget every built report cache, including the shared one."""
+    app.invalidate_cache()
+    app.shared_cache.clear()
+
+
+def run_size(loop, root: Path, reports: int, repeat: int) -> dict:
+    point_app_at(root)
+    results = {}
+
+    results["ingest_all_reports"] = measure(
+        loop, lambda: app.ingest_all_reports(force=True), max(1, min(repeat, 3))
+    )
+    results["cold_start_build_caches"] = measure(
+        loop, app._build_caches, max(1, min(repeat, 3)), setup=reset_caches
+    )
+    results["worker_start_shared_cache"] = measure(
+        loop, app._build_caches, max(1, min(repeat, 3)), setup=app.invalidate_cache
+    )
+
+    all_reports = loop.run_until_complete(app._load_reports_cache())
+    total = len(all_reports)
+    pages = {"first": 0, "middle": max(0, total // 2), "last": max(0, total - 25)}
+    for name, offset in pages.items():
+        results[f"reports_page_{name}"] = measure(
+            loop, lambda offset=offset: app.get_reports(offset=offset, limit=25, model=None, chunks=None,
+                                                        min_score=None, game=None), repeat
+        )
+    model = all_reports[0]["model"] if all_reports else None
+    results["reports_page_filtered"] = measure(
+        loop, lambda: app.get_reports(offset=0, limit=25, model=model, chunks=None, min_score=50, game=None),
+        repeat
+    )
+
+    compare_ids = ",".join(r["id"] for r in all_reports[:4])
+    results["compare_4_reports"] = measure(loop, lambda: app.compare_reports(compare_ids), repeat)
+
+    results["coverage_import"] = measure(loop, lambda: app.coverage_store.refresh(force=True), 1)
+    results["coverage_stats"] = measure(loop, app.get_coverage_stats, repeat)
+    results["coverage_tree"] = measure(loop, app.get_coverage_tree, repeat)
+    results["coverage_tree_categories"] = measure(loop, app.get_coverage_tree_categories, repeat)
+    first_category = app.CoverageTreeIndex(app.load_coverage_data("chunks_index.json"),
+                                           app.load_coverage_results()).category_list()[0]["name"]
+    results["coverage_tree_articles"] = measure(
+        loop, lambda: app.get_coverage_tree_articles(category=first_category, status=None, offset=0, limit=100), repeat
+    )
+
+    results["search_index_sync"] = measure(loop, lambda: app.sync_search_index(force=True), 1)
+    results["search_query"] = measure(
+        loop, lambda: app.search(q="diamond pickaxe", offset=0, limit=20, kind=None, model=None, game=None,
+                                 full=False), repeat
+    )
+    results["stability_import"] = measure(loop, lambda: app.stability_store.refresh(force=True), 1)
+    results["stability_summaries"] = measure(loop, app.get_stability_data, repeat)
+    results["stability_stats"] = measure(loop, app.get_stability_stats, repeat)
+    results["stability_list_filtered"] = measure(
+        loop, lambda: app.list_stability_chunks(status="broken", category=None, article=None, min_stability=None,
+                                                max_stability=None, min_runs=0, sort="stability", order="asc",
+                                                limit=50, cursor=None), repeat
+    )
+
+    return {"reports": reports, "parsed_reports": total, "benchmarks": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py over synthetic archives")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated report counts")
+    parser.add_argument("--chunks", type=int, default=2000, help="coverage/stability chunks")
+    parser.add_argument("--runs-per-chunk", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=20, help="questions per report")
+    parser.add_argument("--padding-kb", type=int, default=80, help="extra markup per report")
+    parser.add_argument("--sessions", type=int, default=3, help="RAG-dynamic sessions")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, help="where to generate archives (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep generated archives")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="dashboard_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    # Coverage, stability and RAG-dynamic data don't depend on the report count
+    shared = workdir / "shared"
+    print(f"Generating shared data ({args.chunks} chunks) in {shared}")
+    generate_coverage(shared, args.chunks, seed=args.seed)
+    generate_stability(shared, args.chunks, args.runs_per_chunk, seed=args.seed)
+    generate_rag_dynamic(shared, args.sessions, seed=args.seed)
+
+    loop = asyncio.new_event_loop()
+    runs = []
+    try:
+        for size in sizes:
+            root = workdir / f"reports_{size}"
+            print(f"Generating {size} reports in {root}")
+            generate_reports(root, size, args.questions, args.padding_kb, args.seed)
+            for name in ("coverage_data", "stability_data", "rag_results_dinamic"):
+                target = root / name
+                if not target.exists():
+                    shutil.copytree(shared / name, target)
+
+            print(f"Benchmarking {size} reports")
+            run = run_size(loop, root, size, args.repeat)
+            runs.append(run)
+            for name, entry in run["benchmarks"].items():
+                print(f"  {name:28s} median {entry['median_ms']:>10.2f} ms  "
+                      f"payload {entry.get('payload_bytes', 0):>10d} B")
+
+            if not args.keep:
+                shutil.rmtree(root, ignore_errors=True)
+    finally:
+        loop.close()
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "sizes": sizes,
+            "chunks": args.chunks,
+            "runs_per_chunk": args.runs_per_chunk,
+            "questions": args.questions,
+            "padding_kb": args.padding_kb,
+            "sessions": args.sessions,
+            "repeat": args.repeat,
+            "seed": args.seed
+        },
+        "runs": runs
+    }
+
+    output = args.output or RESULTS_DIR / f"dashboard_{datetime.now().strftime('%Y_%m_%d-%H_%M_%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
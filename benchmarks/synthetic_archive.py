@@ -0,0 +1,369 @@
+"""
+Synthetic report archive generator for the dashboard benchmarks.
+
+Produces data shaped like ours:
+- reports_html/evaluation_report_DD_MM_HH-MMAM_Model.html, parseable by
+  app.parse_html_report() (subtitle, score cards, server config modal,
+  results table with question/answer/score rows)
+- coverage_data/coverage_results.json and chunks_index.json with M chunks
+- stability_data/stability_db.json with M chunks and their runs_history
+- rag_results_dinamic/<session>/ with summary.json, metadata.json and one
+  runs/k{k}_t{threshold}.json per cell of the k x threshold grid
+
+Usage:
+    python -m benchmarks.synthetic_archive /tmp/archive --reports 1000 --chunks 2000
+"""
+
+import argparse
+import html
+import json
+import random
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+MODELS = [
+    "Llama 3.1 8B Instruct (Q4_K_M)",
+    "Mistral 7B Instruct v0.3 (Q4_K_M)",
+    "Qwen3 8B (Q4_K_M)",
+    "Gemma 3 4B Instruct (Q4_K_M)",
+    "Zephyr 7B Beta (Q4_K_M)",
+    "DeepSeek R1 Distill Llama 8B (Q4_K_M)",
+    "Phi-4 Mini Instruct (Q4_K_M)",
+    "Granite 3.0 8B Instruct (Q4_K_M)",
+]
+GAMES = ["Minecraft", "Minecraft", "Minecraft", "Stardew Valley"]
+EMBEDDING_MODELS = ["all-MiniLM-L6-v2", "BAAI/bge-small-en-v1.5"]
+CATEGORIES = ["block", "item", "mob", "biome", "tutorial", "mechanic", "effect", "enchantment"]
+QUESTION_TYPES = ["WHAT_HOW", "WHERE_WHEN", "WHY_PURPOSE", "COMPARISON", "PRACTICAL"]
+WORDS = ("minecraft block craft mine redstone torch iron diamond creeper village biome nether "
+         "enchant potion furnace pickaxe zombie villager wool sheep bed portal obsidian lava "
+         "water farm wheat seeds fern mangrove allay amethyst jukebox milk poison effect").split()
+
+# Real reports carry ~100 KB of CSS, scripts and the prompt modal; parse cost scales with it
+PADDING_BLOCK = "        .filler-{i} {{ color: #3B82F6; padding: 12px; border-radius: 8px; }}\n"
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def report_filename(index: int, model: str) -> str:
+    """Unique evaluation_report_DD_MM_HH-MMAM_Model.html name for each index."""
+    minute = index % 60
+    hour = (index // 60) % 12 + 1
+    am_pm = "AM" if (index // 720) % 2 == 0 else "PM"
+    day = (index // 1440) % 28 + 1
+    month = (index // 40320) % 12 + 1
+    model_part = model.replace(" (", "_").replace(")", "").replace(" ", "_")
+    return f"evaluation_report_{day:02d}_{month:02d}_{hour:02d}-{minute:02d}{am_pm}_{model_part}.html"
+
+
+def render_report(rng: random.Random, index: int, questions: int, padding_kb: int) -> tuple:
+    model = MODELS[index % len(MODELS)]
+    game = GAMES[index % len(GAMES)]
+    generated = datetime(2026, 1, 1) + timedelta(minutes=37 * index)
+    scores = [rng.randint(0, 50) for _ in range(questions)]
+    total = sum(scores)
+    max_total = 50 * questions
+    server_config = {
+        "version": "0.1.2",
+        "port": 1234,
+        "embedding_model_name": rng.choice(EMBEDDING_MODELS),
+        "rag_chunks_number": rng.randint(1, 5),
+        "rag_double_tower": False,
+        "rag_score_threshold": round(rng.choice([0.3, 0.4, 0.5, 0.6]), 1),
+        "llm_context_size": 8192,
+        "text_splitter_chunk_size": rng.choice([1600, 2200]),
+    }
+    config_html = html.escape(json.dumps(server_config, indent=2)).replace("\n", "<br>")
+
+    padding = "".join(PADDING_BLOCK.format(i=i) for i in range(padding_kb * 1024 // len(PADDING_BLOCK)))
+
+    rows = []
+    for q, score in enumerate(scores, start=1):
+        rows.append(f"""
+                        <tr>
+                            <td style="font-weight: 600; color: #3B82F6;">Q{q}</td>
+                            <td class="question-cell">
+                                <div class="question-text">{sentence(rng, 14)}</div>
+                                <div class="reference-text">Ref: {sentence(rng, 30)}</div>
+                            </td>
+                            <td class="answer-cell">{sentence(rng, 45)}</td>
+                            <td>
+                                <span class="score-badge">{score}/50</span>
+                            </td>
+                            <td class="metrics-cell">
+                                <span class="metric-pill">CTX {rng.randint(0, 100)}%</span>
+                            </td>
+                            <td>
+                                <button class="details-toggle" onclick="toggleDetails({q})">Show Details</button>
+                            </td>
+                        </tr>
+                        <tr id="details-row-{q}" class="details-row" style="display: none;">
+                            <td colspan="6">
+                                <div class="details-content-expanded">
+                                    <div class="detail-section"><strong>Score Analysis:</strong> {sentence(rng, 60)}</div>
+                                </div>
+                            </td>
+                        </tr>""")
+
+    page = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>RAG Evaluation Report</title>
+    <style>
+{padding}    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>RAG Evaluation Report</h1>
+            <p class="subtitle">Generated: {generated.strftime('%Y-%m-%d %H:%M')} | Questions: {questions} | Model: {model} | Game: {game}</p>
+        </div>
+        <div id="promptModal" class="modal-overlay">
+            <div class="modal-content">
+                <div class="model-info"><strong>Model:</strong> <span>{model}</span></div>
+                <div class="prompt-text">You are an AI assistant for the game {game}.</div>
+            </div>
+        </div>
+        <div id="serverConfigModal" class="modal-overlay">
+            <div class="modal-content">
+                <div class="prompt-text">{config_html}</div>
+            </div>
+        </div>
+        <div class="metrics-grid">
+            <div class="metric-card highlight">
+                <div class="label">Total Score</div>
+                <div class="value">{total}/{max_total}</div>
+                <div class="subtext">{round(total / max_total * 100, 1)}% of maximum</div>
+            </div>
+        </div>
+        <div class="results-section">
+            <table class="results-table">
+                <thead>
+                    <tr><th>#</th><th>Question & Reference</th><th>AI Answer</th><th>Score</th><th>Metrics</th><th>Details</th></tr>
+                </thead>
+                <tbody>{"".join(rows)}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</body>
+</html>
+"""
+    return report_filename(index, model), page
+
+
+def generate_reports(root: Path, count: int, questions: int = 20, padding_kb: int = 80, seed: int = 0):
+    reports_dir = root / "reports_html"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    for index in range(count):
+        filename, page = render_report(rng, index, questions, padding_kb)
+        (reports_dir / filename).write_text(page, encoding='utf-8')
+    return reports_dir
+
+
+def category_for(chunk_id: str) -> str:
+    return CATEGORIES[zlib.crc32(chunk_id.split('_')[0].encode()) % len(CATEGORIES)]
+
+
+def article_for(chunk_id: str) -> str:
+    return chunk_id.rsplit('_', 1)[0].replace('_', ' ').title()
+
+
+def chunk_ids(count: int) -> list:
+    """Ids shaped like ours: base ids plus `_N` split variants."""
+    ids = []
+    base = 0
+    while len(ids) < count:
+        name = f"{WORDS[base % len(WORDS)]}_{WORDS[(base // len(WORDS)) % len(WORDS)]}{base}"
+        parts = 1 + base % 4
+        if parts == 1:
+            ids.append(name)
+        else:
+            ids.extend(f"{name}_{n}" for n in range(1, parts + 1))
+        base += 1
+    return ids[:count]
+
+
+def generate_coverage(root: Path, chunks: int, tested_ratio: float = 0.8, seed: int = 0):
+    rng = random.Random(seed)
+    coverage_dir = root / "coverage_data"
+    coverage_dir.mkdir(parents=True, exist_ok=True)
+
+    ids = chunk_ids(chunks)
+    index = {}
+    results = {}
+    for chunk_id in ids:
+        index[chunk_id] = {"category": category_for(chunk_id), "article": article_for(chunk_id),
+                           "text_preview": sentence(rng, 35)}
+        if rng.random() < tested_ratio:
+            found = rng.random() < 0.8
+            returned = [chunk_id] if found else []
+            returned += rng.sample(ids, 2)
+            results[chunk_id] = {
+                "tested": True,
+                "test_date": "2026-01-07",
+                "question": sentence(rng, 12),
+                "reference_answer": sentence(rng, 20),
+                "model_answer": sentence(rng, 30),
+                "rag_found_chunk": found,
+                "rag_returned_chunks": returned,
+                "llm_score": round(rng.random(), 2),
+                "model_tested": rng.choice(MODELS)
+            }
+
+    found_count = sum(1 for r in results.values() if r["rag_found_chunk"])
+    coverage = {
+        "last_updated": "2026-01-07T16:17:06Z",
+        "total_chunks": len(ids),
+        "tested_chunks": len(results),
+        "coverage_percent": round(len(results) / len(ids) * 100, 2),
+        "rag_accuracy": round(found_count / len(results) * 100, 2) if results else 0,
+        "llm_avg_score": round(sum(r["llm_score"] for r in results.values()) / len(results), 2) if results else 0,
+        "results": results
+    }
+    with open(coverage_dir / "coverage_results.json", 'w', encoding='utf-8') as f:
+        json.dump(coverage, f, ensure_ascii=False, indent=2)
+    with open(coverage_dir / "chunks_index.json", 'w', encoding='utf-8') as f:
+        json.dump({"total_chunks": len(ids), "chunks": index}, f, ensure_ascii=False, indent=2)
+    return ids
+
+
+def generate_stability(root: Path, chunks: int, runs_per_chunk: int = 5, seed: int = 0):
+    rng = random.Random(seed)
+    stability_dir = root / "stability_data"
+    stability_dir.mkdir(parents=True, exist_ok=True)
+
+    ids = chunk_ids(chunks)
+    db_chunks = {}
+    started = datetime(2026, 1, 12, 18, 47)
+    for n, chunk_id in enumerate(ids):
+        hit_rate = rng.random()
+        history = []
+        for run in range(runs_per_chunk):
+            found = rng.random() < hit_rate
+            returned = ([chunk_id] if found else []) + rng.sample(ids, 1)
+            history.append({
+                "run_id": (started + timedelta(hours=run)).strftime("%Y_%m_%d_%H_%M_%S"),
+                "timestamp": (started + timedelta(hours=run, seconds=n)).isoformat(),
+                "question": sentence(rng, 12),
+                "question_type": QUESTION_TYPES[run % len(QUESTION_TYPES)],
+                "found": found,
+                "returned_chunks": returned
+            })
+        found_count = sum(1 for h in history if h["found"])
+        stability = round(found_count / runs_per_chunk * 100, 1) if runs_per_chunk else 0
+        if stability == 100:
+            status = "stable"
+        elif stability >= 60:
+            status = "unstable"
+        else:
+            status = "broken"
+        db_chunks[chunk_id] = {
+            "total_runs": runs_per_chunk,
+            "found_count": found_count,
+            "stability": stability,
+            "status": status,
+            "category": category_for(chunk_id),
+            "article": article_for(chunk_id),
+            "text_preview": sentence(rng, 35),
+            "runs_history": history
+        }
+
+    db = {
+        "metadata": {
+            "total_chunks": len(ids),
+            "tested_chunks": len(ids),
+            "last_updated": datetime(2026, 1, 13).isoformat(),
+            "server_config": {"embedding_model_name": "BAAI/bge-small-en-v1.5", "rag_chunks_number": 2}
+        },
+        "chunks": db_chunks
+    }
+    with open(stability_dir / "stability_db.json", 'w', encoding='utf-8') as f:
+        json.dump(db, f, ensure_ascii=False, indent=2)
+
+
+def generate_rag_dynamic(root: Path, sessions: int = 3, questions: int = 50,
+                         k_values=(1, 2, 3, 4, 5), thresholds=None, seed: int = 0):
+    rng = random.Random(seed)
+    thresholds = thresholds or [round(0.1 * i, 1) for i in range(1, 11)]
+    dynamic_dir = root / "rag_results_dinamic"
+    ids = chunk_ids(max(questions * 4, 200))
+
+    for s in range(sessions):
+        timestamp = (datetime(2026, 1, 8) + timedelta(hours=s)).strftime("%Y_%m_%d-%H_%M_%S")
+        session_dir = dynamic_dir / timestamp
+        runs_dir = session_dir / "runs"
+        runs_dir.mkdir(parents=True, exist_ok=True)
+
+        question_list = []
+        for q in range(questions):
+            question_list.append({"index": q, "chunk_id": ids[q], "chunk_text": sentence(rng, 40),
+                                  "question": sentence(rng, 12)})
+        # Rank of the target chunk and its similarity score, per question
+        ranks = [rng.randint(1, 7) for _ in range(questions)]
+        scores = [rng.uniform(0.5, 0.9) for _ in range(questions)]
+
+        accuracy_matrix = {}
+        for k in k_values:
+            accuracy_matrix[str(k)] = {}
+            for t in thresholds:
+                results = []
+                for q, item in enumerate(question_list):
+                    found = ranks[q] <= k and scores[q] >= t
+                    returned = [item["chunk_id"]] if found else []
+                    returned += [c for c in rng.sample(ids, k) if c != item["chunk_id"]][:k - len(returned)]
+                    results.append({"chunk_id": item["chunk_id"], "question": item["question"],
+                                    "returned_chunks": returned, "found": found})
+                correct = sum(1 for r in results if r["found"])
+                accuracy = round(correct / questions * 100, 1)
+                accuracy_matrix[str(k)][str(t)] = accuracy
+                with open(runs_dir / f"k{k}_t{t}.json", 'w', encoding='utf-8') as f:
+                    json.dump({"rag_chunks_number": k, "rag_score_threshold": t, "total_tests": questions,
+                               "correct": correct, "accuracy": accuracy, "results": results}, f)
+
+        embedding_model = EMBEDDING_MODELS[s % len(EMBEDDING_MODELS)]
+        with open(session_dir / "summary.json", 'w', encoding='utf-8') as f:
+            json.dump({"test_type": "RAG-dynamic", "timestamp": timestamp, "questions_count": questions,
+                       "total_runs": len(k_values) * len(thresholds), "embedding_model": embedding_model,
+                       "accuracy_matrix": accuracy_matrix}, f)
+        with open(session_dir / "metadata.json", 'w', encoding='utf-8') as f:
+            json.dump({"test_type": "RAG-dynamic", "timestamp": timestamp, "questions_count": questions,
+                       "embedding_model": embedding_model, "k_values": list(k_values),
+                       "threshold_values": thresholds, "total_runs": len(k_values) * len(thresholds),
+                       "questions": question_list}, f)
+
+
+def generate_archive(root: Path, reports: int, chunks: int, questions: int = 20, padding_kb: int = 80,
+                     runs_per_chunk: int = 5, sessions: int = 3, seed: int = 0):
+    """Generate a complete archive under root."""
+    generate_reports(root, reports, questions, padding_kb, seed)
+    generate_coverage(root, chunks, seed=seed)
+    generate_stability(root, chunks, runs_per_chunk, seed=seed)
+    generate_rag_dynamic(root, sessions, seed=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dashboard archive")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--reports", type=int, default=100)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=20, help="questions per report")
+    parser.add_argument("--padding-kb", type=int, default=80, help="extra markup per report")
+    parser.add_argument("--runs-per-chunk", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=3, help="RAG-dynamic sessions")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_archive(args.root, args.reports, args.chunks, args.questions, args.padding_kb,
+                     args.runs_per_chunk, args.sessions, args.seed)
+    print(f"Archive written to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+TryllServer simulator - a local stand-in for load-testing the chat proxies.
+
+Speaks the TryllServer binary protocol:
+- Messages are prefixed with 8-byte (uint64) size
+- Message format: [8-byte size][JSON message + comma]
+
+On connect it announces itself ({"server": {"state": 1}} and a model list),
+then answers every agent_message that carries a "message" with a scripted
+sequence of agent frames. The default script mirrors a streamed answer:
+
+    2 (START_STREAMING) -> 3 x tokens (STREAMING token) -> 4 (FINISH_STREAMING, rag ids)
+    -> 5 (STREAMING_END, full response + rag_ids/rag_scores)
+
+Usage:
+    python -m benchmarks.tryll_simulator --port 1234 --token-rate 40 --tokens 120
+    python -m benchmarks.tryll_simulator --fail-rate 0.05 --stall-rate 0.05
+    python -m benchmarks.tryll_simulator --framing raw   # for app.py's /api/chat/ws proxy
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+from dataclasses import dataclass, field
+from typing import Optional
+
+MESSAGE_SIZE_BYTES = 8  # uint64
+
+# agent.state codes as used by chat-widget.js and local_proxy.py
+STATE_FULL_MESSAGE = 1
+STATE_START_STREAMING = 2
+STATE_TOKEN = 3
+STATE_FINISH_STREAMING = 4
+STATE_STREAMING_END = 5
+
+
+@dataclass
+class SimulatorConfig:
+    host: str = "localhost"
+    port: int = 1234
+    framing: str = "prefixed"  # "prefixed" (TryllServer protocol) or "raw" (bare JSON)
+    model_name: str = "Simulated-Model"
+    token_rate: float = 50.0  # tokens per second, 0 = as fast as possible
+    tokens: int = 100  # tokens per answer
+    token_size: int = 4  # characters per token
+    first_token_delay: float = 0.2  # seconds between the question and START_STREAMING
+    states: list = field(default_factory=lambda: [
+        STATE_START_STREAMING, STATE_TOKEN, STATE_FINISH_STREAMING, STATE_STREAMING_END
+    ])
+    rag_ids: int = 3
+    # Failure injection (probabilities per answer)
+    fail_rate: float = 0.0  # drop the connection mid-answer
+    stall_rate: float = 0.0  # pause mid-answer for stall_seconds
+    stall_seconds: float = 5.0
+    corrupt_rate: float = 0.0  # send one frame that is not valid JSON
+    refuse_rate: float = 0.0  # close new connections immediately
+    seed: Optional[int] = None
+
+
+class TryllSimulator:
+    """Scriptable TryllServer stand-in."""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.server = None
+        self.writers = set()
+        self.stats = {
+            "connections": 0,
+            "questions": 0,
+            "frames_sent": 0,
+            "bytes_sent": 0,
+            "injected_failures": 0,
+            "injected_stalls": 0,
+            "injected_corruptions": 0,
+            "refused": 0
+        }
+
+    # -- framing -------------------------------------------------------
+
+    def encode(self, payload) -> bytes:
+        text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        if self.config.framing == "raw":
+            return text.encode('utf-8')
+        data = (text + ",").encode('utf-8')
+        return struct.pack('Q', len(data)) + data
+
+    async def read_message(self, reader: asyncio.StreamReader, buffer: bytearray):
+        """Read one client message; returns the parsed JSON or None on EOF."""
+        if self.config.framing == "raw":
+            decoder = json.JSONDecoder()
+            while True:
+                text = buffer.decode('utf-8', errors='replace').lstrip(', \n')
+                if text:
+                    try:
+                        message, end = decoder.raw_decode(text)
+                        del buffer[:len(buffer)]
+                        buffer.extend(text[end:].encode('utf-8'))
+                        return message
+                    except json.JSONDecodeError:
+                        pass
+                data = await reader.read(4096)
+                if not data:
+                    return None
+                buffer.extend(data)
+
+        size_data = await reader.readexactly(MESSAGE_SIZE_BYTES)
+        message_size = struct.unpack('Q', size_data)[0]
+        message = (await reader.readexactly(message_size)).decode('utf-8', errors='replace')
+        if message.endswith(','):
+            message = message[:-1]
+        try:
+            return json.loads(message)
+        except json.JSONDecodeError:
+            return {}
+
+    async def send(self, writer: asyncio.StreamWriter, payload):
+        data = self.encode(payload)
+        writer.write(data)
+        await writer.drain()
+        self.stats["frames_sent"] += 1
+        self.stats["bytes_sent"] += len(data)
+
+    # -- answer script -------------------------------------------------
+
+    def make_tokens(self) -> list:
+        words = ["block", "craft", "mine", "redstone", "torch", "iron", "diamond", "creeper",
+                 "village", "biome", "nether", "enchant", "potion", "furnace", "pickaxe"]
+        size = max(1, self.config.token_size)
+        tokens = []
+        for _ in range(self.config.tokens):
+            word = self.random.choice(words)
+            tokens.append((" " + word)[:size].ljust(size))
+        return tokens
+
+    async def answer(self, writer: asyncio.StreamWriter, agent_id, question: str):
+        """Play the configured state sequence for one question."""
+        config = self.config
+        self.stats["questions"] += 1
+
+        tokens = self.make_tokens()
+        rag_ids = [f"chunk_{self.random.randint(1, 5000)}" for _ in range(config.rag_ids)]
+        rag_scores = sorted((round(self.random.uniform(0.3, 0.9), 3) for _ in rag_ids), reverse=True)
+        response = "".join(tokens).strip()
+
+        fail_at = stall_at = corrupt_at = None
+        if self.random.random() < config.fail_rate:
+            fail_at = self.random.randint(0, max(0, len(tokens) - 1))
+        if self.random.random() < config.stall_rate:
+            stall_at = self.random.randint(0, max(0, len(tokens) - 1))
+        if self.random.random() < config.corrupt_rate:
+            corrupt_at = self.random.randint(0, max(0, len(tokens) - 1))
+
+        token_delay = 1.0 / config.token_rate if config.token_rate > 0 else 0
+
+        await asyncio.sleep(config.first_token_delay)
+
+        for state in config.states:
+            if state == STATE_TOKEN:
+                for i, token in enumerate(tokens):
+                    if i == fail_at:
+                        self.stats["injected_failures"] += 1
+                        raise ConnectionResetError("injected failure")
+                    if i == stall_at:
+                        self.stats["injected_stalls"] += 1
+                        await asyncio.sleep(config.stall_seconds)
+                    if i == corrupt_at:
+                        self.stats["injected_corruptions"] += 1
+                        await self.send(writer, '{"agent": {"state": 3, "message": ')
+                    await self.send(writer, {"agent": {"id": agent_id, "state": STATE_TOKEN, "message": token}})
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+            elif state == STATE_FINISH_STREAMING:
+                await self.send(writer, {"agent": {"id": agent_id, "state": state, "message": ";".join(rag_ids)}})
+            elif state in (STATE_STREAMING_END, STATE_FULL_MESSAGE):
+                await self.send(writer, {"agent": {
+                    "id": agent_id,
+                    "state": state,
+                    "message": response,
+                    "response": response,
+                    "rag_ids": rag_ids,
+                    "rag_scores": rag_scores
+                }})
+            else:
+                await self.send(writer, {"agent": {"id": agent_id, "state": state, "message": ""}})
+
+    # -- connection handling ------------------------------------------
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        if self.random.random() < self.config.refuse_rate:
+            self.stats["refused"] += 1
+            writer.close()
+            return
+
+        buffer = bytearray()
+        self.writers.add(writer)
+        try:
+            await self.send(writer, {"server": {"state": 1}})
+            await self.send(writer, {"models": [{"name": self.config.model_name, "state": 4}]})
+
+            while True:
+                message = await self.read_message(reader, buffer)
+                if message is None:
+                    break
+                agent_message = message.get("agent_message") if isinstance(message, dict) else None
+                if agent_message and agent_message.get("message"):
+                    await self.answer(writer, agent_message.get("id", 0), agent_message["message"])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.config.host, self.config.port)
+        return self.server
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            for writer in list(self.writers):
+                writer.close()
+            await self.server.wait_closed()
+
+
+def parse_states(text: str) -> list:
+    """'2,3,4,5' -> [2, 3, 4, 5]"""
+    return [int(part) for part in text.split(',') if part.strip()]
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="TryllServer simulator")
+    defaults = SimulatorConfig()
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--framing", choices=["prefixed", "raw"], default=defaults.framing)
+    parser.add_argument("--model-name", default=defaults.model_name)
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate,
+                        help="tokens per second (0 = unthrottled)")
+    parser.add_argument("--tokens", type=int, default=defaults.tokens, help="tokens per answer")
+    parser.add_argument("--token-size", type=int, default=defaults.token_size, help="characters per token")
+    parser.add_argument("--first-token-delay", type=float, default=defaults.first_token_delay)
+    parser.add_argument("--states", type=parse_states, default=defaults.states,
+                        help="agent.state sequence per answer; 3 expands to the token stream")
+    parser.add_argument("--rag-ids", type=int, default=defaults.rag_ids)
+    parser.add_argument("--fail-rate", type=float, default=defaults.fail_rate)
+    parser.add_argument("--stall-rate", type=float, default=defaults.stall_rate)
+    parser.add_argument("--stall-seconds", type=float, default=defaults.stall_seconds)
+    parser.add_argument("--corrupt-rate", type=float, default=defaults.corrupt_rate)
+    parser.add_argument("--refuse-rate", type=float, default=defaults.refuse_rate)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def config_from_args(args) -> SimulatorConfig:
+    return SimulatorConfig(**{name: getattr(args, name) for name in SimulatorConfig.__dataclass_fields__})
+
+
+async def main():
+    args = build_arg_parser().parse_args()
+    simulator = TryllSimulator(config_from_args(args))
+    await simulator.start()
+    print(f"TryllServer simulator listening on {args.host}:{args.port} ({args.framing} framing)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(json.dumps(simulator.stats, indent=2))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
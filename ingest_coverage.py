@@ -0,0 +1,71 @@
+"""
+Upsert coverage test results into the coverage store (coverage_data/coverage.db)
+instead of rewriting coverage_results.json. Each input file is either JSON in
+the coverage_results.json layout ({"results": {chunk_id: result}, "total_chunks": N})
+or JSON Lines with one {"chunk_id": ..., <result fields>} object per line.
+
+Usage:
+    python ingest_coverage.py new_results.jsonl ...   # upsert results
+    python ingest_coverage.py --total-chunks 2306     # just update the chunk total
+    python ingest_coverage.py                         # just import coverage_results.json into an empty store
+    python ingest_coverage.py --import-legacy         # replace the store (ingested results included) with it
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import app
+
+
+def read_results(path: Path) -> tuple:
+    """({chunk_id: result}, total_chunks) from a JSON or JSON Lines file."""
+    text = path.read_text(encoding='utf-8')
+    if path.suffix != ".jsonl":
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+        # A one-line JSON Lines file parses as a single result, so check for the layout too
+        if isinstance(data, dict) and "results" in data:
+            return data["results"], data.get("total_chunks")
+    results = {}
+    for line in text.splitlines():
+        if line.strip():
+            result = json.loads(line)
+            results[result.pop("chunk_id")] = result
+    return results, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest coverage test results")
+    parser.add_argument("files", nargs="*", type=Path, help="JSON / JSON Lines files with per-chunk results")
+    parser.add_argument("--total-chunks", type=int, help="number of chunks in the knowledge base")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help="replace the store with coverage_results.json before ingesting (drops ingested results)")
+    args = parser.parse_args()
+
+    if args.import_legacy:
+        if not app.coverage_store.legacy_path.exists():
+            print(f"{app.coverage_store.legacy_path.name}: ERROR not found")
+            return 1
+        app.coverage_store.import_legacy()
+    app.coverage_store.refresh(force=True)
+    errors = 0
+    for path in args.files:
+        results, total_chunks = read_results(path)
+        if not results:
+            errors += 1
+            print(f"{path.name}: ERROR no results")
+            continue
+        print(f"{path.name}: {json.dumps(app.coverage_store.ingest(results, args.total_chunks or total_chunks))}")
+
+    if args.total_chunks is not None and not args.files:
+        app.coverage_store.ingest({}, args.total_chunks)
+    print(json.dumps(app.coverage_store.snapshot.summary(), indent=2))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
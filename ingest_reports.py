@@ -0,0 +1,48 @@
+"""
+Convert evaluation reports (reports_html/*.html) into structured JSON sidecars
+(reports_json/*.json) so the dashboard API never parses HTML on a request.
+
+Usage:
+    python ingest_reports.py                 # ingest new/changed reports, drop orphaned sidecars
+    python ingest_reports.py --force         # re-ingest everything (e.g. after a parser change)
+    python ingest_reports.py path/to/report.html ...
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest HTML reports into JSON sidecars")
+    parser.add_argument("reports", nargs="*", type=Path,
+                        help="HTML reports to add (copied into reports_html/); default: all of reports_html/")
+    parser.add_argument("--force", action="store_true", help="re-ingest even if the sidecar is up to date")
+    args = parser.parse_args()
+
+    if not args.reports:
+        counts = app.ingest_all_reports(force=args.force)
+        print(json.dumps(counts, indent=2))
+        return 1 if counts["errors"] else 0
+
+    errors = 0
+    for source in args.reports:
+        filepath = app.REPORTS_DIR / source.name
+        if source.resolve() != filepath.resolve():
+            shutil.copy2(source, filepath)
+        report = app.ingest_report(filepath, force=args.force)
+        if report.get('error'):
+            errors += 1
+            print(f"{filepath.name}: ERROR {report['error']}")
+        else:
+            print(f"{filepath.name}: {report['model']} | {report['game']} | {report['score_percent']}% "
+                  f"| {len(report['questions'])} questions")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
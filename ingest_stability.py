@@ -0,0 +1,66 @@
+"""
+Append stability test runs to the stability store (stability_data/stability.db)
+instead of rewriting stability_db.json. Each input file is either JSON
+({"runs": [...], "server_config": {...}} or a list of runs) or JSON Lines with
+one run per line. A run is {chunk_id, found, run_id, timestamp, question,
+question_type, returned_chunks}, plus category/article/text_preview for chunks
+the store has not seen yet.
+
+Usage:
+    python ingest_stability.py runs.jsonl ...     # append runs
+    python ingest_stability.py                    # just import stability_db.json into an empty store
+    python ingest_stability.py --import-legacy    # replace the store (ingested runs included) with stability_db.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import app
+
+
+def read_runs(path: Path) -> tuple:
+    """(runs, server_config) from a JSON or JSON Lines file."""
+    text = path.read_text(encoding='utf-8')
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()], None
+    if isinstance(data, list):
+        return data, None
+    if isinstance(data, dict) and "runs" in data:
+        return data["runs"], data.get("server_config")
+    return [data], None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest stability test runs")
+    parser.add_argument("files", nargs="*", type=Path, help="JSON / JSON Lines files with run records")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help="replace the store with stability_db.json before ingesting (drops ingested runs)")
+    args = parser.parse_args()
+
+    if args.import_legacy:
+        if not app.stability_store.legacy_path.exists():
+            print(f"{app.stability_store.legacy_path.name}: ERROR not found")
+            return 1
+        app.stability_store.import_legacy()
+    app.stability_store.refresh(force=True)
+    errors = 0
+    for path in args.files:
+        runs, server_config = read_runs(path)
+        runs = [app.StabilityRun(**run).model_dump() for run in runs]
+        if not runs:
+            errors += 1
+            print(f"{path.name}: ERROR no runs")
+            continue
+        print(f"{path.name}: {json.dumps(app.stability_store.ingest(runs, server_config))}")
+
+    print(json.dumps(asyncio.run(app.get_stability_stats()), indent=2))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,13 @@ Logs are saved to: C:/Users/utente/Desktop/TryllEngine/testllmsite/reports_playe
 
 import asyncio
 import json
+import math
 import struct
-from datetime import datetime
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
@@ -44,15 +49,75 @@ MESSAGE_SIZE_BYTES = 8  # uint64
 # Logging configuration
 LOG_DIR = Path("C:/Users/utente/Desktop/TryllEngine/testllmsite/reports_playes")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
-INTERACTIONS_FILE = LOG_DIR / "interactions.json"
+INTERACTIONS_FILE = LOG_DIR / "interactions.json"  # legacy JSON array, read but no longer written
+INTERACTIONS_LOG = LOG_DIR / "interactions.jsonl"  # one finished session per line, appended
 FEEDBACK_FILE = LOG_DIR / "feedback.json"
 
-# Current session tracking
-current_session = {
-    "session_id": None,
-    "started_at": None,
-    "messages": []
-}
+# Session tracking: one session per WebSocket connection
+_log_lock = threading.Lock()
+
+
+class ChatSession:
+    """Interaction buffer owned by a single WebSocket connection."""
+
+    def __init__(self):
+        now = datetime.now()
+        self.session_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.started_at = now.isoformat()
+        self.ended_at = None
+        self.messages = []
+        # Latency telemetry
+        self.model = None
+        self.config_label = None
+        self.exchange = None
+
+    def log(self, direction: str, message_type: str, content: dict):
+        """Buffer an interaction (question/answer/rag) in memory."""
+        self.messages.append({
+            "timestamp": datetime.now().isoformat(),
+            "direction": direction,  # "client_to_server" or "server_to_client"
+            "type": message_type,
+            "content": content
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "messages": self.messages
+        }
+
+
+class SessionRegistry:
+    """Active chat sessions keyed by WebSocket connection."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def start(self, websocket: WebSocket) -> ChatSession:
+        session = ChatSession()
+        self._sessions[id(websocket)] = session
+        return session
+
+    def end(self, websocket: WebSocket):
+        """Close the connection's session and flush it to the interaction log."""
+        session = self._sessions.pop(id(websocket), None)
+        if session is not None:
+            session.ended_at = datetime.now().isoformat()
+            flush_session(session)
+
+    def end_all(self):
+        for session in list(self._sessions.values()):
+            session.ended_at = datetime.now().isoformat()
+            flush_session(session)
+        self._sessions.clear()
+
+    def active(self) -> list:
+        return list(self._sessions.values())
+
+
+sessions = SessionRegistry()
 
 
 def load_json_file(filepath: Path) -> list:
@@ -72,45 +137,242 @@ def save_json_file(filepath: Path, data: list):
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
-def log_interaction(direction: str, message_type: str, content: dict):
-    """Log an interaction (question/answer/rag)."""
-    global current_session
+def load_interactions() -> list:
+    """All logged sessions: the legacy interactions.json followed by interactions.jsonl."""
+    interactions = load_json_file(INTERACTIONS_FILE)
+    if INTERACTIONS_LOG.exists():
+        with open(INTERACTIONS_LOG, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    interactions.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # torn last line of an interrupted append
+    return interactions
 
-    # Start new session if needed
-    if current_session["session_id"] is None:
-        current_session = {
-            "session_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
-            "started_at": datetime.now().isoformat(),
-            "messages": []
-        }
 
-    entry = {
-        "timestamp": datetime.now().isoformat(),
-        "direction": direction,  # "client_to_server" or "server_to_client"
-        "type": message_type,
-        "content": content
-    }
-    current_session["messages"].append(entry)
+def flush_session(session: ChatSession):
+    """Append a finished session to the interaction log (skips empty sessions)."""
+    if not session.messages:
+        return
 
-    # Save to file
-    interactions = load_json_file(INTERACTIONS_FILE)
+    session_data = session.to_dict()
+    line = json.dumps(session_data, ensure_ascii=False) + "\n"
+    with _log_lock:
+        with open(INTERACTIONS_LOG, 'a', encoding='utf-8') as f:
+            f.write(line)
+        stats.add_session(session_data)
+
+    print(f"Session {session.session_id} saved: {len(session.messages)} messages")
+
+
+def _hour_bucket(timestamp: Optional[str]) -> str:
+    """'2026-01-13T03:00:55.984947' -> '2026-01-13T03:00'"""
+    return f"{timestamp[:13]}:00" if timestamp else "unknown"
+
+
+class InteractionStats:
+    """
+    Running counters over the interaction log and feedback.json.
+    Rebuilt from the logs on startup, then updated by the append paths,
+    so reading them never touches the files.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total_sessions = 0
+        self.total_messages = 0
+        self.total_feedback = 0
+        self.positive_feedback = 0
+        self.negative_feedback = 0
+        self.messages_by_hour = {}
+        self.feedback_by_hour = {}
+
+    def add_session(self, session: dict):
+        self.total_sessions += 1
+        for message in session.get("messages", []):
+            self.total_messages += 1
+            hour = _hour_bucket(message.get("timestamp"))
+            self.messages_by_hour[hour] = self.messages_by_hour.get(hour, 0) + 1
+
+    def add_feedback(self, entry: dict):
+        self.total_feedback += 1
+        hour = _hour_bucket(entry.get("timestamp"))
+        bucket = self.feedback_by_hour.setdefault(hour, {"positive": 0, "negative": 0})
+        if entry.get("rating") == "positive":
+            self.positive_feedback += 1
+            bucket["positive"] += 1
+        elif entry.get("rating") == "negative":
+            self.negative_feedback += 1
+            bucket["negative"] += 1
+
+    def rebuild(self):
+        """Recount everything from the log files."""
+        self.reset()
+        for session in load_interactions():
+            self.add_session(session)
+        for entry in load_json_file(FEEDBACK_FILE):
+            self.add_feedback(entry)
+
+    @staticmethod
+    def _series_keys(by_hour: dict, hours: Optional[int]) -> list:
+        """Hour buckets within the last `hours` hours (all if not set), oldest first; undated entries left out."""
+        keys = sorted(k for k in by_hour if k != "unknown")
+        if hours:
+            cutoff = _hour_bucket((datetime.now() - timedelta(hours=hours - 1)).isoformat())
+            keys = [k for k in keys if k >= cutoff]
+        return keys
+
+    def messages_series(self, hours: Optional[int] = None) -> list:
+        keys = self._series_keys(self.messages_by_hour, hours)
+        return [{"hour": k, "messages": self.messages_by_hour[k]} for k in keys]
+
+    def feedback_series(self, hours: Optional[int] = None) -> list:
+        keys = self._series_keys(self.feedback_by_hour, hours)
+        series = []
+        for k in keys:
+            bucket = self.feedback_by_hour[k]
+            rated = bucket["positive"] + bucket["negative"]
+            series.append({
+                "hour": k,
+                "positive": bucket["positive"],
+                "negative": bucket["negative"],
+                "positive_ratio": round(bucket["positive"] / rated, 3) if rated else None
+            })
+        return series
+
+
+stats = InteractionStats()
+
+
+# Latency telemetry: one record per question -> STREAMING_END exchange
+TELEMETRY_BUFFER_SIZE = 5000
+STATE_TOKEN = 3
+STATE_STREAMING_END = 5
+
+ExchangeRecord = namedtuple("ExchangeRecord", [
+    "finished_at", "model", "config", "first_frame", "first_token", "total",
+    "tokens", "tokens_per_sec", "rag_ids", "bytes"
+])
+
+
+class Exchange:
+    """Timing of one question from the moment it is sent to TryllServer."""
+
+    __slots__ = ("sent_at", "first_frame_at", "first_token_at", "last_token_at", "tokens", "bytes")
+
+    def __init__(self):
+        self.sent_at = time.perf_counter()
+        self.first_frame_at = None
+        self.first_token_at = None
+        self.last_token_at = None
+        self.tokens = 0
+        self.bytes = 0
+
+    def frame(self, state, size: int):
+        now = time.perf_counter()
+        self.bytes += size
+        if self.first_frame_at is None:
+            self.first_frame_at = now
+        if state == STATE_TOKEN:
+            self.tokens += 1
+            if self.first_token_at is None:
+                self.first_token_at = now
+            self.last_token_at = now
+
+    def finish(self, model: Optional[str], config: Optional[str], rag_ids: int) -> ExchangeRecord:
+        now = time.perf_counter()
+        tokens_per_sec = None
+        if self.tokens > 1 and self.last_token_at > self.first_token_at:
+            tokens_per_sec = (self.tokens - 1) / (self.last_token_at - self.first_token_at)
+        return ExchangeRecord(
+            finished_at=datetime.now().isoformat(),
+            model=model or "unknown",
+            config=config or "unknown",
+            first_frame=self.first_frame_at - self.sent_at if self.first_frame_at else None,
+            first_token=self.first_token_at - self.sent_at if self.first_token_at else None,
+            total=now - self.sent_at,
+            tokens=self.tokens,
+            tokens_per_sec=tokens_per_sec,
+            rag_ids=rag_ids,
+            bytes=self.bytes
+        )
+
+
+def percentile(values: list, pct: float):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def _percentiles(values: list, scale: float = 1.0) -> dict:
+    """Nearest-rank p50/p95/p99 of the non-empty values."""
+    scaled = [v * scale for v in values if v is not None]
+    if not scaled:
+        return {"p50": None, "p95": None, "p99": None}
+    return {f"p{pct}": round(percentile(scaled, pct), 2) for pct in (50, 95, 99)}
+
+
+class LatencyTelemetry:
+    """Ring buffer of the most recent exchanges."""
 
-    # Find or create session in interactions
-    session_found = False
-    for i, sess in enumerate(interactions):
-        if sess.get("session_id") == current_session["session_id"]:
-            interactions[i] = current_session
-            session_found = True
-            break
+    def __init__(self, size: int = TELEMETRY_BUFFER_SIZE):
+        self.records = deque(maxlen=size)
 
-    if not session_found:
-        interactions.append(current_session)
+    def add(self, record: ExchangeRecord):
+        self.records.append(record)
 
-    save_json_file(INTERACTIONS_FILE, interactions)
+    def summary(self) -> list:
+        """Percentile summaries grouped by model and TryllServer config."""
+        groups = {}
+        for record in self.records:
+            groups.setdefault((record.model, record.config), []).append(record)
+
+        summary = []
+        for (model, config), records in sorted(groups.items()):
+            summary.append({
+                "model": model,
+                "config": config,
+                "exchanges": len(records),
+                "first_frame_ms": _percentiles([r.first_frame for r in records], 1000),
+                "first_token_ms": _percentiles([r.first_token for r in records], 1000),
+                "total_ms": _percentiles([r.total for r in records], 1000),
+                "tokens_per_sec": _percentiles([r.tokens_per_sec for r in records]),
+                "avg_tokens": round(sum(r.tokens for r in records) / len(records), 1),
+                "avg_rag_ids": round(sum(r.rag_ids for r in records) / len(records), 2),
+                "avg_bytes": round(sum(r.bytes for r in records) / len(records), 1)
+            })
+        return summary
+
+
+telemetry = LatencyTelemetry()
+
+
+def read_tryll_config() -> dict:
+    """TryllServer config from the local config file ({} if unavailable)."""
+    if TRYLL_CONFIG_PATH.exists():
+        try:
+            with open(TRYLL_CONFIG_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            pass
+    return {}
+
+
+def config_label(config: dict) -> Optional[str]:
+    """Short label for the retrieval settings that affect latency."""
+    if not config:
+        return None
+    return (f"{config.get('embedding_model_name', '?')} "
+            f"k={config.get('rag_chunks_number', '?')} "
+            f"t={config.get('rag_score_threshold', '?')}")
 
 
 class FeedbackRequest(BaseModel):
-    session_id: Optional[str] = None
+    session_id: str  # as sent by /ws when the connection opened
     message_index: Optional[int] = None
     question: str
     answer: str
@@ -122,6 +384,19 @@ class FeedbackRequest(BaseModel):
 TRYLL_CONFIG_PATH = Path("C:/Users/utente/AppData/Local/Tryll/server/config.json")
 
 
+@app.on_event("startup")
+async def rebuild_stats():
+    """Load counters from the existing logs once, instead of on every /logs/stats call."""
+    with _log_lock:
+        stats.rebuild()
+
+
+@app.on_event("shutdown")
+async def flush_active_sessions():
+    """Persist sessions of clients still connected when the proxy stops."""
+    sessions.end_all()
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
@@ -146,7 +421,7 @@ async def submit_feedback(feedback: FeedbackRequest):
     """Save user feedback locally."""
     feedback_entry = {
         "timestamp": datetime.now().isoformat(),
-        "session_id": feedback.session_id or current_session.get("session_id"),
+        "session_id": feedback.session_id,
         "question": feedback.question,
         "answer": feedback.answer,
         "rating": feedback.rating,
@@ -154,9 +429,11 @@ async def submit_feedback(feedback: FeedbackRequest):
         "rag_chunks": feedback.rag_chunks
     }
 
-    feedbacks = load_json_file(FEEDBACK_FILE)
-    feedbacks.append(feedback_entry)
-    save_json_file(FEEDBACK_FILE, feedbacks)
+    with _log_lock:
+        feedbacks = load_json_file(FEEDBACK_FILE)
+        feedbacks.append(feedback_entry)
+        save_json_file(FEEDBACK_FILE, feedbacks)
+        stats.add_feedback(feedback_entry)
 
     print(f"Feedback saved: {feedback.rating} - {feedback.question[:50]}...")
     return {"status": "ok", "message": "Feedback saved locally"}
@@ -165,7 +442,20 @@ async def submit_feedback(feedback: FeedbackRequest):
 @app.get("/logs/interactions")
 async def get_interactions():
     """Get all logged interactions."""
-    return load_json_file(INTERACTIONS_FILE)
+    return await asyncio.to_thread(load_interactions)
+
+
+@app.get("/logs/sessions")
+async def get_active_sessions():
+    """Get sessions of currently connected clients (not yet flushed to the log)."""
+    return [
+        {
+            "session_id": s.session_id,
+            "started_at": s.started_at,
+            "message_count": len(s.messages)
+        }
+        for s in sessions.active()
+    ]
 
 
 @app.get("/logs/feedback")
@@ -175,27 +465,44 @@ async def get_feedback():
 
 
 @app.get("/logs/stats")
-async def get_stats():
-    """Get statistics about interactions and feedback."""
-    interactions = load_json_file(INTERACTIONS_FILE)
-    feedbacks = load_json_file(FEEDBACK_FILE)
-
-    total_sessions = len(interactions)
-    total_messages = sum(len(s.get("messages", [])) for s in interactions)
-    total_feedback = len(feedbacks)
-    positive_feedback = len([f for f in feedbacks if f.get("rating") == "positive"])
-    negative_feedback = len([f for f in feedbacks if f.get("rating") == "negative"])
+async def get_stats(hours: Optional[int] = 24):
+    """
+    Get statistics about interactions and feedback.
+    Served from running counters; `hours` limits the time series to the
+    last N hours, including the current one (0 = all).
+    """
+    active = sessions.active()
 
     return {
-        "total_sessions": total_sessions,
-        "total_messages": total_messages,
-        "total_feedback": total_feedback,
-        "positive_feedback": positive_feedback,
-        "negative_feedback": negative_feedback,
+        "total_sessions": stats.total_sessions,
+        "total_messages": stats.total_messages,
+        "total_feedback": stats.total_feedback,
+        "positive_feedback": stats.positive_feedback,
+        "negative_feedback": stats.negative_feedback,
+        "active_sessions": len(active),
+        "active_messages": sum(len(s.messages) for s in active),
+        "messages_per_hour": stats.messages_series(hours),
+        "feedback_per_hour": stats.feedback_series(hours),
         "log_dir": str(LOG_DIR)
     }
 
 
+@app.get("/telemetry/latency")
+async def get_latency_telemetry(recent: int = 0):
+    """
+    Chat latency percentiles per model and TryllServer config, over the
+    last TELEMETRY_BUFFER_SIZE exchanges. `recent` also returns the N latest raw records.
+    """
+    result = {
+        "exchanges": len(telemetry.records),
+        "buffer_size": telemetry.records.maxlen,
+        "groups": telemetry.summary()
+    }
+    if recent:
+        result["recent"] = [record._asdict() for record in list(telemetry.records)[-recent:]]
+    return result
+
+
 @app.websocket("/ws")
 async def websocket_proxy(websocket: WebSocket):
     """
@@ -203,6 +510,8 @@ async def websocket_proxy(websocket: WebSocket):
     Handles the binary protocol (8-byte size prefix).
     """
     await websocket.accept()
+    session = sessions.start(websocket)
+    session.config_label = config_label(read_tryll_config())
 
     reader = None
     writer = None
@@ -213,7 +522,10 @@ async def websocket_proxy(websocket: WebSocket):
             TRYLL_SERVER_HOST,
             TRYLL_SERVER_PORT
         )
-        print(f"Connected to TryllServer at {TRYLL_SERVER_HOST}:{TRYLL_SERVER_PORT}")
+        print(f"Connected to TryllServer at {TRYLL_SERVER_HOST}:{TRYLL_SERVER_PORT} (session {session.session_id})")
+
+        # Let the client know which session its feedback belongs to
+        await websocket.send_text(json.dumps({"proxy": {"session_id": session.session_id}}))
 
         async def forward_to_client():
             """Forward messages from TryllServer to WebSocket client."""
@@ -242,9 +554,16 @@ async def websocket_proxy(websocket: WebSocket):
                         msg_json = json.loads(message)
                         if "agent" in msg_json:
                             agent_data = msg_json["agent"]
+                            if session.exchange is not None:
+                                session.exchange.frame(agent_data.get("state"), message_size)
+                                if agent_data.get("state") == STATE_STREAMING_END:
+                                    telemetry.add(session.exchange.finish(
+                                        session.model, session.config_label, len(agent_data.get("rag_ids") or [])
+                                    ))
+                                    session.exchange = None
                             # Log complete response (state 5 = STREAMING_END)
                             if agent_data.get("state") == 5 and agent_data.get("response"):
-                                log_interaction("server_to_client", "llm_response", {
+                                session.log("server_to_client", "llm_response", {
                                     "response": agent_data.get("response"),
                                     "rag_ids": agent_data.get("rag_ids", []),
                                     "rag_scores": agent_data.get("rag_scores", [])
@@ -269,12 +588,15 @@ async def websocket_proxy(websocket: WebSocket):
                     # Log user question
                     try:
                         msg_json = json.loads(data)
+                        if "new_agent" in msg_json:
+                            session.model = msg_json["new_agent"].get("model") or session.model
                         if "agent_message" in msg_json:
                             agent_msg = msg_json["agent_message"]
                             if agent_msg.get("message"):
-                                log_interaction("client_to_server", "user_question", {
+                                session.log("client_to_server", "user_question", {
                                     "question": agent_msg.get("message")
                                 })
+                                session.exchange = Exchange()
                     except:
                         pass
 
@@ -291,11 +613,15 @@ async def websocket_proxy(websocket: WebSocket):
             except Exception as e:
                 print(f"Forward to server error: {e}")
 
-        # Run both directions concurrently
-        await asyncio.gather(
-            forward_to_client(),
-            forward_to_server()
-        )
+        # Run both directions concurrently; when either side closes, stop the other
+        # so the session ends as soon as the client goes away
+        tasks = [
+            asyncio.create_task(forward_to_client()),
+            asyncio.create_task(forward_to_server())
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
 
     except ConnectionRefusedError:
         print(f"ERROR: Cannot connect to TryllServer at {TRYLL_SERVER_HOST}:{TRYLL_SERVER_PORT}")
@@ -315,6 +641,8 @@ async def websocket_proxy(websocket: WebSocket):
         except:
             pass
     finally:
+        # Off the event loop, so one disconnect doesn't stall the other connections
+        await asyncio.to_thread(sessions.end, websocket)
         if writer:
             writer.close()
             try:
@@ -0,0 +1,288 @@
+"""
+RAG-dynamic analytics - vectorized over (question x k x threshold) found-matrices.
+
+A RAG-dynamic session runs the same questions for every (rag_chunks_number,
+rag_score_threshold) pair. Loaded into a boolean array F[question, k, threshold]
+the tuning questions become array reductions:
+- accuracy per configuration:            F.mean(axis=0)
+- smallest configuration reaching a target accuracy
+- marginal gain of each extra chunk:     diff of accuracy along the k axis
+- accuracy-vs-k Pareto frontier
+- first k at which each question is found: argmax along the k axis
+"""
+
+import numpy as np
+
+
+class FoundMatrix:
+    """Found-matrix of one session: found[q, ki, ti] for question q at k_values[ki], thresholds[ti]."""
+
+    def __init__(self, questions: list, k_values: list, thresholds: list, found: np.ndarray):
+        self.questions = questions  # [(chunk_id, question text)]
+        self.k_values = np.asarray(k_values)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.found = found
+
+    @classmethod
+    def from_runs(cls, runs: list) -> "FoundMatrix":
+        """Build from a session's runs (each with rag_chunks_number, rag_score_threshold and results)."""
+        k_values = sorted({run['rag_chunks_number'] for run in runs})
+        thresholds = sorted({float(run['rag_score_threshold']) for run in runs})
+        k_index = {k: i for i, k in enumerate(k_values)}
+        t_index = {t: i for i, t in enumerate(thresholds)}
+
+        questions = []
+        q_index = {}
+        for run in runs:
+            for result in run.get('results', []):
+                key = (result.get('chunk_id'), result.get('question'))
+                if key not in q_index:
+                    q_index[key] = len(questions)
+                    questions.append(key)
+
+        found = np.zeros((len(questions), len(k_values), len(thresholds)), dtype=bool)
+        for run in runs:
+            ki = k_index[run['rag_chunks_number']]
+            ti = t_index[float(run['rag_score_threshold'])]
+            rows = [q_index[(r.get('chunk_id'), r.get('question'))] for r in run.get('results', [])]
+            found[rows, ki, ti] = [bool(r.get('found')) for r in run.get('results', [])]
+        return cls(questions, k_values, thresholds, found)
+
+    def accuracy(self) -> np.ndarray:
+        """Accuracy (%) per (k, threshold)."""
+        if not len(self.questions):
+            return np.zeros((len(self.k_values), len(self.thresholds)))
+        return self.found.mean(axis=0) * 100
+
+    def best_configs(self, targets: list) -> list:
+        """
+        Cheapest configuration reaching each accuracy target: smallest k, then
+        highest accuracy, then highest threshold (fewest chunks passed on).
+        """
+        accuracy = self.accuracy()
+        k_grid, t_grid = np.meshgrid(self.k_values, self.thresholds, indexing='ij')
+        # lexsort: last key is primary
+        order = np.lexsort((-t_grid.ravel(), -accuracy.ravel(), k_grid.ravel()))
+
+        best = []
+        for target in targets:
+            reaching = order[accuracy.ravel()[order] >= target]
+            if not len(reaching):
+                best.append({"target": target, "config": None})
+                continue
+            ki, ti = np.unravel_index(reaching[0], accuracy.shape)
+            best.append({"target": target, "config": self._config(ki, ti, accuracy)})
+        return best
+
+    def marginal_gain(self) -> dict:
+        """Accuracy gained by each extra chunk: per threshold, and for the best threshold at each k."""
+        accuracy = self.accuracy()
+        best_per_k = accuracy.max(axis=1) if accuracy.size else np.zeros(len(self.k_values))
+        return {
+            "k_values": self.k_values.tolist(),
+            "best_accuracy": _round(best_per_k),
+            "best_gain": _round(np.diff(best_per_k, prepend=0.0)),
+            "gain_by_threshold": {
+                threshold_key(t): _round(np.diff(accuracy[:, ti], prepend=0.0))
+                for ti, t in enumerate(self.thresholds)
+            }
+        }
+
+    def pareto_frontier(self) -> list:
+        """Configurations where no smaller k reaches the same or higher accuracy."""
+        accuracy = self.accuracy()
+        if not accuracy.size:
+            return []
+        # Highest threshold among ties, as in best_configs
+        best_t = len(self.thresholds) - 1 - accuracy[:, ::-1].argmax(axis=1)
+        best_per_k = accuracy[np.arange(len(self.k_values)), best_t]
+        previous_max = np.maximum.accumulate(np.concatenate(([-1.0], best_per_k[:-1])))
+        frontier = np.nonzero(best_per_k > previous_max)[0]
+        return [self._config(ki, best_t[ki], accuracy) for ki in frontier]
+
+    def by_chunk(self) -> "FoundMatrix":
+        """
+        One row per chunk instead of per question (sessions generate their own
+        questions): a chunk counts as found in a cell if any of its questions was.
+        """
+        if not len(self.questions):
+            return self
+        chunk_ids = np.array([chunk_id or "" for chunk_id, _ in self.questions])
+        order = np.argsort(chunk_ids, kind='stable')
+        unique, starts = np.unique(chunk_ids[order], return_index=True)
+        found = np.logical_or.reduceat(self.found[order], starts, axis=0)
+        return FoundMatrix([(chunk_id, None) for chunk_id in unique.tolist()], self.k_values, self.thresholds, found)
+
+    def _config(self, ki, ti, accuracy) -> dict:
+        return {
+            "rag_chunks_number": int(self.k_values[ki]),
+            "rag_score_threshold": float(self.thresholds[ti]),
+            "accuracy": round(float(accuracy[ki, ti]), 2)
+        }
+
+
+def first_found_k(matrices: dict) -> list:
+    """
+    First k at which each question is found (at any threshold), for every
+    session at once: all found-matrices are padded onto a shared k grid and
+    reduced with a single argmax.
+    Returns one entry per distinct (chunk_id, question).
+    """
+    if not matrices:
+        return []
+    k_grid = np.array(sorted({int(k) for m in matrices.values() for k in m.k_values}))
+
+    blocks = []
+    row_keys = []
+    for session, matrix in matrices.items():
+        found_any_t = matrix.found.any(axis=2)  # questions x session k
+        block = np.zeros((len(matrix.questions), len(k_grid)), dtype=bool)
+        block[:, np.searchsorted(k_grid, matrix.k_values)] = found_any_t
+        blocks.append(block)
+        row_keys.extend((session, key) for key in matrix.questions)
+
+    stacked = np.vstack(blocks)
+    first = np.where(stacked.any(axis=1), k_grid[stacked.argmax(axis=1)], -1)
+
+    per_question = {}
+    for (session, key), k in zip(row_keys, first.tolist()):
+        entry = per_question.setdefault(key, {"chunk_id": key[0], "question": key[1], "sessions": {}})
+        entry["sessions"][session] = k if k >= 0 else None
+
+    result = []
+    for entry in per_question.values():
+        ks = [k for k in entry["sessions"].values() if k is not None]
+        entry["min_first_k"] = min(ks) if ks else None
+        entry["max_first_k"] = max(ks) if ks else None
+        entry["never_found_in"] = [s for s, k in entry["sessions"].items() if k is None]
+        result.append(entry)
+    # Hardest first: never found, then found only at high k
+    result.sort(key=lambda e: (e["min_first_k"] is not None, -(e["max_first_k"] or 0), e["chunk_id"] or ""))
+    return result
+
+
+def threshold_key(threshold: float) -> str:
+    """Threshold as written in summary.json accuracy_matrix keys ("0.1", "1.0")."""
+    return str(float(threshold))
+
+
+def _round(values) -> list:
+    return [round(float(v), 2) for v in values]
+
+
+def _align(keys_a: list, keys_b: list) -> tuple:
+    """Row indices of the questions present in both lists, in A's order."""
+    index_b = {key: i for i, key in enumerate(keys_b)}
+    common = [key for key in keys_a if key in index_b]
+    index_a = {key: i for i, key in enumerate(keys_a)}
+    return common, np.array([index_a[k] for k in common], dtype=int), np.array([index_b[k] for k in common], dtype=int)
+
+
+def _question_list(keys: list, mask: np.ndarray) -> list:
+    return [{"chunk_id": keys[i][0], "question": keys[i][1]} for i in np.nonzero(mask)[0]]
+
+
+def diff_found_matrices(a: FoundMatrix, b: FoundMatrix, k=None, threshold=None, align: str = "chunk") -> dict:
+    """
+    Compare two sessions on the chunks (align="chunk") or exact questions
+    (align="question") they share, for every (k, threshold) present in both:
+    accuracy delta and how many were gained or lost. The gained/lost lists
+    are for one cell - (k, threshold) if given, else the most permissive
+    shared cell (largest k, lowest threshold).
+    """
+    if align == "chunk":
+        a, b = a.by_chunk(), b.by_chunk()
+    common, rows_a, rows_b = _align(a.questions, b.questions)
+    k_common = np.intersect1d(a.k_values, b.k_values)
+    t_common = np.intersect1d(a.thresholds, b.thresholds)
+    ka, kb = np.searchsorted(a.k_values, k_common), np.searchsorted(b.k_values, k_common)
+    ta, tb = np.searchsorted(a.thresholds, t_common), np.searchsorted(b.thresholds, t_common)
+
+    # questions x shared k x shared threshold
+    found_a = a.found[rows_a][:, ka][:, :, ta]
+    found_b = b.found[rows_b][:, kb][:, :, tb]
+    gained = ~found_a & found_b
+    lost = found_a & ~found_b
+
+    n = max(len(common), 1)
+    accuracy_a = found_a.sum(axis=0) / n * 100
+    accuracy_b = found_b.sum(axis=0) / n * 100
+    cells = {}
+    for ki, k_value in enumerate(k_common):
+        cells[str(int(k_value))] = {
+            threshold_key(t): {
+                "accuracy_a": round(float(accuracy_a[ki, ti]), 2),
+                "accuracy_b": round(float(accuracy_b[ki, ti]), 2),
+                "delta": round(float(accuracy_b[ki, ti] - accuracy_a[ki, ti]), 2),
+                "gained": int(gained[:, ki, ti].sum()),
+                "lost": int(lost[:, ki, ti].sum())
+            }
+            for ti, t in enumerate(t_common)
+        }
+
+    cell = None
+    if len(k_common) and len(t_common):
+        ki = len(k_common) - 1 if k is None else int(np.searchsorted(k_common, k))
+        ti = 0 if threshold is None else int(np.searchsorted(t_common, float(threshold)))
+        if ki < len(k_common) and ti < len(t_common) and (k is None or k_common[ki] == k) \
+                and (threshold is None or np.isclose(t_common[ti], float(threshold))):
+            cell = {
+                "rag_chunks_number": int(k_common[ki]),
+                "rag_score_threshold": float(t_common[ti]),
+                "newly_found": _question_list(common, gained[:, ki, ti]),
+                "newly_lost": _question_list(common, lost[:, ki, ti])
+            }
+
+    keys_a, keys_b = set(a.questions), set(b.questions)
+    return {
+        "common": len(common),
+        "only_in_a": len(keys_a - keys_b),
+        "only_in_b": len(keys_b - keys_a),
+        "k_values": k_common.tolist(),
+        "threshold_values": t_common.tolist(),
+        "cells": cells,
+        "cell": cell
+    }
+
+
+def _results_by_key(results: list, align: str) -> dict:
+    """Results keyed by (chunk_id, question), or by (chunk_id, None) merged with "any found"."""
+    if align == "question":
+        return {(r.get('chunk_id'), r.get('question')): r for r in results}
+    by_chunk = {}
+    for r in results:
+        key = (r.get('chunk_id'), None)
+        if key not in by_chunk or (r.get('found') and not by_chunk[key].get('found')):
+            by_chunk[key] = r
+    return by_chunk
+
+
+def diff_test_results(results_a: list, results_b: list, align: str = "chunk") -> dict:
+    """Compare two RAG-only test runs on the chunks (or exact questions) they share."""
+    by_key_a = _results_by_key(results_a, align)
+    by_key_b = _results_by_key(results_b, align)
+    common = by_key_a.keys() & by_key_b.keys()
+    found_a = {key for key in common if by_key_a[key].get('found')}
+    found_b = {key for key in common if by_key_b[key].get('found')}
+
+    def entries(keys):
+        return [{
+            "chunk_id": key[0],
+            "question": key[1] or by_key_b[key].get('question'),
+            "returned_a": by_key_a[key].get('returned_chunks', []),
+            "returned_b": by_key_b[key].get('returned_chunks', [])
+        } for key in sorted(keys, key=lambda k: (k[0] or "", k[1] or ""))]
+
+    n = max(len(common), 1)
+    accuracy_a = len(found_a) / n * 100
+    accuracy_b = len(found_b) / n * 100
+    return {
+        "common": len(common),
+        "only_in_a": len(by_key_a.keys() - by_key_b.keys()),
+        "only_in_b": len(by_key_b.keys() - by_key_a.keys()),
+        "accuracy_a": round(accuracy_a, 2),
+        "accuracy_b": round(accuracy_b, 2),
+        "delta": round(accuracy_b - accuracy_a, 2),
+        "newly_found": entries(found_b - found_a),
+        "newly_lost": entries(found_a - found_b)
+    }
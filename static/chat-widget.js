@@ -28,7 +28,8 @@
         agentId: 1,
         agentCreated: false,
         models: [],
-        tunnelBaseUrl: null
+        tunnelBaseUrl: null,
+        proxySessionId: null
     };
 
     // Create widget HTML
@@ -948,7 +949,10 @@
             const messages = [msg]; // Wrap in array for consistent processing
 
             for (const msg of messages) {
-                if (msg.server) {
+                if (msg.proxy) {
+                    // local_proxy announces the session this connection is logged under
+                    state.proxySessionId = msg.proxy.session_id;
+                } else if (msg.server) {
                     // Server state update
                     if (msg.server.state === 1) {
                         updateConnectionStatus(true, 'Connected');
@@ -1346,6 +1350,7 @@
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
+                    session_id: state.proxySessionId,
                     question: state.currentSession?.question || '',
                     answer: msg?.content || '',
                     rating: isPositive ? 'positive' : 'negative',
@@ -1383,6 +1388,7 @@
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
+                    session_id: state.proxySessionId,
                     question: state.currentSession?.question || '',
                     answer: lastAssistantMsg?.content || '',
                     rating: 'negative',